@@ -1,6 +1,54 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger("authentication")
+
+# Backends whose entries only exist in the process that wrote them.
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def warn_if_cache_not_shared() -> bool:
+    """
+    Throttle counters, cached users and blacklist updates live in the default
+    cache. Outside DEBUG a per-process cache multiplies every rate limit by
+    the number of workers, so say so at startup.
+    """
+    backend = settings.CACHES["default"]["BACKEND"]
+    if settings.DEBUG or backend not in PROCESS_LOCAL_CACHES:
+        return False
+    logger.warning(
+        "The default cache (%s) is not shared between processes: rate limits "
+        "apply per worker. Set REDIS_URL to share it.",
+        backend,
+    )
+    return True
 
 
 class AuthenticationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "authentication"
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import post_delete, post_save
+
+        from authentication.signals import invalidate_cached_user
+
+        warn_if_cache_not_shared()
+
+        User = get_user_model()
+        post_save.connect(
+            invalidate_cached_user,
+            sender=User,
+            dispatch_uid="authentication.invalidate_cached_user.save",
+        )
+        post_delete.connect(
+            invalidate_cached_user,
+            sender=User,
+            dispatch_uid="authentication.invalidate_cached_user.delete",
+        )
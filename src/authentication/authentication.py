@@ -1,5 +1,41 @@
+from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+    TokenError,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from authentication.user_cache import user_cache
+from personal_finance_api.db_router import use_primary
+
+_VALIDATED_TOKENS_ATTR = "_validated_jwt_tokens"
+
+
+def validate_request_token(request, raw_token):
+    """
+    Validate ``raw_token`` at most once per request.
+
+    The outcome (the validated token or the ``InvalidToken`` error) is stored
+    on the underlying ``HttpRequest`` so ``AuthRedirectMiddleware`` and
+    ``CookiesJWTAuthentication`` share a single signature verification.
+    """
+    request = getattr(request, "_request", request)
+    if isinstance(raw_token, bytes):
+        raw_token = raw_token.decode()
+
+    results = request.__dict__.setdefault(_VALIDATED_TOKENS_ATTR, {})
+    if raw_token not in results:
+        try:
+            results[raw_token] = JWTAuthentication().get_validated_token(raw_token)
+        except InvalidToken as e:
+            results[raw_token] = e
+
+    result = results[raw_token]
+    if isinstance(result, InvalidToken):
+        raise result
+    return result
 
 
 class CookiesJWTAuthentication(JWTAuthentication):
@@ -9,7 +45,7 @@ class CookiesJWTAuthentication(JWTAuthentication):
             raw_token = self.get_raw_token(header)
             if raw_token is not None:
                 try:
-                    validated_token = self.get_validated_token(raw_token)
+                    validated_token = validate_request_token(request, raw_token)
                     return self.get_user(validated_token), validated_token
                 except TokenError:
                     pass
@@ -19,7 +55,7 @@ class CookiesJWTAuthentication(JWTAuthentication):
             return None
 
         try:
-            validated_token = self.get_validated_token(access_token)
+            validated_token = validate_request_token(request, access_token)
             user = self.get_user(validated_token)
         except TokenError:
             return None
@@ -27,3 +63,23 @@ class CookiesJWTAuthentication(JWTAuthentication):
             return None
 
         return user, validated_token
+
+    def get_user(self, validated_token):
+        """
+        Resolve the token's user through ``user_cache`` so warm requests do not
+        query the users table. Misses read the primary: a lagging replica's
+        row would be shared through the cache for everyone.
+        """
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+
+        user = user_cache.get(user_id)
+        if user is None:
+            with use_primary():
+                user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        elif api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
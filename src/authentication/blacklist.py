@@ -0,0 +1,177 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings. Membership tests never give false
+    negatives; false positives happen at roughly ``error_rate``.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class BlacklistFilter:
+    """
+    In-process Bloom filter of blacklisted refresh token JTIs.
+
+    A miss proves the token is not blacklisted, so the common refresh path
+    skips the blacklist query entirely. Every blacklisting bumps a version
+    counter in the cache after commit and stores its JTI under that version
+    for ``AUTH_BLACKLIST_FILTER_REBUILD_SECONDS``. At most every
+    ``AUTH_BLACKLIST_FILTER_SYNC_SECONDS`` each process reads the counter and
+    adds the JTIs of the versions it has not seen to its filter.
+
+    Other processes only see those entries through a cache shared between
+    them (Redis): only then do they reject a just-blacklisted token within
+    ``AUTH_BLACKLIST_FILTER_SYNC_SECONDS``. With a per-process cache they
+    would accept it until their next rebuild, so unless ``AUTH_BLACKLIST_FILTER``
+    is on (settings turn it on with ``REDIS_URL``) the filter answers "maybe"
+    for every token and each check queries the blacklist.
+
+    The filter is only rebuilt from the database on a cold start, every
+    ``AUTH_BLACKLIST_FILTER_REBUILD_SECONDS`` (which also drops expired
+    tokens), and when versions can no longer be replayed one by one: too many
+    were missed, or their entries already expired from the cache.
+    """
+
+    version_key = "auth:blacklist:version"
+    jti_key_prefix = "auth:blacklist:jti:"
+    # More missed versions than this are cheaper to rebuild than to replay.
+    max_replay = 1000
+
+    def __init__(self):
+        self._filter = None
+        self._version = None
+        self._built_at = 0.0
+        self._synced_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def rebuild_interval(self) -> float:
+        return getattr(settings, "AUTH_BLACKLIST_FILTER_REBUILD_SECONDS", 600)
+
+    @property
+    def sync_interval(self) -> float:
+        return getattr(settings, "AUTH_BLACKLIST_FILTER_SYNC_SECONDS", 1)
+
+    @property
+    def error_rate(self) -> float:
+        return getattr(settings, "AUTH_BLACKLIST_FILTER_ERROR_RATE", 0.001)
+
+    def _jti_key(self, version: int) -> str:
+        return f"{self.jti_key_prefix}{version}"
+
+    @property
+    def enabled(self) -> bool:
+        return getattr(settings, "AUTH_BLACKLIST_FILTER", False)
+
+    def might_contain(self, jti: str) -> bool:
+        if not self.enabled:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if self._filter is None or now - self._built_at > self.rebuild_interval:
+                self._rebuild(cache.get(self.version_key))
+            elif now - self._synced_at > self.sync_interval:
+                self._sync(cache.get(self.version_key))
+            return jti in self._filter
+
+    def _sync(self, version) -> None:
+        self._synced_at = time.monotonic()
+        if version == self._version:
+            return
+        if version is None or self._version is None or version < self._version:
+            # The counter was evicted or restarted.
+            self._rebuild(version)
+            return
+        if version - self._version > self.max_replay:
+            self._rebuild(version)
+            return
+
+        keys = [self._jti_key(v) for v in range(self._version + 1, version + 1)]
+        jtis = cache.get_many(keys)
+        if len(jtis) < len(keys):
+            self._rebuild(version)
+            return
+        for jti in jtis.values():
+            self._filter.add(jti)
+        self._version = version
+
+    def _rebuild(self, version) -> None:
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        # ``version`` is read before the query, so tokens blacklisted meanwhile
+        # are replayed by the next sync.
+        jtis = list(
+            BlacklistedToken.objects.filter(
+                token__expires_at__gt=timezone.now()
+            ).values_list("token__jti", flat=True)
+        )
+
+        bloom = BloomFilter(max(len(jtis) * 2, 1024), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+
+        self._filter = bloom
+        self._version = version
+        self._built_at = self._synced_at = time.monotonic()
+
+    def add(self, jti: str) -> None:
+        """Record a committed blacklisting, here and for every other process."""
+        version = self._bump_version()
+        cache.set(self._jti_key(version), jti, self.rebuild_interval)
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+                if self._version == version - 1:
+                    self._version = version
+
+    def _bump_version(self) -> int:
+        # The counter starts from the clock, so after a cache flush it jumps
+        # past every version a process has seen and forces a rebuild there.
+        initial = int(time.time() * 1000)
+        if cache.add(self.version_key, initial, None):
+            return initial
+        try:
+            return cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, initial, None)
+            return initial
+
+    def reset(self) -> None:
+        with self._lock:
+            self._filter = None
+            self._version = None
+
+
+blacklist_filter = BlacklistFilter()
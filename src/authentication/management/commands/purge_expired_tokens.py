@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding refresh tokens (and their blacklist "
+        "entries) in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        expired = OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+
+        purged = 0
+        while True:
+            ids = list(expired.values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            OutstandingToken.objects.filter(id__in=ids).delete()
+            purged += len(ids)
+
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} expired tokens."))
@@ -0,0 +1,7 @@
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+
+from authentication.tokens import FilteredRefreshToken
+
+
+class FilteredTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = FilteredRefreshToken
@@ -0,0 +1,11 @@
+from functools import partial
+
+from django.db import transaction
+
+from authentication.user_cache import user_cache
+
+
+def invalidate_cached_user(sender, instance, using=None, **kwargs):
+    # After commit: invalidating earlier lets a concurrent request re-cache the
+    # row as it was before this write.
+    transaction.on_commit(partial(user_cache.invalidate, instance.pk), using=using)
@@ -0,0 +1,129 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from authentication.blacklist import BlacklistFilter, BloomFilter, blacklist_filter
+from authentication.tests.helpers import login_payload, sample_user
+from authentication.tokens import FilteredRefreshToken
+
+
+class BloomFilterTests(APITestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f"jti-{i}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        self.assertTrue(all(item in bloom for item in items))
+        false_positives = sum(f"other-{i}" in bloom for i in range(1000))
+        self.assertLess(false_positives, 50)
+
+
+@override_settings(AUTH_BLACKLIST_FILTER=True)
+class RefreshTokenBlacklistTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        blacklist_filter.reset()
+        self.user = sample_user(username="blacklistuser", password="password")
+        self.refresh_url = "/api/auth/token/refresh/"
+
+    def _login(self):
+        response = self.client.post(
+            "/api/auth/login/",
+            login_payload("blacklistuser", "password"),
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {response.cookies['access_token'].value}"
+        )
+        return response.cookies["refresh_token"].value
+
+    def test_check_skips_query_when_not_blacklisted(self):
+        token = FilteredRefreshToken.for_user(self.user)
+        blacklist_filter.might_contain("warm-up")
+
+        with self.assertNumQueries(0):
+            token.check_blacklist()
+
+    @override_settings(AUTH_BLACKLIST_FILTER=False)
+    def test_without_a_shared_cache_every_check_queries(self):
+        token = FilteredRefreshToken.for_user(self.user)
+        blacklist_filter.might_contain("warm-up")
+
+        with self.assertNumQueries(1):
+            token.check_blacklist()
+
+    def test_logout_blacklists_refresh_token(self):
+        refresh_token = self._login()
+
+        response = self.client.post(self.refresh_url)
+        self.assertTrue(response.data["refreshed"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/auth/logout/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.cookies["refresh_token"] = refresh_token
+        response = self.client.post(self.refresh_url)
+        self.assertFalse(response.data["refreshed"])
+
+    def test_blacklisted_token_is_rejected(self):
+        token = FilteredRefreshToken.for_user(self.user)
+        blacklist_filter.might_contain("warm-up")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            token.blacklist()
+
+        with self.assertRaises(TokenError):
+            FilteredRefreshToken(str(token))
+
+    @override_settings(AUTH_BLACKLIST_FILTER_SYNC_SECONDS=0)
+    def test_other_processes_replay_new_blacklistings_from_the_cache(self):
+        tokens = [FilteredRefreshToken.for_user(self.user) for _ in range(3)]
+        with self.captureOnCommitCallbacks(execute=True):
+            tokens[0].blacklist()
+        other = BlacklistFilter()
+        other.might_contain("warm-up")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tokens[1].blacklist()
+            tokens[2].blacklist()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(other.might_contain(tokens[1]["jti"]))
+            self.assertTrue(other.might_contain(tokens[2]["jti"]))
+
+    @override_settings(AUTH_BLACKLIST_FILTER_SYNC_SECONDS=0)
+    def test_missing_cache_entries_force_a_rebuild(self):
+        first, token = (FilteredRefreshToken.for_user(self.user) for _ in range(2))
+        with self.captureOnCommitCallbacks(execute=True):
+            first.blacklist()
+        other = BlacklistFilter()
+        other.might_contain("warm-up")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            token.blacklist()
+        cache.delete(other._jti_key(cache.get(other.version_key)))
+
+        with self.assertNumQueries(1):
+            self.assertTrue(other.might_contain(token["jti"]))
+
+    def test_purge_expired_tokens(self):
+        FilteredRefreshToken.for_user(self.user)
+        expired = FilteredRefreshToken.for_user(self.user)
+        OutstandingToken.objects.filter(jti=expired["jti"]).update(
+            expires_at=timezone.now() - timedelta(days=1)
+        )
+
+        call_command("purge_expired_tokens", batch_size=1, stdout=StringIO())
+
+        self.assertEqual(OutstandingToken.objects.count(), 1)
@@ -1,3 +1,5 @@
+from typing import ClassVar
+
 from django.test import override_settings
 from django.core.cache import cache
 from django.contrib.auth import get_user_model
@@ -6,6 +8,11 @@ from rest_framework.test import APITestCase, APIRequestFactory
 from rest_framework.request import Request
 from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
 
+from authentication.apps import warn_if_cache_not_shared
+from authentication.throttling import (
+    SlidingWindowAnonRateThrottle,
+    SlidingWindowUserRateThrottle,
+)
 
 User = get_user_model()
 
@@ -81,3 +88,107 @@ class ThrottleTests(APITestCase):
         self.assertEqual(len(history), 3)
 
         self.assertFalse(throttle.allow_request(request, view=view))
+
+
+@override_settings(
+    REST_FRAMEWORK={
+        "DEFAULT_THROTTLE_CLASSES": [
+            "authentication.throttling.SlidingWindowAnonRateThrottle",
+            "authentication.throttling.SlidingWindowUserRateThrottle",
+        ],
+        "DEFAULT_THROTTLE_RATES": {"anon": "2/min", "user": "3/min"},
+    }
+)
+class SlidingWindowThrottleTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.anon_ip = "127.0.0.1"
+        self.user = User.objects.create_user(
+            username="slidinguser", email="sliding@example.com", password="password"
+        )
+        self.now = 600.0
+
+    def _throttle(self, throttle_class, rate):
+        throttle = throttle_class()
+        throttle.rate = rate
+        throttle.num_requests, throttle.duration = throttle.parse_rate(throttle.rate)
+        throttle.timer = lambda: self.now
+        return throttle
+
+    def _anon_request(self):
+        django_req = self.factory.get("/")
+        django_req.META["REMOTE_ADDR"] = self.anon_ip
+        return Request(django_req)
+
+    def test_anon_throttle_blocks_after_limit(self):
+        throttle = self._throttle(SlidingWindowAnonRateThrottle, "2/min")
+        request = self._anon_request()
+        view = object()
+
+        self.assertTrue(throttle.allow_request(request, view=view))
+        self.assertTrue(throttle.allow_request(request, view=view))
+        self.assertFalse(throttle.allow_request(request, view=view))
+        self.assertEqual(throttle.wait(), 60)
+
+    def test_user_throttle_blocks_after_limit(self):
+        throttle = self._throttle(SlidingWindowUserRateThrottle, "3/min")
+        django_req = self.factory.get("/")
+        django_req.user = self.user
+        request = Request(django_req)
+        view = object()
+
+        for _ in range(3):
+            self.assertTrue(throttle.allow_request(request, view=view))
+        self.assertFalse(throttle.allow_request(request, view=view))
+
+    def test_counter_uses_constant_memory(self):
+        throttle = self._throttle(SlidingWindowAnonRateThrottle, "2/min")
+        request = self._anon_request()
+        view = object()
+
+        throttle.allow_request(request, view=view)
+        throttle.allow_request(request, view=view)
+        throttle.allow_request(request, view=view)
+
+        self.assertEqual(cache.get(throttle.current_key), 2)
+
+    def test_previous_window_decays(self):
+        throttle = self._throttle(SlidingWindowAnonRateThrottle, "2/min")
+        request = self._anon_request()
+        view = object()
+
+        self.assertTrue(throttle.allow_request(request, view=view))
+        self.assertTrue(throttle.allow_request(request, view=view))
+
+        # 15s into the next window, 75% of the previous one still counts.
+        self.now = 675.0
+        self.assertFalse(throttle.allow_request(request, view=view))
+        self.assertEqual(throttle.wait(), 15)
+
+        # Halfway through, only one of the previous requests still counts.
+        self.now = 690.0
+        self.assertTrue(throttle.allow_request(request, view=view))
+        self.assertFalse(throttle.allow_request(request, view=view))
+
+
+class SharedCacheWarningTests(APITestCase):
+    local: ClassVar[dict] = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    redis: ClassVar[dict] = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": "redis://localhost:6379/0",
+        }
+    }
+
+    def test_warns_about_a_per_process_cache_outside_debug(self):
+        with override_settings(DEBUG=False, CACHES=self.local):
+            with self.assertLogs("authentication", "WARNING"):
+                self.assertTrue(warn_if_cache_not_shared())
+
+        with override_settings(DEBUG=True, CACHES=self.local):
+            self.assertFalse(warn_if_cache_not_shared())
+        with override_settings(DEBUG=False, CACHES=self.redis):
+            self.assertFalse(warn_if_cache_not_shared())
@@ -0,0 +1,50 @@
+from unittest import mock
+
+from django.test import RequestFactory
+from rest_framework.request import Request
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.authentication import CookiesJWTAuthentication
+from authentication.tests.helpers import sample_user
+from personal_finance_api.middleware import AuthRedirectMiddleware
+
+
+class RequestTokenValidationTests(APITestCase):
+    def setUp(self):
+        self.user = sample_user(username="tokenuser", password="password")
+        self.factory = RequestFactory()
+        self.middleware = AuthRedirectMiddleware(lambda request: None)
+
+    def _request(self, token):
+        request = self.factory.get("/api/")
+        request.COOKIES["access_token"] = token
+        return request
+
+    def test_token_is_verified_once_per_request(self):
+        request = self._request(str(AccessToken.for_user(self.user)))
+
+        with mock.patch.object(
+            JWTAuthentication,
+            "get_validated_token",
+            autospec=True,
+            side_effect=JWTAuthentication.get_validated_token,
+        ) as validate:
+            self.assertTrue(self.middleware._is_authenticated(request))
+            user, _token = CookiesJWTAuthentication().authenticate(Request(request))
+
+        self.assertEqual(validate.call_count, 1)
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_invalid_token_is_rejected_by_both(self):
+        request = self._request("not-a-token")
+
+        self.assertFalse(self.middleware._is_authenticated(request))
+        self.assertIsNone(CookiesJWTAuthentication().authenticate(Request(request)))
+
+    def test_no_session_lookup_without_session_cookie(self):
+        request = self.factory.get("/api/")
+
+        self.assertFalse(self.middleware._is_authenticated(request))
+        self.assertFalse(hasattr(request, "user"))
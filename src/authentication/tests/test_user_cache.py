@@ -0,0 +1,107 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from authentication.tests.helpers import configure_api_client, sample_user
+from authentication.user_cache import user_cache
+from personal_finance_api.db_router import read_from_primary
+
+
+class CachedUserAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.clear_local()
+        self.user = sample_user(username="cacheduser", password="password")
+        self.profile_url = "/api/users/profile/"
+        configure_api_client(self.client, user=self.user)
+
+    def test_warm_cache_does_no_auth_queries(self):
+        response = self.client.get(self.profile_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.profile_url)
+        self.assertEqual(response.data["username"], "cacheduser")
+
+    def test_shared_cache_serves_other_processes(self):
+        self.client.get(self.profile_url)
+        user_cache.clear_local()
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.profile_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_profile_update_invalidates_cached_user(self):
+        self.client.get(self.profile_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                self.profile_url, {"first_name": "Updated"}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(self.profile_url)
+        self.assertEqual(response.data["first_name"], "Updated")
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(self.profile_url)
+
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        response = self.client.get(self.profile_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_shared_cache_does_not_store_the_password(self):
+        self.client.get(self.profile_url)
+
+        values = cache.get(user_cache._key(self.user.pk))
+        self.assertEqual(values["username"], "cacheduser")
+        self.assertNotIn("password", values)
+
+        cached = user_cache.get(self.user.pk)
+        self.assertEqual(cached.get_deferred_fields(), {"password"})
+        self.assertTrue(cached.check_password("password"))
+
+    def test_saving_a_cached_user_keeps_the_password(self):
+        self.client.get(self.profile_url)
+
+        cached = user_cache.get(self.user.pk)
+        cached.first_name = "Saved"
+        cached.save()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "Saved")
+        self.assertTrue(self.user.check_password("password"))
+
+    def test_invalidation_waits_for_commit(self):
+        self.client.get(self.profile_url)
+
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            self.user.is_active = False
+            self.user.save()
+            self.assertIsNotNone(cache.get(user_cache._key(self.user.pk)))
+
+        self.assertIsNone(cache.get(user_cache._key(self.user.pk)))
+
+    def test_cache_miss_reads_the_primary(self):
+        routed = []
+        get_user = JWTAuthentication.get_user
+
+        def spy(authentication, validated_token):
+            routed.append(read_from_primary.get())
+            return get_user(authentication, validated_token)
+
+        token = read_from_primary.set(False)
+        try:
+            with mock.patch.object(JWTAuthentication, "get_user", spy):
+                self.client.get(self.profile_url)
+        finally:
+            read_from_primary.reset(token)
+
+        self.assertEqual(routed, [True])
@@ -0,0 +1,68 @@
+from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+
+from core.metrics import THROTTLE_REJECTIONS
+
+
+class SlidingWindowThrottleMixin:
+    """
+    Sliding-window counter throttle for ``SimpleRateThrottle`` subclasses.
+
+    Instead of a list of request timestamps, each key keeps one integer counter
+    per fixed window. The request rate is estimated from the current window's
+    counter plus the previous window's counter weighted by how much of it
+    still overlaps the sliding window. Counters are updated with atomic
+    ``add``/``incr`` on the cache backend, so every gunicorn worker sharing
+    the cache enforces the same limit with constant memory per key.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window, offset = divmod(self.now, self.duration)
+        self.current_key = f"{self.key}:{int(window)}"
+        self.weight = 1 - offset / self.duration
+
+        if not self.cache.add(self.current_key, 1, self.duration * 2):
+            try:
+                self.current = self.cache.incr(self.current_key)
+            except ValueError:
+                # The counter expired between ``add`` and ``incr``.
+                self.cache.add(self.current_key, 1, self.duration * 2)
+                self.current = 1
+        else:
+            self.current = 1
+        self.previous = self.cache.get(f"{self.key}:{int(window) - 1}", 0)
+
+        if self.previous * self.weight + self.current > self.num_requests:
+            # Rejected requests do not count against the limit.
+            try:
+                self.cache.decr(self.current_key)
+            except ValueError:
+                pass
+            THROTTLE_REJECTIONS.labels(self.scope).inc()
+            return self.throttle_failure()
+        return True
+
+    def wait(self):
+        current = self.current - 1
+        if current >= self.num_requests or not self.previous:
+            # Nothing to decay: wait for the next window.
+            return self.duration * self.weight
+
+        # Wait until the previous window's weight has decayed enough.
+        weight_needed = (self.num_requests - current - 1) / self.previous
+        return max(0.0, (self.weight - weight_needed) * self.duration)
+
+
+class SlidingWindowAnonRateThrottle(SlidingWindowThrottleMixin, AnonRateThrottle):
+    pass
+
+
+class SlidingWindowUserRateThrottle(SlidingWindowThrottleMixin, UserRateThrottle):
+    pass
@@ -0,0 +1,22 @@
+from django.db import transaction
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authentication.blacklist import blacklist_filter
+
+
+class FilteredRefreshToken(RefreshToken):
+    """
+    Refresh token whose blacklist check consults ``blacklist_filter`` first and
+    only queries the blacklist tables when the filter reports a possible hit.
+    """
+
+    def check_blacklist(self) -> None:
+        if blacklist_filter.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        result = super().blacklist()
+        jti = self.payload[api_settings.JTI_CLAIM]
+        transaction.on_commit(lambda: blacklist_filter.add(jti))
+        return result
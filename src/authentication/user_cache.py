@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from core.metrics import record_cache_lookup
+
+
+class UserCache:
+    """
+    Two-level cache of authenticated users keyed by user id.
+
+    A small in-process LRU with a short TTL serves hot users without any I/O;
+    misses fall back to the shared Django cache and only then to the database.
+    Once a save or delete of a user commits, both levels are dropped for this
+    process and the shared entry for everyone else, so other workers serve a
+    stale user for at most ``AUTH_USER_LOCAL_CACHE_TIMEOUT`` seconds.
+
+    Only field values are cached, never the password hash: cached users come
+    back with ``password`` deferred and load it from the database on access.
+    """
+
+    key_prefix = "auth:user:"
+    excluded_fields = ("password",)
+
+    def __init__(self):
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def local_timeout(self) -> float:
+        return getattr(settings, "AUTH_USER_LOCAL_CACHE_TIMEOUT", 5)
+
+    @property
+    def local_size(self) -> int:
+        return getattr(settings, "AUTH_USER_LOCAL_CACHE_SIZE", 1024)
+
+    @property
+    def shared_timeout(self) -> int:
+        return getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 300)
+
+    def _key(self, user_id) -> str:
+        return f"{self.key_prefix}{user_id}"
+
+    def get(self, user_id):
+        user_id = str(user_id)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._local.get(user_id)
+            if entry is not None:
+                expires_at, user = entry
+                if expires_at > now:
+                    self._local.move_to_end(user_id)
+                    record_cache_lookup("auth_user", hit=True)
+                    return self._load(user)
+                del self._local[user_id]
+
+        values = cache.get(self._key(user_id))
+        record_cache_lookup("auth_user", hit=values is not None)
+        if values is None:
+            return None
+        self._set_local(user_id, values)
+        return self._load(values)
+
+    def set(self, user_id, user) -> None:
+        user_id = str(user_id)
+        values = self._dump(user)
+        cache.set(self._key(user_id), values, self.shared_timeout)
+        self._set_local(user_id, values)
+
+    def _dump(self, user) -> dict:
+        skipped = {*self.excluded_fields, *user.get_deferred_fields()}
+        return {
+            field.attname: getattr(user, field.attname)
+            for field in user._meta.concrete_fields
+            if field.attname not in skipped
+        }
+
+    def _load(self, values: dict):
+        # ``from_db`` defers the fields missing from ``values``, so saving the
+        # user only writes the cached fields back.
+        return get_user_model().from_db("default", list(values), list(values.values()))
+
+    def _set_local(self, user_id: str, values: dict) -> None:
+        if self.local_timeout <= 0:
+            return
+
+        with self._lock:
+            self._local[user_id] = (time.monotonic() + self.local_timeout, values)
+            self._local.move_to_end(user_id)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    def invalidate(self, user_id) -> None:
+        user_id = str(user_id)
+        with self._lock:
+            self._local.pop(user_id, None)
+        cache.delete(self._key(user_id))
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+
+user_cache = UserCache()
@@ -5,11 +5,11 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.throttling import AnonRateThrottle
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.utils.translation import gettext_lazy as _
 
+from authentication.throttling import SlidingWindowAnonRateThrottle
+from authentication.tokens import FilteredRefreshToken
 from users.serializers import UserRegistrationSerializer, UserSerializer
 
 User = get_user_model()
@@ -68,11 +68,11 @@ class RegisterView(generics.CreateAPIView):
     authentication_classes = []
     permission_classes = [AllowAny]
     serializer_class = UserRegistrationSerializer
-    throttle_classes = [AnonRateThrottle]
+    throttle_classes = (SlidingWindowAnonRateThrottle,)
 
 
 class LoginView(TokenObtainPairView):
-    throttle_classes = [AnonRateThrottle]
+    throttle_classes = (SlidingWindowAnonRateThrottle,)
 
     def post(self, request, *args, **kwargs):
         try:
@@ -142,7 +142,7 @@ def logout(request):
 
         if refresh_token:
             try:
-                RefreshToken(refresh_token).blacklist()
+                FilteredRefreshToken(refresh_token).blacklist()
             except Exception:
                 pass
 
@@ -0,0 +1,13 @@
+"""
+Performance benchmarks. They are not collected by pytest; run them from
+``src/`` as modules, e.g. ``python -m benchmarks.db_pool``.
+"""
+
+import os
+
+
+def setup_django(settings_module: str = "personal_finance_api.settings") -> None:
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
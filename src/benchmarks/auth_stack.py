@@ -0,0 +1,71 @@
+"""
+Per-request overhead of the authentication stack: ``AuthRedirectMiddleware``
+followed by ``CookiesJWTAuthentication`` for a request carrying an access
+token cookie. ``legacy`` replays the previous behaviour (a PyJWT decode in the
+middleware and a second simplejwt validation in DRF); ``current`` uses the
+request-scoped validation shared by both. Users are served from the warm
+user cache, so no database is needed::
+
+    python -m benchmarks.auth_stack --iterations 20000
+"""
+
+import argparse
+import time
+import uuid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    from benchmarks import setup_django
+
+    setup_django()
+
+    import jwt
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.test import RequestFactory
+    from rest_framework.request import Request
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from authentication.authentication import CookiesJWTAuthentication
+    from authentication.user_cache import user_cache
+    from personal_finance_api.middleware import AuthRedirectMiddleware
+
+    user = get_user_model()(id=uuid.uuid4(), username="bench", email="b@b.com")
+    user_cache.set(user.pk, user)
+    token = str(AccessToken.for_user(user))
+
+    factory = RequestFactory()
+    middleware = AuthRedirectMiddleware(lambda request: None)
+    authentication = CookiesJWTAuthentication()
+    legacy_validation = JWTAuthentication()
+
+    def legacy(request):
+        jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+        authentication.get_user(legacy_validation.get_validated_token(token))
+
+    def current(request):
+        middleware._is_authenticated(request)
+        authentication.authenticate(Request(request))
+
+    for name, stack in (("legacy", legacy), ("current", current)):
+        requests = []
+        for _ in range(args.iterations):
+            request = factory.get("/api/")
+            request.COOKIES["access_token"] = token
+            requests.append(request)
+
+        started = time.perf_counter()
+        for request in requests:
+            stack(request)
+        elapsed = time.perf_counter() - started
+
+        print(f"{name:>8}: {elapsed / args.iterations * 1e6:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Requests/sec of the request connection lifecycle with and without the
+psycopg connection pool.
+
+Each simulated request does what a gunicorn worker does around a view:
+``request_started``, one query, ``request_finished`` (which closes the
+connection or hands it back to the pool). Every mode runs in a fresh
+interpreter so the ``DB_POOL`` / ``DB_CONN_MAX_AGE`` settings apply::
+
+    python -m benchmarks.db_pool --requests 2000 --threads 8
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MODES = {
+    "direct": {"DB_POOL": "0", "DB_CONN_MAX_AGE": "0"},
+    "pooled": {"DB_POOL": "1"},
+}
+
+
+def run_mode(requests: int, threads: int) -> dict:
+    from benchmarks import setup_django
+
+    setup_django()
+
+    from django.core import signals
+    from django.db import connection
+
+    from core.db import pool_stats
+
+    def one_request(_):
+        signals.request_started.send(sender=None)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+        finally:
+            signals.request_finished.send(sender=None)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(one_request, range(threads)))  # warm up
+
+        started = time.perf_counter()
+        list(executor.map(one_request, range(requests)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "threads": threads,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(requests / elapsed, 1),
+        "pool": pool_stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.requests, args.threads)))
+        return
+
+    results = {}
+    for mode, env in MODES.items():
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.db_pool",
+                "--mode",
+                mode,
+                "--requests",
+                str(args.requests),
+                "--threads",
+                str(args.threads),
+            ],
+            env={**os.environ, **env},
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[mode] = json.loads(output)
+        print(f"{mode:>8}: {results[mode]['requests_per_second']} req/s")
+
+    speedup = (
+        results["pooled"]["requests_per_second"]
+        / results["direct"]["requests_per_second"]
+    )
+    print(f" speedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
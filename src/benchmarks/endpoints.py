@@ -0,0 +1,298 @@
+"""
+Latency percentiles and throughput of the main API endpoints over a large
+synthetic dataset.
+
+A throwaway test database is created and seeded with factory_boy (``--keepdb``
+keeps it, and its data, for the next run). Each endpoint is then called
+``--requests`` times through the full middleware stack, rotating over the
+seeded users, and p50/p95/p99 latency and requests/sec are reported. Results
+are written as JSON; ``--compare`` flags endpoints whose percentiles regressed
+beyond ``--tolerance`` against an earlier run and exits non-zero::
+
+    python -m benchmarks.endpoints --users 1000 --transactions 50000 \\
+        --output before.json
+    python -m benchmarks.endpoints --keepdb --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import UTC, date, datetime
+
+USERNAME_PREFIX = "bench"
+PERCENTILES = {"p50_ms": 49, "p95_ms": 94, "p99_ms": 98}
+
+
+def seed(users: int, transactions: int, seed_value: int) -> None:
+    from django.contrib.auth import get_user_model
+    from factory.random import randgen, reseed_random
+
+    from transactions.models import Account, Category, Transaction
+    from transactions.tests.factories import (
+        AccountFactory,
+        CategoryFactory,
+        TransactionFactory,
+        UserFactory,
+    )
+
+    reseed_random(seed_value)
+    User = get_user_model()
+    if User.objects.filter(username__startswith=USERNAME_PREFIX).count() >= users:
+        return
+
+    created_users = User.objects.bulk_create(
+        UserFactory.build(username=f"{USERNAME_PREFIX}{index}")
+        for index in range(users)
+    )
+    accounts = Account.objects.bulk_create(
+        AccountFactory.build(user=user) for user in created_users for _ in range(2)
+    )
+    categories = Category.objects.bulk_create(
+        CategoryFactory.build(user=user, name=f"{type_.label} {index}", type=type_)
+        for user in created_users
+        for type_ in Category.TypeChoices
+        for index in range(3)
+    )
+
+    accounts_by_user = defaultdict(list)
+    for account in accounts:
+        accounts_by_user[account.user_id].append(account)
+    categories_by_user = defaultdict(lambda: defaultdict(list))
+    for category in categories:
+        categories_by_user[category.user_id][category.type].append(category)
+
+    batch = []
+    for index in range(transactions):
+        user = created_users[index % users]
+        type_ = randgen.choice(Category.TypeChoices.values)
+        batch.append(
+            TransactionFactory.build(
+                user=user,
+                account=randgen.choice(accounts_by_user[user.pk]),
+                category=randgen.choice(categories_by_user[user.pk][type_]),
+                type=type_,
+            )
+        )
+        if len(batch) == 5000:
+            Transaction.objects.bulk_create(batch)
+            batch = []
+    Transaction.objects.bulk_create(batch)
+
+
+class Fixtures:
+    """Users to rotate over, with their tokens, accounts and categories."""
+
+    def __init__(self, sample_size: int):
+        from django.contrib.auth import get_user_model
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from transactions.models import Account, Category
+
+        users = list(
+            get_user_model()
+            .objects.filter(username__startswith=USERNAME_PREFIX)
+            .order_by("username")[:sample_size]
+        )
+        self.tokens = [str(AccessToken.for_user(user)) for user in users]
+        self.user_ids = [user.pk for user in users]
+
+        self.accounts = defaultdict(list)
+        for account in Account.objects.filter(user__in=users).only("id", "user_id"):
+            self.accounts[account.user_id].append(str(account.pk))
+        self.categories = defaultdict(list)
+        for category in Category.objects.filter(
+            user__in=users, type=Category.TypeChoices.EXPENSE
+        ).only("id", "user_id"):
+            self.categories[category.user_id].append(str(category.pk))
+
+    def user_id(self, index: int):
+        return self.user_ids[index % len(self.user_ids)]
+
+    def token(self, index: int) -> str:
+        return self.tokens[index % len(self.tokens)]
+
+
+def endpoints(fixtures: Fixtures) -> dict:
+    from django.urls import reverse
+
+    today = date.today()
+    month = {
+        "start_date": today.replace(day=1).isoformat(),
+        "end_date": today.isoformat(),
+    }
+    year = {
+        "start_date": today.replace(year=today.year - 1).isoformat(),
+        "end_date": today.isoformat(),
+    }
+
+    def transaction_data(index, **extra):
+        user_id = fixtures.user_id(index)
+        account = fixtures.accounts[user_id][0]
+        category = fixtures.categories[user_id][0]
+        return {
+            "account_id": account,
+            "category_id": category,
+            "type": "EXPENSE",
+            "description": "Benchmark",
+            "value": "120.00",
+            "date": today.isoformat(),
+            **extra,
+        }
+
+    def account_url(index):
+        account = fixtures.accounts[fixtures.user_id(index)][0]
+        return reverse("transactions:accounts-detail", args=[account])
+
+    return {
+        "list": lambda client, index: client.get(
+            reverse("transactions:transactions-list"), month
+        ),
+        "summary": lambda client, index: client.get(
+            reverse("transactions:transactions-summary"), year
+        ),
+        "dashboard": lambda client, index: client.get(
+            reverse("transactions:dashboard"), year
+        ),
+        "account_balance": lambda client, index: client.get(account_url(index)),
+        "create": lambda client, index: client.post(
+            reverse("transactions:transactions-list"),
+            transaction_data(index),
+            format="json",
+        ),
+        "installment_create": lambda client, index: client.post(
+            reverse("transactions:transactions-list"),
+            transaction_data(index, installment_total=12),
+            format="json",
+        ),
+    }
+
+
+def measure(call, fixtures: Fixtures, requests: int, warmup: int) -> dict:
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+
+    def run(index):
+        client.cookies["access_token"] = fixtures.token(index)
+        return call(client, index)
+
+    for index in range(warmup):
+        run(index)
+
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for index in range(requests):
+        request_started = time.perf_counter()
+        response = run(index)
+        latencies.append(time.perf_counter() - request_started)
+        if response.status_code >= 400:
+            errors += 1
+    elapsed = time.perf_counter() - started
+
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    result = {name: round(cuts[cut] * 1000, 3) for name, cut in PERCENTILES.items()}
+    result["mean_ms"] = round(statistics.fmean(latencies) * 1000, 3)
+    result["throughput_rps"] = round(requests / elapsed, 1)
+    result["errors"] = errors
+    return result
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, current in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if previous is None:
+            continue
+        for metric in PERCENTILES:
+            if current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{name} {metric}: {previous[metric]:.2f} -> "
+                    f"{current[metric]:.2f} ms"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--transactions", type=int, default=50000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="*", help="Endpoints to run.")
+    parser.add_argument("--keepdb", action="store_true")
+    parser.add_argument("--output", help="Write the results JSON to this file.")
+    parser.add_argument("--compare", help="Results JSON of a previous run.")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    # Every request comes from a handful of users; keep them under the limit.
+    os.environ.setdefault("THROTTLE_USER_RATE", "100000000/day")
+
+    from benchmarks import setup_django
+
+    setup_django()
+
+    from django.db import connection
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+    )
+
+    setup_test_environment()
+    old_config = setup_databases(
+        verbosity=0, interactive=False, keepdb=args.keepdb, serialized_aliases=[]
+    )
+    try:
+        started = time.perf_counter()
+        seed(args.users, args.transactions, args.seed)
+        print(f"seeded in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+        fixtures = Fixtures(sample_size=min(args.users, args.requests))
+        results = {
+            "meta": {
+                "timestamp": datetime.now(UTC).isoformat(),
+                "python": platform.python_version(),
+                "database": connection.vendor,
+                "users": args.users,
+                "transactions": args.transactions,
+                "requests": args.requests,
+                "seed": args.seed,
+            },
+            "endpoints": {},
+        }
+        for name, call in endpoints(fixtures).items():
+            if args.only and name not in args.only:
+                continue
+            result = measure(call, fixtures, args.requests, args.warmup)
+            results["endpoints"][name] = result
+            print(
+                f"{name:>20}: p50 {result['p50_ms']:8.2f} ms  "
+                f"p95 {result['p95_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  "
+                f"{result['throughput_rps']:8.1f} req/s  errors {result['errors']}"
+            )
+    finally:
+        teardown_databases(old_config, verbosity=0, keepdb=args.keepdb)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            regressions = compare(results, json.load(baseline), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
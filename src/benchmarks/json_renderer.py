@@ -0,0 +1,80 @@
+"""
+Rendering throughput of ``ORJSONRenderer`` against DRF's ``JSONRenderer`` on
+a page of serialized transactions (UUIDs, Decimals, dates and nested
+objects), plus raw ``summary``-style Decimals. No database is needed::
+
+    python -m benchmarks.json_renderer --rows 20 --iterations 5000
+"""
+
+import argparse
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    from benchmarks import setup_django
+
+    setup_django()
+
+    from rest_framework.renderers import JSONRenderer
+
+    from core.renderers import ORJSONRenderer
+    from transactions.models import Account, Category, Transaction
+    from transactions.serializers import TransactionSerializer
+
+    account = Account(id=uuid.uuid4(), name="Checking", account_type="CHECKING")
+    category = Category(id=uuid.uuid4(), name="Food", color="#FF0000", type="EXPENSE")
+    transactions = [
+        Transaction(
+            id=uuid.uuid4(),
+            account=account,
+            category=category,
+            description=f"Groceries {index}",
+            value=Decimal("123.45") + index,
+            date=date(2024, 1, 1) + timedelta(days=index),
+            type="EXPENSE",
+            installment_group_id=uuid.uuid4(),
+            installment_current=1,
+            installment_total=3,
+            notes="",
+        )
+        for index in range(args.rows)
+    ]
+    page = {
+        "count": args.rows,
+        "next": None,
+        "previous": None,
+        "results": TransactionSerializer(transactions, many=True).data,
+    }
+    summary = {
+        "total_income": Decimal("5300.00"),
+        "total_expense": Decimal("1234.56"),
+        "balance": Decimal("4065.44"),
+    }
+
+    for name, data in (("list page", page), ("summary", summary)):
+        expected = JSONRenderer().render(data)
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            assert renderer.render(data) == expected
+
+            started = time.perf_counter()
+            for _ in range(args.iterations):
+                renderer.render(data)
+            elapsed = time.perf_counter() - started
+
+            print(
+                f"{name:>10} {type(renderer).__name__:>15}: "
+                f"{elapsed / args.iterations * 1e6:8.1f} us/render  "
+                f"{len(expected) * args.iterations / elapsed / 1e6:7.1f} MB/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import hmac
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.authentication import BaseAuthentication
+
+
+class MetricsScraperAuthentication(BaseAuthentication):
+    """
+    Authenticates Prometheus scrapes sending ``Authorization: Bearer <token>``
+    with the token in ``METRICS_SCRAPE_TOKEN``. Scrapers are anonymous; other
+    bearer tokens are left to the next authentication class.
+    """
+
+    keyword = "Bearer"
+
+    def authenticate(self, request):
+        expected = getattr(settings, "METRICS_SCRAPE_TOKEN", "")
+        keyword, _, token = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")
+        if not expected or keyword != self.keyword:
+            return None
+        if not hmac.compare_digest(token.encode(), expected.encode()):
+            return None
+        return AnonymousUser(), None
+
+    def authenticate_header(self, request):
+        return f'{self.keyword} realm="api"'
@@ -0,0 +1,122 @@
+"""
+Change log (transactional outbox) of accounts, categories and transactions.
+
+Write paths call ``record`` / ``record_many`` inside the database transaction
+of the write, with a snapshot of the row as it was written (or as it was just
+before a delete). Consumers read the log incrementally with ``read_changes``,
+through ``/api/changes/`` or the ``consume_changes`` command, remembering the
+``id`` of the last entry they processed.
+
+Ids are assigned when a row is inserted, not when its transaction commits, so
+an entry can become visible after one with a higher id. The feed therefore
+holds back entries younger than ``CHANGE_FEED_SETTLE_SECONDS``, which must
+exceed the longest write transaction. It always reads the primary: on a
+lagging replica a higher id can also show up before a lower one.
+
+``compact`` keeps only the newest entry of each row once entries are older
+than ``CHANGE_LOG_COMPACT_AFTER_DAYS``; a consumer that falls further behind
+than that still ends up with the latest state of every row.
+"""
+
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Exists, Max, Min, OuterRef
+from django.utils import timezone
+
+from core.models import ChangeLogEntry
+from personal_finance_api.db_router import use_primary
+
+Action = ChangeLogEntry.Action
+
+
+def snapshot(instance) -> dict:
+    """
+    The loaded concrete field values of ``instance``, keyed by column name.
+    Deferred fields are left out rather than fetched one query at a time.
+    """
+    deferred = instance.get_deferred_fields()
+    return {
+        field.attname: getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields
+        if field.attname not in deferred
+    }
+
+
+def _entry(instance, action: str) -> ChangeLogEntry:
+    return ChangeLogEntry(
+        user_id=instance.user_id,
+        entity=instance._meta.model_name,
+        entity_id=instance.pk,
+        action=action,
+        data=snapshot(instance),
+    )
+
+
+def record(instance, action: str) -> None:
+    _entry(instance, action).save()
+
+
+def record_many(instances, action: str) -> None:
+    ChangeLogEntry.objects.bulk_create(
+        [_entry(instance, action) for instance in instances]
+    )
+
+
+def record_event(user, entity: str, action: str, data: dict) -> None:
+    """
+    A change to many rows at once, recorded as one entry (e.g. a category
+    merge) instead of one per row. It has its own ``entity_id``, so
+    compaction never folds it into another entry.
+    """
+    ChangeLogEntry.objects.create(
+        user=user, entity=entity, entity_id=uuid.uuid4(), action=action, data=data
+    )
+
+
+def read_changes(after: int = 0, limit: int = 100, user=None):
+    """
+    Up to ``limit`` settled entries with an id above ``after``, oldest first,
+    of ``user`` or of everyone. Returns ``(entries, has_more)``.
+    """
+    settled = timezone.now() - timedelta(seconds=settings.CHANGE_FEED_SETTLE_SECONDS)
+    queryset = ChangeLogEntry.objects.filter(pk__gt=after, created_at__lte=settled)
+    if user is not None:
+        queryset = queryset.filter(user=user)
+
+    with use_primary():
+        entries = list(queryset.order_by("pk")[: limit + 1])
+    return entries[:limit], len(entries) > limit
+
+
+def compact(older_than_days: int | None = None, batch_size: int = 10000) -> int:
+    """
+    Delete the entries older than ``older_than_days`` that a newer entry of
+    the same row supersedes, ``batch_size`` ids at a time. Returns how many.
+    """
+    if older_than_days is None:
+        older_than_days = settings.CHANGE_LOG_COMPACT_AFTER_DAYS
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    bounds = ChangeLogEntry.objects.filter(created_at__lt=cutoff).aggregate(
+        first=Min("pk"), last=Max("pk")
+    )
+    if bounds["last"] is None:
+        return 0
+
+    newer = ChangeLogEntry.objects.filter(
+        entity=OuterRef("entity"),
+        entity_id=OuterRef("entity_id"),
+        pk__gt=OuterRef("pk"),
+    )
+    deleted, start = 0, bounds["first"] - 1
+    while start < bounds["last"]:
+        end = min(start + batch_size, bounds["last"])
+        count, _ = (
+            ChangeLogEntry.objects.filter(pk__gt=start, pk__lte=end)
+            .filter(Exists(newer))
+            .delete()
+        )
+        deleted += count
+        start = end
+    return deleted
@@ -0,0 +1,164 @@
+"""
+Response body encoders for ``CompressionMiddleware``.
+
+gzip is always available; brotli and zstd are used when the ``brotli`` and
+``zstandard`` packages are installed. Every encoder works both on a whole body
+and incrementally, so streamed exports are compressed chunk by chunk without
+buffering the response.
+"""
+
+import time
+import zlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Levels tuned for dynamic responses: close to the best ratio per CPU second.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/openapi",
+    "application/vnd.oai.openapi",
+    "image/svg+xml",
+)
+
+
+class _GzipStream:
+    def __init__(self):
+        # wbits 16 + MAX_WBITS writes a gzip header and trailer.
+        self._compressor = zlib.compressobj(
+            GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+        )
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self):
+        self._compressor = brotli.Compressor(
+            mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY
+        )
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+def _encoders() -> dict:
+    encoders = {}
+    if zstandard is not None:
+        encoders["zstd"] = _ZstdStream
+    if brotli is not None:
+        encoders["br"] = _BrotliStream
+    encoders["gzip"] = _GzipStream
+    return encoders
+
+
+# Content-Encoding -> incremental encoder, in order of preference.
+ENCODERS = _encoders()
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """``"gzip;q=0.5, br"`` -> ``{"gzip": 0.5, "br": 1.0}``."""
+    accepted = {}
+    for part in header.split(","):
+        coding, *params = (item.strip() for item in part.split(";"))
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding.lower()] = quality
+    return accepted
+
+
+def negotiate_encoding(header: str, available=None) -> str | None:
+    """
+    Pick the encoding for a request's ``Accept-Encoding`` header: the highest
+    q-value wins, ties go to the server's order of preference. Returns
+    ``None`` when the response should be sent as is.
+    """
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for coding in available if available is not None else ENCODERS:
+        quality = accepted.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.split(";")[0].strip().lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) or content_type.endswith("+json")
+
+
+def compress(encoding: str, data: bytes) -> bytes:
+    encoder = ENCODERS[encoding]()
+    return encoder.compress(data) + encoder.flush()
+
+
+def compress_stream(encoding: str, chunks, on_finish=None):
+    """
+    Compress an iterable of chunks, yielding output as the encoder produces
+    it. Chunks the encoder buffers produce no output, so a stream of small
+    rows is not turned into a stream of tiny compressed blocks.
+
+    ``on_finish(original_size, compressed_size, cpu_time)`` is called once
+    the stream is exhausted; ``cpu_time`` only covers the encoder, not the
+    production of ``chunks``.
+    """
+    encoder = ENCODERS[encoding]()
+    original = compressed = 0
+    cpu_time = 0.0
+    for chunk in chunks:
+        started = time.thread_time()
+        output = encoder.compress(chunk)
+        cpu_time += time.thread_time() - started
+        original += len(chunk)
+        if output:
+            compressed += len(output)
+            yield output
+
+    started = time.thread_time()
+    output = encoder.flush()
+    cpu_time += time.thread_time() - started
+    compressed += len(output)
+    if on_finish is not None:
+        on_finish(original, compressed, cpu_time)
+    yield output
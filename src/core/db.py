@@ -0,0 +1,35 @@
+from django.db import connections
+
+
+def pool_stats(alias: str = "default") -> dict | None:
+    """
+    Snapshot of the psycopg connection pool behind ``alias``, or ``None`` when
+    the alias is not pooled (``DB_POOL`` disabled or a non-Postgres backend).
+    """
+    pool = getattr(connections[alias], "pool", None)
+    if pool is None:
+        return None
+
+    stats = pool.get_stats()
+    size = stats.get("pool_size", 0)
+    available = stats.get("pool_available", 0)
+    requests = stats.get("requests_num", 0)
+    wait_ms = stats.get("requests_wait_ms", 0)
+
+    return {
+        "alias": alias,
+        "min_size": pool.min_size,
+        "max_size": pool.max_size,
+        "size": size,
+        "available": available,
+        "in_use": size - available,
+        "waiting": stats.get("requests_waiting", 0),
+        "requests": requests,
+        "requests_queued": stats.get("requests_queued", 0),
+        "requests_errors": stats.get("requests_errors", 0),
+        "acquire_wait_ms_total": wait_ms,
+        "acquire_wait_ms_avg": round(wait_ms / requests, 3) if requests else 0.0,
+        "connections_opened": stats.get("connections_num", 0),
+        "connections_lost": stats.get("connections_lost", 0),
+        "connections_errors": stats.get("connections_errors", 0),
+    }
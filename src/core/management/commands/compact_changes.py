@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from core.changes import compact
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete change log entries superseded by a newer entry of the same "
+        "row once they are older than CHANGE_LOG_COMPACT_AFTER_DAYS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        deleted = compact(options["older_than_days"], options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Compacted {deleted} change log entries.")
+        )
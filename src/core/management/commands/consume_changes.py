@@ -0,0 +1,60 @@
+import json
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from core.changes import read_changes
+from core.serializers import ChangeLogEntrySerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the change log after a cursor as JSON lines, in batches, until "
+        "caught up. With --cursor-file the position is kept between runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--after", type=int, default=None, help="Start after this entry id."
+        )
+        parser.add_argument(
+            "--cursor-file",
+            help="Read the starting cursor from this file (unless --after is "
+            "given) and write the new one to it after every batch.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--user", help="Only this user's changes.")
+
+    def handle(self, *args, **options):
+        cursor_file = Path(options["cursor_file"]) if options["cursor_file"] else None
+        after = options["after"]
+        if after is None:
+            after = 0
+            if cursor_file and cursor_file.exists():
+                try:
+                    after = int(cursor_file.read_text().strip() or 0)
+                except ValueError as exc:
+                    raise CommandError(f"Invalid cursor file: {exc}") from exc
+
+        user = None
+        if options["user"]:
+            user = get_user_model().objects.filter(pk=options["user"]).first()
+            if user is None:
+                raise CommandError(f"User {options['user']} does not exist.")
+
+        read, has_more = 0, True
+        while has_more:
+            entries, has_more = read_changes(after, options["batch_size"], user=user)
+            if not entries:
+                break
+            for entry in ChangeLogEntrySerializer(entries, many=True).data:
+                self.stdout.write(json.dumps(entry, cls=DjangoJSONEncoder))
+            # Only after the batch was written, so a crash re-reads it.
+            after = entries[-1].pk
+            read += len(entries)
+            if cursor_file:
+                cursor_file.write_text(f"{after}\n")
+
+        self.stderr.write(f"Read {read} changes; the cursor is {after}.")
@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.schema import clear_schema_cache, generate_schema
+
+
+class Command(BaseCommand):
+    help = "Write the OpenAPI schema served at /api/schema/ to OPENAPI_SCHEMA_FILE."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output", help="Write here instead of OPENAPI_SCHEMA_FILE."
+        )
+
+    def handle(self, *args, **options):
+        output = options["output"] or getattr(settings, "OPENAPI_SCHEMA_FILE", None)
+        if not output:
+            raise CommandError("Set OPENAPI_SCHEMA_FILE or pass --output.")
+
+        content = generate_schema()
+        Path(output).write_bytes(content)
+        clear_schema_cache()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote {len(content)} bytes of schema to {output}.")
+        )
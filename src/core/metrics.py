@@ -0,0 +1,190 @@
+"""
+Prometheus metrics served by the app itself at ``/api/metrics/``.
+
+Each process records into the default registry. When several gunicorn workers
+serve the app, set ``PROMETHEUS_MULTIPROC_DIR`` to a directory shared by all
+of them (and empty on start): every worker then writes its samples there and
+a scrape of any worker returns the aggregate.
+"""
+
+import os
+
+from django.db import connections
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from core.db import pool_stats
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by resolved view, method and status code.",
+    ["view", "method", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by resolved view.",
+    ["view", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL queries per instrumented request by resolved view.",
+    ["view"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200),
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Application cache lookups by cache and result (hit or miss).",
+    ["cache", "result"],
+)
+THROTTLE_REJECTIONS = Counter(
+    "throttle_rejections_total",
+    "Requests rejected by a throttle, by throttle scope.",
+    ["scope"],
+)
+JOBS_FINISHED = Counter(
+    "jobs_finished_total",
+    "Background job attempts by task and resulting status (SUCCEEDED, QUEUED "
+    "for a retry, or FAILED).",
+    ["task", "status"],
+)
+JOB_DURATION = Histogram(
+    "job_duration_seconds",
+    "Run time of background job attempts by task.",
+    ["task"],
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600),
+)
+RECONCILED_USERS = Counter(
+    "reconciliation_users_total",
+    "Users whose precomputed aggregates were reconciled.",
+)
+RECONCILED_AGGREGATES = Counter(
+    "reconciliation_aggregates_total",
+    "Precomputed aggregates compared with their source rows, by kind and "
+    "outcome (ok, drift or repaired).",
+    ["kind", "outcome"],
+)
+RECONCILIATION_PROGRESS = Gauge(
+    "reconciliation_progress_ratio",
+    "Share of the users of the running (or last) reconciliation done so far.",
+    multiprocess_mode="mostrecent",
+)
+RECONCILIATION_LAST_SUCCESS = Gauge(
+    "reconciliation_last_success_timestamp_seconds",
+    "When the last reconciliation finished.",
+    multiprocess_mode="mostrecent",
+)
+
+# The pools belong to the worker processes, so across workers these add up.
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Connections held by the database pool, by alias.",
+    ["alias"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_AVAILABLE = Gauge(
+    "db_pool_available",
+    "Idle connections in the database pool, by alias.",
+    ["alias"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAITING = Gauge(
+    "db_pool_requests_waiting",
+    "Requests waiting for a pooled connection, by alias.",
+    ["alias"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_REQUESTS = Gauge(
+    "db_pool_requests",
+    "Connections handed out by the pool since it opened, by alias.",
+    ["alias"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = Gauge(
+    "db_pool_acquire_wait_seconds",
+    "Time spent waiting for a pooled connection since the pool opened, by " "alias.",
+    ["alias"],
+    multiprocess_mode="livesum",
+)
+
+
+def view_label(request) -> str:
+    """
+    Name of the view that handled ``request``: ``ViewSet.action`` for
+    viewsets, the class name for class-based views and the function name
+    otherwise.
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+
+    func = match.func
+    view_class = getattr(func, "cls", None) or getattr(func, "view_class", None)
+    if view_class is None:
+        return func.__name__
+
+    actions = getattr(func, "actions", None)
+    if actions:
+        action = actions.get(request.method.lower())
+        if action:
+            return f"{view_class.__name__}.{action}"
+    return view_class.__name__
+
+
+def observe_request(request, response, duration: float, query_count=None) -> None:
+    view = view_label(request)
+    REQUESTS.labels(view, request.method, str(response.status_code)).inc()
+    REQUEST_LATENCY.labels(view, request.method).observe(duration)
+    if query_count is not None:
+        REQUEST_QUERIES.labels(view).observe(query_count)
+
+
+def record_pool_stats() -> None:
+    """Copy the stats of every pooled database alias into the pool gauges."""
+    for alias in connections:
+        stats = pool_stats(alias)
+        if stats is None:
+            continue
+        DB_POOL_SIZE.labels(alias).set(stats["size"])
+        DB_POOL_AVAILABLE.labels(alias).set(stats["available"])
+        DB_POOL_WAITING.labels(alias).set(stats["waiting"])
+        DB_POOL_REQUESTS.labels(alias).set(stats["requests"])
+        DB_POOL_WAIT.labels(alias).set(stats["acquire_wait_ms_total"] / 1000)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_job(task: str, status: str, duration: float) -> None:
+    JOBS_FINISHED.labels(task, status).inc()
+    JOB_DURATION.labels(task).observe(duration)
+
+
+def record_reconciliation(report: dict, done: int, total: int) -> None:
+    """Count one reconciled shard ``report`` and move the progress gauge."""
+    RECONCILED_USERS.inc(report["users"])
+    for kind, checked in report["checked"].items():
+        drift, repaired = report["drift"][kind], report["repaired"][kind]
+        RECONCILED_AGGREGATES.labels(kind, "ok").inc(checked - drift)
+        RECONCILED_AGGREGATES.labels(kind, "drift").inc(drift)
+        RECONCILED_AGGREGATES.labels(kind, "repaired").inc(repaired)
+    RECONCILIATION_PROGRESS.set(done / total if total else 1)
+
+
+def render_latest() -> tuple[bytes, str]:
+    record_pool_stats()
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
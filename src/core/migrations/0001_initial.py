@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:41
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChangeLogEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("entity", models.CharField(max_length=50, verbose_name="Entity")),
+                ("entity_id", models.UUIDField(verbose_name="Entity ID")),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("created", "Created"),
+                            ("updated", "Updated"),
+                            ("deleted", "Deleted"),
+                            ("merged", "Merged"),
+                        ],
+                        max_length=10,
+                        verbose_name="Action",
+                    ),
+                ),
+                (
+                    "data",
+                    models.JSONField(
+                        blank=True,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        null=True,
+                        verbose_name="Data",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Created At"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="changes",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="User",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Change Log Entry",
+                "verbose_name_plural": "Change Log Entries",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "id"], name="core_change_user_id_ce4e15_idx"
+                    ),
+                    models.Index(
+                        fields=["entity", "entity_id", "id"],
+                        name="core_change_entity_55b5b3_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
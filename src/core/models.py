@@ -1,5 +1,9 @@
 import uuid
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 
 
 class BaseModel(models.Model):
@@ -9,3 +13,47 @@ class BaseModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class ChangeLogEntry(models.Model):
+    """
+    One change to a user's data, appended in the same database transaction
+    as the change itself (a transactional outbox), so the log never shows a
+    change that was rolled back nor misses one that was committed. ``id``
+    orders the change feed read by downstream consumers; see ``core.changes``.
+    """
+
+    class Action(models.TextChoices):
+        CREATED = "created", _("Created")
+        UPDATED = "updated", _("Updated")
+        DELETED = "deleted", _("Deleted")
+        MERGED = "merged", _("Merged")
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="changes",
+        verbose_name=_("User"),
+    )
+    entity = models.CharField(max_length=50, verbose_name=_("Entity"))
+    entity_id = models.UUIDField(verbose_name=_("Entity ID"))
+    action = models.CharField(
+        max_length=10, choices=Action.choices, verbose_name=_("Action")
+    )
+    data = models.JSONField(
+        null=True, blank=True, encoder=DjangoJSONEncoder, verbose_name=_("Data")
+    )
+    created_at = models.DateTimeField(
+        default=timezone.now, verbose_name=_("Created At")
+    )
+
+    class Meta:
+        verbose_name = _("Change Log Entry")
+        verbose_name_plural = _("Change Log Entries")
+        indexes = (
+            models.Index(fields=["user", "id"]),
+            models.Index(fields=["entity", "entity_id", "id"]),
+        )
+
+    def __str__(self):
+        return f"{self.entity} {self.entity_id} {self.action}"
@@ -0,0 +1,37 @@
+import codecs
+import io
+import re
+
+import orjson
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+# orjson turns integers beyond 64 bits into floats; json keeps them exact.
+_LONG_NUMBER = re.compile(rb"\d{19}")
+
+
+class ORJSONParser(JSONParser):
+    """
+    ``JSONParser`` backed by orjson for UTF-8 bodies. Other encodings and
+    bodies orjson would treat differently (invalid JSON, very long numbers)
+    are handed to ``JSONParser``, so results and error messages stay the same.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        body = stream.read()
+
+        if _is_utf8(encoding) and not _LONG_NUMBER.search(body):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
+
+
+def _is_utf8(encoding: str) -> bool:
+    try:
+        return codecs.lookup(encoding).name == "utf-8"
+    except LookupError:
+        return False
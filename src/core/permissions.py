@@ -0,0 +1,22 @@
+from django.conf import settings
+from rest_framework.permissions import BasePermission
+
+from core.authentication import MetricsScraperAuthentication
+
+
+class IsAdminOrMetricsScraper(BasePermission):
+    """
+    Allows staff users, and scrapers authenticated with ``METRICS_SCRAPE_TOKEN``.
+    When ``METRICS_ALLOWED_IPS`` is set, scrapes must also come from one of
+    those addresses.
+    """
+
+    def has_permission(self, request, view):
+        if request.user and request.user.is_staff:
+            return True
+        if not isinstance(
+            request.successful_authenticator, MetricsScraperAuthentication
+        ):
+            return False
+        allowed = getattr(settings, "METRICS_ALLOWED_IPS", [])
+        return not allowed or request.META.get("REMOTE_ADDR") in allowed
@@ -0,0 +1,48 @@
+from decimal import Decimal
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in ``JSONRenderer`` backed by orjson, producing the same bytes.
+
+    Values orjson does not handle natively (Decimal, dates and datetimes, lazy
+    strings, querysets, ...) go through ``encoder_class.default`` exactly as
+    with ``json.dumps``. Anything orjson cannot reproduce byte-for-byte falls
+    back to ``JSONRenderer``: indented output, non-string dict keys, integers
+    beyond 64 bits, and Decimals whose float form Python would print in
+    exponent notation (or NaN/Infinity, which strict mode rejects).
+    """
+
+    option = orjson.OPT_PASSTHROUGH_DATETIME
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        encoder = self.encoder_class()
+
+        def default(obj):
+            if isinstance(obj, Decimal):
+                value = float(obj)
+                # Python's float repr switches to exponents outside this range.
+                if value and not 1e-4 <= abs(value) < 1e16:
+                    raise TypeError
+                return value
+            return encoder.default(obj)
+
+        try:
+            ret = orjson.dumps(data, default=default, option=self.option)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same JavaScript-safe escaping as ``JSONRenderer``.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
@@ -0,0 +1,100 @@
+"""
+OpenAPI schema served as a precomputed artifact.
+
+Introspecting every view and serializer is slow, so the schema is generated
+once: ahead of time into ``OPENAPI_SCHEMA_FILE`` by the
+``generate_openapi_schema`` command, or else on first access into the cache.
+drf_yasg is only imported when the schema or the docs page is generated, so
+workers that never serve the docs do not pay for it.
+"""
+
+import hashlib
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+SCHEMA_CACHE_KEY = "openapi:schema"
+
+
+class SchemaDocument(NamedTuple):
+    content: bytes
+    etag: str
+
+
+_document = None
+_lock = threading.Lock()
+
+
+def schema_info():
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title="Personal Finance API",
+        default_version="v1",
+        description="API documentation for the Personal Finance application",
+        terms_of_service="https://www.example.com/terms/",
+        contact=openapi.Contact(email="contact@example.com"),
+    )
+
+
+def generate_schema() -> bytes:
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    schema = OpenAPISchemaGenerator(info=schema_info()).get_schema(
+        request=None, public=True
+    )
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def _load_schema() -> bytes:
+    path = getattr(settings, "OPENAPI_SCHEMA_FILE", None)
+    if path and Path(path).is_file():
+        return Path(path).read_bytes()
+
+    content = cache.get(SCHEMA_CACHE_KEY)
+    if content is None:
+        content = generate_schema()
+        cache.set(
+            SCHEMA_CACHE_KEY,
+            content,
+            getattr(settings, "OPENAPI_SCHEMA_CACHE_TIMEOUT", 3600),
+        )
+    return content
+
+
+def get_schema_document() -> SchemaDocument:
+    """The schema and its ETag, loaded at most once per process."""
+    global _document
+
+    if _document is None:
+        with _lock:
+            if _document is None:
+                content = _load_schema()
+                etag = f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+                _document = SchemaDocument(content, etag)
+    return _document
+
+
+def clear_schema_cache() -> None:
+    global _document
+
+    _document = None
+    cache.delete(SCHEMA_CACHE_KEY)
+
+
+def render_swagger_ui(request) -> str:
+    """
+    The Swagger UI page. It loads the schema from the URL named by
+    ``SWAGGER_SETTINGS["SPEC_URL"]``, so rendering it generates nothing.
+    """
+    from drf_yasg import openapi
+    from drf_yasg.renderers import SwaggerUIRenderer
+
+    swagger = openapi.Swagger(
+        info=schema_info(), _prefix="/", paths=openapi.Paths(paths={})
+    )
+    return SwaggerUIRenderer().render(swagger, renderer_context={"request": request})
@@ -0,0 +1,10 @@
+from rest_framework import serializers
+
+from core.models import ChangeLogEntry
+from personal_finance_api.instrumentation import TimedSerializerMixin
+
+
+class ChangeLogEntrySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = ChangeLogEntry
+        fields = ("id", "user", "entity", "entity_id", "action", "data", "created_at")
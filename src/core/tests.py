@@ -1 +1,388 @@
-# Create your tests here.
+import datetime
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import uuid
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from authentication.tests.helpers import sample_superuser, sample_user
+from core.db import pool_stats
+from core.metrics import REQUESTS, view_label
+from core.models import ChangeLogEntry
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+from core.schema import clear_schema_cache, generate_schema
+from personal_finance_api.db_router import PrimaryReplicaRouter
+
+
+class FakePool:
+    min_size = 2
+    max_size = 10
+
+    def get_stats(self):
+        return {
+            "pool_size": 4,
+            "pool_available": 1,
+            "requests_waiting": 2,
+            "requests_num": 10,
+            "requests_wait_ms": 25,
+        }
+
+
+class DatabasePoolStatsTests(APITestCase):
+    def setUp(self):
+        self.url = reverse("core:db_pool_stats")
+
+    def test_pool_stats_without_pool(self):
+        with mock.patch.object(type(connections["default"]), "pool", None, create=True):
+            self.assertIsNone(pool_stats())
+
+    def test_pool_stats_reports_usage(self):
+        with mock.patch.object(
+            type(connections["default"]), "pool", FakePool(), create=True
+        ):
+            stats = pool_stats()
+
+        self.assertEqual(stats["in_use"], 3)
+        self.assertEqual(stats["waiting"], 2)
+        self.assertEqual(stats["acquire_wait_ms_avg"], 2.5)
+
+    def test_endpoint_requires_admin(self):
+        self.client.force_authenticate(sample_user())
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(sample_superuser())
+        with mock.patch.object(
+            type(connections["default"]), "pool", FakePool(), create=True
+        ):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["pools"]["default"]["in_use"], 3)
+
+
+class MetricsTests(APITestCase):
+    def setUp(self):
+        self.url = reverse("core:metrics")
+
+    def test_requests_are_labelled_by_resolved_view(self):
+        self.client.force_authenticate(sample_user())
+        labels = ("TransactionViewSet.list", "GET", "200")
+        before = REQUESTS.labels(*labels)._value.get()
+
+        response = self.client.get(reverse("transactions:transactions-list"))
+
+        self.assertEqual(view_label(response.wsgi_request), labels[0])
+        self.assertEqual(REQUESTS.labels(*labels)._value.get(), before + 1)
+
+    @override_settings(METRICS_SCRAPE_TOKEN="scrape-token")
+    def test_scrape_with_token_returns_text_format(self):
+        self.client.get(reverse("transactions:dashboard"))
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION="Bearer scrape-token")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn('http_requests_total{method="GET",status="401"', body)
+        self.assertIn("http_request_duration_seconds_bucket", body)
+        self.assertIn('view="DashboardView"', body)
+
+    @override_settings(METRICS_SCRAPE_TOKEN="scrape-token")
+    def test_scrape_exports_pool_gauges(self):
+        with mock.patch.object(
+            type(connections["default"]), "pool", FakePool(), create=True
+        ):
+            response = self.client.get(
+                self.url, HTTP_AUTHORIZATION="Bearer scrape-token"
+            )
+
+        body = response.content.decode()
+        self.assertIn('db_pool_size{alias="default"} 4.0', body)
+        self.assertIn('db_pool_available{alias="default"} 1.0', body)
+        self.assertIn('db_pool_requests_waiting{alias="default"} 2.0', body)
+        self.assertIn('db_pool_requests{alias="default"} 10.0', body)
+        self.assertIn('db_pool_acquire_wait_seconds{alias="default"} 0.025', body)
+
+    @override_settings(METRICS_SCRAPE_TOKEN="scrape-token")
+    def test_scrape_requires_token_or_admin(self):
+        # Behind a reverse proxy every request comes from a local address.
+        response = self.client.get(self.url, REMOTE_ADDR="127.0.0.1")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.force_authenticate(sample_user())
+        self.assertEqual(
+            self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN
+        )
+
+        self.client.force_authenticate(sample_superuser())
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+    @override_settings(
+        METRICS_SCRAPE_TOKEN="scrape-token", METRICS_ALLOWED_IPS=["10.0.0.5"]
+    )
+    def test_allowed_ips_restrict_token_scrapes(self):
+        headers = {"HTTP_AUTHORIZATION": "Bearer scrape-token"}
+
+        response = self.client.get(self.url, REMOTE_ADDR="10.0.0.9", **headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.client.get(self.url, REMOTE_ADDR="10.0.0.5", **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+@override_settings(OPENAPI_SCHEMA_FILE=None)
+class OpenAPISchemaTests(APITestCase):
+    def setUp(self):
+        clear_schema_cache()
+        self.addCleanup(clear_schema_cache)
+        self.url = reverse("core:openapi_schema")
+
+    def test_schema_is_generated_once_and_revalidated_by_etag(self):
+        with mock.patch(
+            "core.schema.generate_schema", wraps=generate_schema
+        ) as generate:
+            response = self.client.get(self.url)
+            cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("/transactions/dashboard", json.loads(response.content)["paths"])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached["ETag"], response["ETag"])
+
+    def test_docs_page_points_at_the_precomputed_schema(self):
+        response = self.client.get(reverse("swagger-schema"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(self.url, response.content.decode())
+
+    def test_generate_command_writes_the_served_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "openapi.json"
+            call_command("generate_openapi_schema", output=str(path), stdout=None)
+
+            with (
+                override_settings(OPENAPI_SCHEMA_FILE=str(path)),
+                mock.patch("core.schema.generate_schema") as generate,
+            ):
+                response = self.client.get(self.url)
+
+            generate.assert_not_called()
+            self.assertEqual(response.content, path.read_bytes())
+
+    def test_url_loading_does_not_import_the_generator(self):
+        code = (
+            "import sys, django; django.setup(); import personal_finance_api.urls; "
+            "print('drf_yasg.generators' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "False")
+
+
+class ORJSONCompatibilityTests(SimpleTestCase):
+    payloads = (
+        None,
+        [],
+        {"id": uuid.UUID("12345678-1234-5678-1234-567812345678")},
+        {"value": Decimal("1234.50"), "zero": Decimal("0.00"), "neg": Decimal("-7.1")},
+        {"tiny": Decimal("0.00001"), "huge": Decimal("12345678901234567.0")},
+        {"date": datetime.date(2024, 2, 29)},
+        {
+            "utc": datetime.datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.UTC),
+            "naive": datetime.datetime(2024, 1, 2, 3, 4, 5),
+            "time": datetime.time(10, 30, 15, 250000),
+            "delta": datetime.timedelta(days=1, seconds=5),
+        },
+        {"lazy": gettext_lazy("Invalid category."), "error": ErrorDetail("x", "y")},
+        {"text": 'quote " slash \\ tab \t nl \n ctl \x01 é 😀 \u2028 \u2029'},
+        {"nested": [{"a": (1, 2)}, {"b": {3, 4} and [3, 4]}], "flag": True},
+        {1: "int key", "big": 2**70},
+        {"float": 0.1, "int": -5, "none": None},
+    )
+
+    def test_renderer_output_is_byte_identical(self):
+        for payload in self.payloads:
+            for media_type in (None, "application/json; indent=4"):
+                with self.subTest(payload=payload, media_type=media_type):
+                    self.assertEqual(
+                        ORJSONRenderer().render(payload, media_type),
+                        JSONRenderer().render(payload, media_type),
+                    )
+
+    def test_parser_matches_json_parser(self):
+        bodies = [
+            b'{"value": "10.50", "items": [1, 2.5, null, true], "s": "\\u00e9"}',
+            b'{"big": 123456789012345678901234567890}',
+        ]
+        for body in bodies:
+            with self.subTest(body=body):
+                self.assertEqual(
+                    ORJSONParser().parse(io.BytesIO(body)),
+                    JSONParser().parse(io.BytesIO(body)),
+                )
+
+        for body in (b"{bad json", b'{"n": NaN}'):
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError) as fast:
+                    ORJSONParser().parse(io.BytesIO(body))
+                with self.assertRaises(ParseError) as default:
+                    JSONParser().parse(io.BytesIO(body))
+                self.assertEqual(str(fast.exception), str(default.exception))
+
+
+class ChangeFeedSettingsTests(SimpleTestCase):
+    def test_settle_delay_outlasts_a_merge_statement(self):
+        timeout = settings.CATEGORY_MERGE_STATEMENT_TIMEOUT_MS
+        self.assertGreater(settings.CHANGE_FEED_SETTLE_SECONDS * 1000, timeout)
+
+
+@override_settings(CHANGE_FEED_SETTLE_SECONDS=0)
+class ChangeFeedTests(APITestCase):
+    def setUp(self):
+        self.url = reverse("core:change_feed")
+        self.user = sample_user(username="feeduser")
+        self.other = sample_user(username="otherfeed")
+        self.entries = [self._entry(self.user) for _ in range(5)]
+        self._entry(self.other)
+
+    def _entry(self, user, entity_id=None, action="updated", **extra):
+        return ChangeLogEntry.objects.create(
+            user=user,
+            entity="account",
+            entity_id=entity_id or uuid.uuid4(),
+            action=action,
+            data={"name": "Checking"},
+            **extra,
+        )
+
+    def test_feed_reads_the_users_changes_after_the_cursor(self):
+        self.client.force_authenticate(self.user)
+
+        first = self.client.get(self.url, {"limit": 3}).data
+        second = self.client.get(self.url, {"after": first["cursor"]}).data
+        third = self.client.get(self.url, {"after": second["cursor"]}).data
+
+        self.assertEqual(
+            [entry["id"] for entry in first["results"] + second["results"]],
+            [entry.pk for entry in self.entries],
+        )
+        self.assertTrue(first["has_more"])
+        self.assertFalse(second["has_more"])
+        self.assertEqual(
+            third, {"results": [], "cursor": second["cursor"], "has_more": False}
+        )
+
+    def test_staff_read_every_users_changes(self):
+        self.client.force_authenticate(sample_superuser())
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data["results"]), 6)
+
+    @override_settings(CHANGE_FEED_SETTLE_SECONDS=60)
+    def test_unsettled_changes_are_held_back(self):
+        ChangeLogEntry.objects.filter(pk__in=[e.pk for e in self.entries[:2]]).update(
+            created_at=timezone.now() - datetime.timedelta(minutes=5)
+        )
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(
+            [entry["id"] for entry in response.data["results"]],
+            [entry.pk for entry in self.entries[:2]],
+        )
+
+    def test_invalid_cursor(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url, {"after": "x"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(DATABASE_REPLICAS=["replica"])
+    def test_feed_reads_the_primary(self):
+        routed = []
+        original = PrimaryReplicaRouter.db_for_read
+
+        def db_for_read(router, model, **hints):
+            routed.append(original(router, model, **hints))
+            return "default"
+
+        self.client.force_authenticate(self.user)
+        with mock.patch.object(PrimaryReplicaRouter, "db_for_read", db_for_read):
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertEqual(set(routed), {"default"})
+
+    def test_consume_command_keeps_its_cursor(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cursor_file = Path(directory) / "cursor"
+            out = io.StringIO()
+            call_command(
+                "consume_changes",
+                cursor_file=str(cursor_file),
+                batch_size=2,
+                stdout=out,
+                stderr=io.StringIO(),
+            )
+            lines = [json.loads(line) for line in out.getvalue().splitlines()]
+            self.assertEqual(len(lines), 6)
+            self.assertEqual(int(cursor_file.read_text()), lines[-1]["id"])
+
+            newer = self._entry(self.user)
+            out = io.StringIO()
+            call_command(
+                "consume_changes",
+                cursor_file=str(cursor_file),
+                stdout=out,
+                stderr=io.StringIO(),
+            )
+            self.assertEqual(
+                [json.loads(line)["id"] for line in out.getvalue().splitlines()],
+                [newer.pk],
+            )
+
+    def test_compaction_keeps_the_latest_entry_of_each_row(self):
+        ChangeLogEntry.objects.all().delete()
+        old = timezone.now() - datetime.timedelta(days=60)
+        account_id, category_id = uuid.uuid4(), uuid.uuid4()
+        superseded = [
+            self._entry(self.user, account_id, "created", created_at=old),
+            self._entry(self.user, account_id, "updated", created_at=old),
+        ]
+        latest = self._entry(self.user, account_id, "updated")
+        alone = self._entry(self.user, category_id, "deleted", created_at=old)
+        recent = self._entry(self.user, category_id, "created")
+        recent_latest = self._entry(self.user, category_id, "deleted")
+
+        out = io.StringIO()
+        call_command("compact_changes", batch_size=1, stdout=out)
+
+        self.assertIn("Compacted 3", out.getvalue())
+        remaining = set(ChangeLogEntry.objects.values_list("pk", flat=True))
+        self.assertEqual(remaining, {latest.pk, recent.pk, recent_latest.pk})
+        self.assertFalse(remaining & {entry.pk for entry in [*superseded, alone]})
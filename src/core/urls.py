@@ -0,0 +1,18 @@
+from django.urls import path
+
+from core.views import (
+    ChangeFeedView,
+    DatabasePoolStatsView,
+    MetricsView,
+    OpenAPISchemaView,
+)
+
+app_name = "core"
+
+
+urlpatterns = [
+    path("health/db-pool/", DatabasePoolStatsView.as_view(), name="db_pool_stats"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+    path("changes/", ChangeFeedView.as_view(), name="change_feed"),
+    path("schema/", OpenAPISchemaView.as_view(), name="openapi_schema"),
+]
@@ -1 +1,93 @@
-# Create your views here.
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.translation import gettext_lazy as _
+from django.views import View
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.authentication import MetricsScraperAuthentication
+from core.changes import read_changes
+from core.db import pool_stats
+from core.metrics import render_latest
+from core.permissions import IsAdminOrMetricsScraper
+from core.schema import get_schema_document, render_swagger_ui
+from core.serializers import ChangeLogEntrySerializer
+
+
+class DatabasePoolStatsView(APIView):
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        pools = {alias: pool_stats(alias) for alias in connections}
+        return Response(
+            {"pools": {alias: stats for alias, stats in pools.items() if stats}}
+        )
+
+
+class MetricsView(APIView):
+    authentication_classes = (
+        MetricsScraperAuthentication,
+        *APIView.authentication_classes,
+    )
+    permission_classes = (IsAdminOrMetricsScraper,)
+    throttle_classes = ()
+
+    def get(self, request):
+        body, content_type = render_latest()
+        return HttpResponse(body, content_type=content_type)
+
+
+class ChangeFeedView(APIView):
+    """
+    Changes after ``?after=<id>`` (default 0), oldest first, at most
+    ``?limit=`` (default 100, up to 1000) of them. Pass the returned
+    ``cursor`` as ``after`` to read on. Staff users read every user's
+    changes, everyone else their own.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    default_limit = 100
+    max_limit = 1000
+
+    def get(self, request):
+        try:
+            after = int(request.query_params.get("after", 0))
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            raise ValidationError({"error": _("after and limit must be integers.")})
+        limit = max(1, min(limit, self.max_limit))
+
+        entries, has_more = read_changes(
+            after, limit, user=None if request.user.is_staff else request.user
+        )
+        return Response(
+            {
+                "results": ChangeLogEntrySerializer(entries, many=True).data,
+                "cursor": entries[-1].pk if entries else after,
+                "has_more": has_more,
+            }
+        )
+
+
+class OpenAPISchemaView(View):
+    """The precomputed OpenAPI schema, revalidated by clients with its ETag."""
+
+    def get(self, request):
+        document = get_schema_document()
+        response = get_conditional_response(request, etag=document.etag)
+        if response is None:
+            response = HttpResponse(document.content, content_type="application/json")
+        response["ETag"] = document.etag
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+
+class SwaggerUIView(View):
+    def get(self, request):
+        # Older clients fetch the schema from the docs URL itself.
+        if request.GET.get("format") == "openapi":
+            return OpenAPISchemaView.as_view()(request)
+        return HttpResponse(render_swagger_ui(request))
@@ -0,0 +1,9 @@
+import os
+
+
+def child_exit(server, worker):
+    # Drop the samples of dead workers from the shared Prometheus directory.
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
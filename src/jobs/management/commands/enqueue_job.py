@@ -0,0 +1,30 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.queue import enqueue
+
+
+class Command(BaseCommand):
+    help = "Queue a background job, e.g. from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument("task", help="Registered task name.")
+        parser.add_argument(
+            "--payload", default="{}", help="Task arguments as a JSON object."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            payload = json.loads(options["payload"])
+        except ValueError as exc:
+            raise CommandError(f"Invalid payload: {exc}") from exc
+        if not isinstance(payload, dict):
+            raise CommandError("The payload must be a JSON object.")
+
+        try:
+            job = enqueue(options["task"], **payload)
+        except LookupError as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(self.style.SUCCESS(f"Queued job {job.pk}."))
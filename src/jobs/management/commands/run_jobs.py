@@ -0,0 +1,72 @@
+import os
+import signal
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.queue import claim, release_expired, run
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs, one at a time, until stopped. Start as "
+        "many workers as needed; they claim jobs without blocking each other."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit as soon as no job is due instead of waiting for more.",
+        )
+        parser.add_argument(
+            "--max-jobs", type=int, default=None, help="Exit after this many jobs."
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=None,
+            help="Seconds to wait when no job is due. Defaults to "
+            "JOBS_POLL_INTERVAL_SECONDS.",
+        )
+        parser.add_argument(
+            "--name",
+            default=f"{socket.gethostname()}:{os.getpid()}",
+            help="Worker name stored on the jobs it claims.",
+        )
+
+    def handle(self, *args, **options):
+        poll_interval = options["poll_interval"]
+        if poll_interval is None:
+            poll_interval = settings.JOBS_POLL_INTERVAL_SECONDS
+
+        stopping = False
+
+        def stop(signum, frame):
+            # Finish the current job, then exit.
+            nonlocal stopping
+            stopping = True
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, stop)
+
+        processed = 0
+        while not stopping:
+            close_old_connections()
+            release_expired()
+            job = claim(options["name"])
+            if job is None:
+                if options["burst"]:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            run(job)
+            processed += 1
+            if options["max_jobs"] and processed >= options["max_jobs"]:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} jobs."))
@@ -0,0 +1,144 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:34
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("name", models.CharField(max_length=100, verbose_name="Task")),
+                (
+                    "payload",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        verbose_name="Payload",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("QUEUED", "Queued"),
+                            ("RUNNING", "Running"),
+                            ("SUCCEEDED", "Succeeded"),
+                            ("FAILED", "Failed"),
+                            ("CANCELLED", "Cancelled"),
+                        ],
+                        default="QUEUED",
+                        max_length=10,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "run_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text="Not started before this time",
+                        verbose_name="Run At",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="Attempts"),
+                ),
+                (
+                    "max_attempts",
+                    models.PositiveIntegerField(default=3, verbose_name="Max Attempts"),
+                ),
+                (
+                    "progress_done",
+                    models.PositiveIntegerField(default=0, verbose_name="Done"),
+                ),
+                (
+                    "progress_total",
+                    models.PositiveIntegerField(
+                        blank=True, null=True, verbose_name="Total"
+                    ),
+                ),
+                (
+                    "result",
+                    models.JSONField(
+                        blank=True,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        null=True,
+                        verbose_name="Result",
+                    ),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="Error")),
+                (
+                    "worker",
+                    models.CharField(blank=True, max_length=100, verbose_name="Worker"),
+                ),
+                (
+                    "heartbeat_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Heartbeat At"
+                    ),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Started At"
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Finished At"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="jobs",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="User",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Job",
+                "verbose_name_plural": "Jobs",
+                "ordering": ("-created_at",),
+                "indexes": [
+                    models.Index(
+                        fields=["status", "run_at"], name="jobs_job_status_f5c023_idx"
+                    ),
+                    models.Index(
+                        fields=["user", "created_at"],
+                        name="jobs_job_user_id_303f66_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
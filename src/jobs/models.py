@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from core.models import BaseModel
+
+
+class JobInterrupted(Exception):
+    """The job was cancelled or handed to another worker while running."""
+
+
+class Job(BaseModel):
+    """
+    A unit of background work, queued in the database and run by the
+    ``run_jobs`` workers. See ``jobs.queue`` for its life cycle.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "QUEUED", _("Queued")
+        RUNNING = "RUNNING", _("Running")
+        SUCCEEDED = "SUCCEEDED", _("Succeeded")
+        FAILED = "FAILED", _("Failed")
+        CANCELLED = "CANCELLED", _("Cancelled")
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="jobs",
+        verbose_name=_("User"),
+    )
+    name = models.CharField(max_length=100, verbose_name=_("Task"))
+    payload = models.JSONField(
+        default=dict, blank=True, encoder=DjangoJSONEncoder, verbose_name=_("Payload")
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.QUEUED,
+        verbose_name=_("Status"),
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        help_text=_("Not started before this time"),
+        verbose_name=_("Run At"),
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name=_("Attempts"))
+    max_attempts = models.PositiveIntegerField(
+        default=3, verbose_name=_("Max Attempts")
+    )
+    progress_done = models.PositiveIntegerField(default=0, verbose_name=_("Done"))
+    progress_total = models.PositiveIntegerField(
+        null=True, blank=True, verbose_name=_("Total")
+    )
+    result = models.JSONField(
+        null=True, blank=True, encoder=DjangoJSONEncoder, verbose_name=_("Result")
+    )
+    error = models.TextField(blank=True, verbose_name=_("Error"))
+    worker = models.CharField(max_length=100, blank=True, verbose_name=_("Worker"))
+    heartbeat_at = models.DateTimeField(
+        null=True, blank=True, verbose_name=_("Heartbeat At")
+    )
+    started_at = models.DateTimeField(
+        null=True, blank=True, verbose_name=_("Started At")
+    )
+    finished_at = models.DateTimeField(
+        null=True, blank=True, verbose_name=_("Finished At")
+    )
+
+    class Meta:
+        verbose_name = _("Job")
+        verbose_name_plural = _("Jobs")
+        ordering = ("-created_at",)
+        indexes = (
+            models.Index(fields=["status", "run_at"]),
+            models.Index(fields=["user", "created_at"]),
+        )
+
+    def __str__(self):
+        return f"{self.name} - {self.get_status_display()}"
+
+    def report_progress(self, done: int, total: int | None = None) -> None:
+        """
+        Record progress and renew the worker's lease on the job. Long tasks
+        must call this more often than ``JOBS_LEASE_SECONDS``. Raises
+        ``JobInterrupted`` once the job was cancelled or taken over, so the
+        task stops at its next report.
+        """
+        fields = {"progress_done": done, "heartbeat_at": timezone.now()}
+        if total is not None:
+            fields["progress_total"] = total
+        updated = Job.objects.filter(
+            pk=self.pk, status=self.Status.RUNNING, worker=self.worker
+        ).update(**fields)
+        if not updated:
+            raise JobInterrupted(self.pk)
+        for field, value in fields.items():
+            setattr(self, field, value)
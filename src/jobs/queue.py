@@ -0,0 +1,124 @@
+"""
+Database-backed job queue: no broker, just the ``Job`` table.
+
+A job is ``QUEUED`` until a worker claims it with ``SELECT ... FOR UPDATE SKIP
+LOCKED`` (so concurrent workers never wait on each other) followed by an
+``UPDATE`` guarded on the status, which also keeps claims exclusive on
+backends without row locks such as SQLite. A claimed job is ``RUNNING`` until
+its task returns (``SUCCEEDED``) or raises: it is then queued again after an
+exponential delay, or ``FAILED`` once ``max_attempts`` is reached.
+
+Workers renew a lease on their job whenever the task reports progress. A
+running job whose lease expired (its worker died or hung) is released by the
+next worker that polls, as if its attempt had failed.
+"""
+
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.metrics import record_job
+from jobs.models import Job, JobInterrupted
+from jobs.registry import get_task
+
+logger = logging.getLogger("jobs")
+
+
+def enqueue(name: str, user=None, run_at=None, **payload) -> Job:
+    """
+    Queue the task registered as ``name``. Called inside a transaction, the
+    job only becomes visible to workers once it commits.
+    """
+    task = get_task(name)
+    return Job.objects.create(
+        name=name,
+        user=user,
+        payload=payload,
+        run_at=run_at or timezone.now(),
+        max_attempts=task.max_attempts,
+    )
+
+
+def claim(worker: str) -> Job | None:
+    """The next due job, now ``RUNNING`` for ``worker``, or ``None``."""
+    now = timezone.now()
+    with db_transaction.atomic():
+        due = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.Status.QUEUED, run_at__lte=now)
+            .order_by("run_at")
+            .values_list("pk", flat=True)
+        )
+        pk = next(iter(due[:1]), None)
+        if pk is None:
+            return None
+        claimed = Job.objects.filter(pk=pk, status=Job.Status.QUEUED).update(
+            status=Job.Status.RUNNING,
+            attempts=F("attempts") + 1,
+            worker=worker,
+            started_at=now,
+            heartbeat_at=now,
+        )
+    return Job.objects.get(pk=pk) if claimed else None
+
+
+def release_expired() -> int:
+    """Give up on running jobs whose lease expired; returns how many."""
+    lease = timedelta(seconds=settings.JOBS_LEASE_SECONDS)
+    expired = Job.objects.filter(
+        status=Job.Status.RUNNING, heartbeat_at__lt=timezone.now() - lease
+    )
+    error = "The worker stopped reporting progress."
+    return sum(1 for job in expired if _retry_or_fail(job, error))
+
+
+def run(job: Job) -> None:
+    """Run a claimed job and record how it ended."""
+    started = time.perf_counter()
+    try:
+        result = get_task(job.name).func(job, **job.payload)
+    except JobInterrupted:
+        logger.info("Job %s (%s) was interrupted.", job.pk, job.name)
+        return
+    except Exception as exc:
+        logger.exception("Job %s (%s) failed.", job.pk, job.name)
+        error = "".join(traceback.format_exception_only(exc)).strip()
+        if status := _retry_or_fail(job, error):
+            record_job(job.name, status, time.perf_counter() - started)
+        return
+
+    finished = _running(job).update(
+        status=Job.Status.SUCCEEDED,
+        result=result,
+        error="",
+        finished_at=timezone.now(),
+    )
+    if finished:
+        record_job(job.name, Job.Status.SUCCEEDED, time.perf_counter() - started)
+
+
+def _running(job: Job):
+    """``job`` while it is still running on the same worker."""
+    return Job.objects.filter(pk=job.pk, status=Job.Status.RUNNING, worker=job.worker)
+
+
+def _retry_or_fail(job: Job, error: str) -> str | None:
+    """
+    Queue ``job`` again after a growing delay, or fail it for good. Returns
+    the new status, or ``None`` if the job had stopped running meanwhile.
+    """
+    now = timezone.now()
+    if job.attempts < job.max_attempts:
+        delay = settings.JOBS_RETRY_DELAY_SECONDS * 2 ** (job.attempts - 1)
+        fields = {"status": Job.Status.QUEUED, "run_at": now + timedelta(seconds=delay)}
+    else:
+        fields = {"status": Job.Status.FAILED, "finished_at": now}
+    if _running(job).update(error=error, **fields):
+        return fields["status"]
+    return None
@@ -0,0 +1,41 @@
+"""
+Background tasks by name. Apps register theirs in a ``tasks`` module with the
+``task`` decorator; those modules are imported when the ``jobs`` app is ready.
+
+A task is called with the running ``Job`` and the job's payload as keyword
+arguments, and may return any JSON-serialisable result. Tasks registered with
+``user_runnable=True`` may also be queued by users through ``/api/jobs/``; they
+must only touch the data of the job's user.
+"""
+
+from collections.abc import Callable
+from typing import NamedTuple
+
+
+class Task(NamedTuple):
+    name: str
+    func: Callable
+    max_attempts: int
+    user_runnable: bool
+
+
+_tasks: dict[str, Task] = {}
+
+
+def task(name: str, max_attempts: int = 3, user_runnable: bool = False):
+    def register(func):
+        _tasks[name] = Task(name, func, max_attempts, user_runnable)
+        return func
+
+    return register
+
+
+def get_task(name: str) -> Task:
+    try:
+        return _tasks[name]
+    except KeyError:
+        raise LookupError(f"No task is registered as {name!r}.") from None
+
+
+def user_runnable_tasks() -> list[str]:
+    return sorted(name for name, task in _tasks.items() if task.user_runnable)
@@ -0,0 +1,51 @@
+import inspect
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+from jobs.models import Job
+from jobs.registry import get_task, user_runnable_tasks
+from personal_finance_api.instrumentation import TimedSerializerMixin
+
+
+class JobSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = (
+            "id",
+            "name",
+            "status",
+            "payload",
+            "attempts",
+            "max_attempts",
+            "progress_done",
+            "progress_total",
+            "result",
+            "error",
+            "run_at",
+            "created_at",
+            "started_at",
+            "finished_at",
+        )
+        read_only_fields = fields
+
+
+class JobCreateSerializer(serializers.Serializer):
+    """A user-runnable task to queue for the requesting user."""
+
+    name = serializers.CharField(max_length=100)
+    payload = serializers.DictField(required=False, default=dict)
+
+    def validate_name(self, value):
+        if value not in user_runnable_tasks():
+            raise serializers.ValidationError(_("Users cannot queue this task."))
+        return value
+
+    def validate(self, data):
+        parameters = inspect.signature(get_task(data["name"]).func).parameters
+        unknown = sorted(set(data["payload"]) - set(list(parameters)[1:]))
+        if unknown:
+            raise serializers.ValidationError(
+                {"payload": _("Unknown arguments: %s.") % ", ".join(unknown)}
+            )
+        return data
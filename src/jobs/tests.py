@@ -0,0 +1,212 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.tests.helpers import sample_user
+from jobs.models import Job, JobInterrupted
+from jobs.queue import claim, enqueue, release_expired, run
+from jobs.registry import task
+from transactions.models import Account, AccountBalanceCheckpoint, Transaction
+
+calls = []
+
+
+@task("tests.record")
+def record(job, steps=3):
+    for step in range(steps):
+        job.report_progress(step, steps)
+        calls.append(step)
+    job.report_progress(steps)
+    return {"steps": steps}
+
+
+@task("tests.explode", max_attempts=2)
+def explode(job):
+    raise RuntimeError("boom")
+
+
+def work(**options):
+    call_command("run_jobs", burst=True, stdout=StringIO(), **options)
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_worker_runs_due_jobs_and_records_progress(self):
+        job = enqueue("tests.record", steps=4)
+
+        work()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.SUCCEEDED)
+        self.assertEqual(job.result, {"steps": 4})
+        self.assertEqual((job.progress_done, job.progress_total), (4, 4))
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(calls, [0, 1, 2, 3])
+
+    def test_jobs_are_claimed_once_and_not_before_run_at(self):
+        later = enqueue("tests.record", run_at=timezone.now() + timedelta(hours=1))
+        due = enqueue("tests.record")
+
+        self.assertEqual(claim("first").pk, due.pk)
+        self.assertIsNone(claim("second"))
+        later.refresh_from_db()
+        self.assertEqual(later.status, Job.Status.QUEUED)
+
+    @override_settings(JOBS_RETRY_DELAY_SECONDS=0)
+    def test_failures_are_retried_until_max_attempts(self):
+        job = enqueue("tests.explode")
+
+        work()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertIn("boom", job.error)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_retry_waits_longer_on_every_attempt(self):
+        job = enqueue("tests.explode")
+        job.max_attempts = 5
+        job.save()
+
+        run(claim("worker"))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=20))
+        self.assertIsNone(claim("worker"))
+
+    @override_settings(JOBS_LEASE_SECONDS=60)
+    def test_jobs_of_lost_workers_are_released(self):
+        enqueue("tests.record")
+        job = claim("lost")
+        Job.objects.filter(pk=job.pk).update(
+            heartbeat_at=timezone.now() - timedelta(minutes=5)
+        )
+
+        self.assertEqual(release_expired(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+
+        # The lost worker can no longer report on it.
+        with self.assertRaises(JobInterrupted):
+            Job.objects.get(pk=job.pk).report_progress(1)
+
+    def test_transactions_tasks_are_registered(self):
+        user = sample_user(username="jobowner")
+        account = Account.objects.create(
+            user=user, name="Checking", closing_day=1, due_day=10
+        )
+        Transaction.objects.create(
+            user=user,
+            account=account,
+            description="Salary",
+            value=100,
+            date=date.today().replace(day=1) - timedelta(days=40),
+            type="INCOME",
+        )
+        job = enqueue("transactions.build_balance_checkpoints", user=user)
+
+        work()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.SUCCEEDED)
+        self.assertEqual(
+            job.result["created"], AccountBalanceCheckpoint.objects.count()
+        )
+        self.assertGreater(job.result["created"], 0)
+
+    def test_enqueue_command(self):
+        out = StringIO()
+        call_command("enqueue_job", "tests.record", payload='{"steps": 1}', stdout=out)
+
+        job = Job.objects.get()
+        self.assertEqual((job.name, job.payload), ("tests.record", {"steps": 1}))
+        self.assertIn(str(job.pk), out.getvalue())
+
+
+class JobAPITests(APITestCase):
+    def setUp(self):
+        self.user = sample_user(username="jobuser")
+        self.client.force_authenticate(self.user)
+        self.job = enqueue("tests.record", user=self.user)
+        self.other = enqueue("tests.record", user=sample_user(username="otherjob"))
+
+    def test_users_only_see_their_jobs(self):
+        response = self.client.get(reverse("jobs:jobs-list"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [job["id"] for job in response.data["results"]], [str(self.job.pk)]
+        )
+        self.assertEqual(response.data["results"][0]["status"], "QUEUED")
+
+        response = self.client.get(reverse("jobs:jobs-detail", args=[self.other.pk]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cancel_stops_queued_and_running_jobs(self):
+        url = reverse("jobs:jobs-cancel", args=[self.job.pk])
+        running = claim("worker")
+        self.assertEqual(running.pk, self.job.pk)
+
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "CANCELLED")
+        with self.assertRaises(JobInterrupted):
+            running.report_progress(1)
+
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_users_queue_runnable_tasks_for_themselves(self):
+        account = Account.objects.create(
+            user=self.user, name="Checking", closing_day=1, due_day=10
+        )
+        Transaction.objects.create(
+            user=self.user,
+            account=account,
+            description="Salary",
+            value=100,
+            date=date.today().replace(day=1) - timedelta(days=40),
+            type="INCOME",
+        )
+
+        response = self.client.post(
+            reverse("jobs:jobs-list"),
+            {
+                "name": "transactions.build_balance_checkpoints",
+                "payload": {"accounts": [str(account.pk)]},
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = Job.objects.get(pk=response.data["id"])
+        self.assertEqual((job.user, job.status), (self.user, Job.Status.QUEUED))
+
+        work()
+
+        response = self.client.get(reverse("jobs:jobs-detail", args=[job.pk]))
+        self.assertEqual(response.data["status"], "SUCCEEDED")
+        self.assertGreater(response.data["result"]["created"], 0)
+
+    def test_only_runnable_tasks_with_known_arguments_can_be_queued(self):
+        url = reverse("jobs:jobs-list")
+        for data in [
+            {"name": "transactions.archive"},
+            {"name": "tests.record"},
+            {"name": "transactions.reconcile_balances", "payload": {"user": 1}},
+        ]:
+            with self.subTest(data):
+                response = self.client.post(url, data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Job.objects.count(), 2)
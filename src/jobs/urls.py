@@ -0,0 +1,14 @@
+from django.urls import include, path
+from rest_framework import routers
+
+from jobs.views import JobViewSet
+
+app_name = "jobs"
+
+router = routers.SimpleRouter()
+
+router.register(r"", JobViewSet, basename="jobs")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
@@ -0,0 +1,65 @@
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from jobs.models import Job
+from jobs.queue import enqueue
+from jobs.serializers import JobCreateSerializer, JobSerializer
+
+
+class JobViewSet(
+    mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
+):
+    """
+    Status and progress of the user's background jobs. Users can also queue
+    the tasks registered as ``user_runnable`` (see ``jobs.registry``) for
+    themselves; the job runs on the ``run_jobs`` workers.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    serializer_class = JobSerializer
+    filter_backends = (DjangoFilterBackend,)
+    filterset_fields = ("status", "name")
+
+    def get_serializer_class(self):
+        if self.action == "create":
+            return JobCreateSerializer
+        return JobSerializer
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return Job.objects.none()
+        return Job.objects.filter(user=self.request.user)
+
+    def create(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = enqueue(
+            serializer.validated_data["name"],
+            user=request.user,
+            **serializer.validated_data["payload"],
+        )
+        return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=["post"])
+    def cancel(self, request, pk=None):
+        """
+        Cancel a queued or running job. A running job stops the next time
+        it reports progress.
+        """
+        job = self.get_object()
+        job.status, job.finished_at = Job.Status.CANCELLED, timezone.now()
+        cancelled = Job.objects.filter(
+            pk=job.pk, status__in=[Job.Status.QUEUED, Job.Status.RUNNING]
+        ).update(status=job.status, finished_at=job.finished_at)
+        if not cancelled:
+            raise ValidationError(
+                {"error": _("Only queued or running jobs can be cancelled.")}
+            )
+
+        return Response(self.get_serializer(job).data)
@@ -0,0 +1,54 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Whether reads in the current context must go to the primary database.
+# Defaults to True so management commands, shells and tests keep reading from
+# ``default``; ``ReplicaRoutingMiddleware`` opts safe requests into replicas.
+read_from_primary = ContextVar("read_from_primary", default=True)
+
+
+@contextmanager
+def use_primary():
+    """
+    Read from ``default`` inside the block, even in a request routed to the
+    replicas: for reads that end up in a shared cache or must not lag.
+    """
+    token = read_from_primary.set(True)
+    try:
+        yield
+    finally:
+        read_from_primary.reset(token)
+
+
+def replica_aliases() -> list[str]:
+    return list(getattr(settings, "DATABASE_REPLICAS", []))
+
+
+class PrimaryReplicaRouter:
+    """
+    Sends writes to ``default`` and, when the request allows it, reads to one
+    of the aliases listed in ``settings.DATABASE_REPLICAS``.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if not replicas or read_from_primary.get():
+            return "default"
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {"default", *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_aliases():
+            return False
+        return None
@@ -0,0 +1,103 @@
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+# Stats of the request being handled in the current context, if it is sampled.
+current_stats = ContextVar("current_request_stats", default=None)
+
+_PLACEHOLDER_LIST = re.compile(r"\((?:%s, )+%s\)")
+
+
+class RequestStats:
+    """
+    Timings and SQL counters collected for one request. Instances are used as
+    ``connection.execute_wrapper`` callables.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.query_count = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        # Part of ``db_time`` spent in queries run by serializers, which is
+        # also counted in ``serializer_time``.
+        self.serializer_db_time = 0.0
+        self.query_shapes = Counter()
+        self.extra = {}
+        self.compression = None
+        self._serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.query_count += 1
+            self.query_shapes[_PLACEHOLDER_LIST.sub("(...)", sql)] += 1
+
+    def finish(self) -> None:
+        self.finished = time.perf_counter()
+
+    @property
+    def total_time(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def view_time(self) -> float:
+        serializer_only = self.serializer_time - self.serializer_db_time
+        return max(0.0, self.total_time - self.db_time - serializer_only)
+
+    def record_compression(
+        self, encoding: str, original_size: int, compressed_size: int, cpu_time: float
+    ) -> None:
+        self.extra["compress"] = cpu_time
+        self.compression = {
+            "encoding": encoding,
+            "original_bytes": original_size,
+            "compressed_bytes": compressed_size,
+            "ratio": round(original_size / max(compressed_size, 1), 2),
+        }
+
+    def repeated_queries(self, threshold: int) -> dict[str, int]:
+        return {
+            sql: count for sql, count in self.query_shapes.items() if count >= threshold
+        }
+
+    def server_timing(self) -> str:
+        metrics = [
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.query_count} queries"',
+            f"ser;dur={self.serializer_time * 1000:.2f}",
+            f"view;dur={self.view_time * 1000:.2f}",
+        ]
+        metrics += [
+            f"{name};dur={value * 1000:.2f}" for name, value in self.extra.items()
+        ]
+        metrics.append(f"total;dur={self.total_time * 1000:.2f}")
+        return ", ".join(metrics)
+
+
+class TimedSerializerMixin:
+    """
+    Adds the time spent turning instances into primitives to the serializer
+    time of the sampled request. Nested serializers and the items of a
+    ``many=True`` list are counted once, by the outermost call. Queries the
+    serializer runs are noted too, so the view time does not lose them twice.
+    """
+
+    def to_representation(self, instance):
+        stats = current_stats.get()
+        if stats is None or stats._serializer_depth:
+            return super().to_representation(instance)
+
+        stats._serializer_depth += 1
+        started = time.perf_counter()
+        db_time = stats.db_time
+        try:
+            return super().to_representation(instance)
+        finally:
+            stats.serializer_time += time.perf_counter() - started
+            stats.serializer_db_time += stats.db_time - db_time
+            stats._serializer_depth -= 1
@@ -1,8 +1,34 @@
-import jwt
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+from functools import partial
+
 from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
 from django.shortcuts import redirect
 from django.urls import reverse
-from jwt import InvalidTokenError
+from django.utils.cache import patch_vary_headers
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from authentication.authentication import validate_request_token
+from core.compression import (
+    compress,
+    compress_stream,
+    is_compressible,
+    negotiate_encoding,
+)
+from core.metrics import observe_request, record_pool_stats
+from personal_finance_api.db_router import read_from_primary, replica_aliases
+from personal_finance_api.instrumentation import RequestStats, current_stats
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+request_logger = logging.getLogger("personal_finance_api.requests")
 
 
 class AuthRedirectMiddleware:
@@ -20,8 +46,287 @@ class AuthRedirectMiddleware:
         token = request.COOKIES.get("access_token")
         if token:
             try:
-                jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+                validate_request_token(request, token)
                 return True
-            except InvalidTokenError:
+            except InvalidToken:
                 return False
+
+        # Only fall back to the session when there is one to load.
+        if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+            return False
         return request.user.is_authenticated
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets safe requests read from the replicas configured in
+    ``DATABASE_REPLICAS``. After a write the client gets a short-lived cookie
+    that pins its reads to the primary, so it always reads its own writes.
+
+    The cookie only pins the client that wrote. When the writer was
+    authenticated the pin is also kept in the cache under its user id, so
+    the user's other clients (another tab or device, an API client that
+    drops cookies) read the primary too. Reads only look the user up from
+    the JWT (``Authorization`` header or ``access_token`` cookie).
+    """
+
+    cookie_name = "db_primary_pin"
+    pin_key_prefix = "db:primary-pin:"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        is_write = request.method not in SAFE_METHODS
+        use_primary = is_write or self._is_pinned(request)
+
+        token = read_from_primary.set(use_primary)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_from_primary.reset(token)
+
+        if is_write and response.status_code < 500:
+            self._pin(request, response)
+
+        return response
+
+    def _pin(self, request, response):
+        pin_seconds = getattr(settings, "REPLICA_PIN_SECONDS", 5)
+        response.set_cookie(
+            self.cookie_name,
+            "1",
+            max_age=pin_seconds,
+            httponly=True,
+            samesite="Lax",
+        )
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            cache.set(self._pin_key(user.pk), 1, pin_seconds)
+
+    def _is_pinned(self, request):
+        if self.cookie_name in request.COOKIES:
+            return True
+        if not replica_aliases():
+            return False
+        user_id = self._token_user_id(request)
+        return user_id is not None and cache.get(self._pin_key(user_id)) is not None
+
+    def _pin_key(self, user_id):
+        return f"{self.pin_key_prefix}{user_id}"
+
+    def _token_user_id(self, request):
+        authentication = JWTAuthentication()
+        header = authentication.get_header(request)
+        if header is not None:
+            raw_token = authentication.get_raw_token(header)
+        else:
+            raw_token = request.COOKIES.get("access_token")
+        if raw_token is None:
+            return None
+        try:
+            token = validate_request_token(request, raw_token)
+        except InvalidToken:
+            return None
+        return token.get(api_settings.USER_ID_CLAIM)
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Records SQL count, DB time, serializer time and view time for a sampled
+    share of requests and logs one structured line per request. Requests over
+    the configured thresholds, or repeating the same SQL shape (a likely N+1),
+    are logged as warnings.
+
+    The timings reveal how much work a request did, so they are only returned
+    in a ``Server-Timing`` header to staff users, or to everyone when
+    ``REQUEST_INSTRUMENTATION_SERVER_TIMING`` is on.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sample_rate = getattr(settings, "REQUEST_INSTRUMENTATION_SAMPLE_RATE", 0.01)
+        if sample_rate <= 0 or random.random() >= sample_rate:
+            return self.get_response(request)
+
+        stats = RequestStats()
+        request.instrumentation = stats
+        token = current_stats.set(stats)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        stats.finish()
+
+        if self._shows_timing(request):
+            response["Server-Timing"] = stats.server_timing()
+        if response.streaming and not response.is_async:
+            # Log once the body has been sent, so compression of the stream
+            # is part of the record.
+            response.streaming_content = self._log_after(
+                response.streaming_content, request, response, stats
+            )
+        else:
+            self._log(request, response, stats)
+        return response
+
+    def _shows_timing(self, request):
+        if getattr(settings, "REQUEST_INSTRUMENTATION_SERVER_TIMING", False):
+            return True
+        user = getattr(request, "user", None)
+        return user is not None and user.is_staff
+
+    def _log_after(self, chunks, request, response, stats):
+        try:
+            yield from chunks
+        finally:
+            self._log(request, response, stats)
+
+    def _log(self, request, response, stats):
+        repeated = stats.repeated_queries(
+            getattr(settings, "REQUEST_INSTRUMENTATION_N_PLUS_ONE_THRESHOLD", 5)
+        )
+        flagged = (
+            bool(repeated)
+            or stats.query_count
+            > getattr(settings, "REQUEST_INSTRUMENTATION_MAX_QUERIES", 50)
+            or stats.total_time * 1000
+            > getattr(settings, "REQUEST_INSTRUMENTATION_SLOW_MS", 500)
+        )
+        level = logging.WARNING if flagged else logging.INFO
+        if not request_logger.isEnabledFor(level):
+            return
+
+        match = request.resolver_match
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "queries": stats.query_count,
+            "db_ms": round(stats.db_time * 1000, 2),
+            "serializer_ms": round(stats.serializer_time * 1000, 2),
+            "view_ms": round(stats.view_time * 1000, 2),
+            "total_ms": round(stats.total_time * 1000, 2),
+        }
+        if repeated:
+            record["repeated_queries"] = repeated
+        if stats.compression:
+            record["compression"] = {
+                **stats.compression,
+                "cpu_ms": round(stats.extra["compress"] * 1000, 2),
+            }
+        request_logger.log(level, json.dumps(record))
+
+
+class PrometheusMetricsMiddleware:
+    """
+    Counts requests and observes their latency per resolved view. Query counts
+    are taken from ``RequestInstrumentationMiddleware`` when the request was
+    sampled, so this middleware must sit above it. The database pool gauges
+    are refreshed after every request, so each worker's sample stays current
+    between scrapes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        stats = getattr(request, "instrumentation", None)
+        observe_request(
+            request,
+            response,
+            time.perf_counter() - started,
+            query_count=stats.query_count if stats else None,
+        )
+        record_pool_stats()
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Compresses text responses with the best encoding the client accepts
+    (zstd, br or gzip, see ``core.compression``). Streaming responses are
+    compressed chunk by chunk as they are sent. Bodies smaller than
+    ``COMPRESSION_MIN_SIZE`` bytes are left alone.
+
+    Responses that set cookies (login, token refresh, registration, logout)
+    are sent uncompressed: against BREACH, nothing is compressed next to the
+    tokens being handed out. Only the cookies in ``public_cookies`` carry no
+    secret.
+
+    Must sit below ``RequestInstrumentationMiddleware`` so compression time
+    and ratio end up in the request's stats.
+    """
+
+    public_cookies = frozenset({ReplicaRoutingMiddleware.cookie_name})
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        encoding = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if response.status_code == 304:
+            # A revalidated representation would have been sent compressed,
+            # so the 304 repeats the weak validator the 200 carried.
+            if encoding is not None:
+                patch_vary_headers(response, ("Accept-Encoding",))
+                self._weaken_etag(response)
+            return response
+        if (
+            response.has_header("Content-Encoding")
+            or not is_compressible(response.get("Content-Type", ""))
+            or self._sets_secret_cookies(response)
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if encoding is None:
+            return response
+
+        stats = getattr(request, "instrumentation", None)
+        if response.streaming:
+            if response.is_async:
+                return response
+            response.streaming_content = compress_stream(
+                encoding,
+                response.streaming_content,
+                partial(stats.record_compression, encoding) if stats else None,
+            )
+            del response["Content-Length"]
+        else:
+            min_size = getattr(settings, "COMPRESSION_MIN_SIZE", 1024)
+            if len(response.content) < min_size:
+                return response
+            started = time.thread_time()
+            compressed = compress(encoding, response.content)
+            cpu_time = time.thread_time() - started
+            if len(compressed) >= len(response.content):
+                return response
+            if stats:
+                stats.record_compression(
+                    encoding, len(response.content), len(compressed), cpu_time
+                )
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        self._weaken_etag(response)
+        response["Content-Encoding"] = encoding
+        return response
+
+    def _weaken_etag(self, response):
+        # The representation changed, so a strong validator no longer holds.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+
+    def _sets_secret_cookies(self, response):
+        return not self.public_cookies.issuperset(response.cookies)
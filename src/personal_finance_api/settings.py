@@ -38,12 +38,15 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "rest_framework",
     "rest_framework_simplejwt",
+    "rest_framework_simplejwt.token_blacklist",
     "drf_yasg",
     "authentication",
     "users",
     "django_filters",
     "transactions",
     "corsheaders",
+    "core",
+    "jobs",
 ]
 
 AUTH_USER_MODEL = "users.User"
@@ -51,6 +54,10 @@ AUTH_USER_MODEL = "users.User"
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "personal_finance_api.middleware.PrometheusMetricsMiddleware",
+    "personal_finance_api.middleware.RequestInstrumentationMiddleware",
+    "personal_finance_api.middleware.CompressionMiddleware",
+    "personal_finance_api.middleware.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -101,6 +108,82 @@ DATABASES = {
     }
 }
 
+# Connection reuse. With DB_POOL enabled each worker keeps a psycopg 3 pool
+# (Django's native pooling); otherwise connections are persisted for
+# DB_CONN_MAX_AGE seconds. Both modes health-check connections before reuse.
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+if os.getenv("DB_POOL", "").lower() in ("1", "true", "yes"):
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+            "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "1800")),
+            "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+        },
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", "0"))
+
+# Read replicas: a comma separated list of hosts that stream from the primary.
+# Each one becomes a ``replica_N`` alias sharing the primary's credentials.
+# Safe requests read from them through ``PrimaryReplicaRouter``; clients that
+# just wrote are pinned to the primary for ``REPLICA_PIN_SECONDS``.
+DATABASE_REPLICAS = []
+for index, host in enumerate(
+    filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(","))
+):
+    alias = f"replica_{index + 1}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+# A replica with settings of its own is the ``replica`` alias: DB_REPLICA_NAME
+# enables it, and DB_REPLICA_ENGINE, _HOST, _PORT, _USER and _PASSWORD default
+# to the primary's. Without DB_REPLICA_NAME the alias is still declared, as a
+# copy of the primary that nothing routes to, so tests can enable it; tests
+# always mirror it onto the test database.
+DATABASES["replica"] = {
+    **DATABASES["default"],
+    **{
+        key: os.getenv(f"DB_REPLICA_{key}", DATABASES["default"][key])
+        for key in ("ENGINE", "NAME", "HOST", "PORT", "USER", "PASSWORD")
+    },
+    "TEST": {"MIRROR": "default"},
+}
+if DATABASES["replica"]["ENGINE"] != DATABASES["default"]["ENGINE"]:
+    # Pool options are specific to the primary's backend.
+    DATABASES["replica"].pop("OPTIONS", None)
+if os.getenv("DB_REPLICA_NAME"):
+    DATABASE_REPLICAS.append("replica")
+
+DATABASE_ROUTERS = ["personal_finance_api.db_router.PrimaryReplicaRouter"]
+
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "5"))
+
+
+# Shared cache for throttling, cached users and the token blacklist filter
+# (``docker compose up`` starts Redis on redis://localhost:6379/0). Without
+# REDIS_URL every process falls back to its own in-memory cache, which is only
+# fit for development: limits then apply per worker, and startup logs a
+# warning unless DEBUG is set.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -157,24 +240,131 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "authentication.throttling.SlidingWindowAnonRateThrottle",
+        "authentication.throttling.SlidingWindowUserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
-        "anon": "50/day",
-        "user": "1000/day",
+        "anon": os.getenv("THROTTLE_ANON_RATE", "50/day"),
+        "user": os.getenv("THROTTLE_USER_RATE", "1000/day"),
     },
 }
 
+# The docs page loads the precomputed schema instead of regenerating it.
+SWAGGER_SETTINGS = {"SPEC_URL": "core:openapi_schema"}
+# Written by ``manage.py generate_openapi_schema``; without the file the
+# schema is generated on first access and cached.
+OPENAPI_SCHEMA_FILE = os.getenv(
+    "OPENAPI_SCHEMA_FILE", str(Path.joinpath(BASE_DIR, "openapi.json"))
+)
+OPENAPI_SCHEMA_CACHE_TIMEOUT = int(os.getenv("OPENAPI_SCHEMA_CACHE_TIMEOUT", "3600"))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=20),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": False,
     "BLACKLIST_AFTER_ROTATION": False,
     "AUTH_HEADER_TYPES": ("Bearer",),
+    "TOKEN_REFRESH_SERIALIZER": (
+        "authentication.serializers.FilteredTokenRefreshSerializer"
+    ),
 }
 
+# Blacklisted refresh tokens are mirrored in an in-process Bloom filter. Each
+# process picks up new blacklistings from the cache every SYNC seconds and
+# rebuilds the filter from the database every REBUILD seconds. Processes only
+# hear of each other's blacklistings through a shared cache, so the filter is
+# off (every refresh queries the blacklist) unless REDIS_URL is set.
+AUTH_BLACKLIST_FILTER = bool(os.getenv("REDIS_URL"))
+AUTH_BLACKLIST_FILTER_SYNC_SECONDS = 1
+AUTH_BLACKLIST_FILTER_REBUILD_SECONDS = 600
+AUTH_BLACKLIST_FILTER_ERROR_RATE = 0.001
+
 LOGIN_URL = "/admin/login/"
+
+# Authenticated users are cached per process for AUTH_USER_LOCAL_CACHE_TIMEOUT
+# seconds and in the shared cache for AUTH_USER_CACHE_TIMEOUT seconds.
+AUTH_USER_CACHE_TIMEOUT = 300
+AUTH_USER_LOCAL_CACHE_TIMEOUT = 5
+AUTH_USER_LOCAL_CACHE_SIZE = 1024
+
+# Per-request instrumentation: share of requests to time (0 disables it) and
+# the thresholds above which a request is logged as a warning. Timings are sent
+# back in ``Server-Timing`` to staff users, or to everyone when
+# REQUEST_INSTRUMENTATION_SERVER_TIMING is set (e.g. in development).
+REQUEST_INSTRUMENTATION_SAMPLE_RATE = float(
+    os.getenv("REQUEST_INSTRUMENTATION_SAMPLE_RATE", "0.01")
+)
+REQUEST_INSTRUMENTATION_SERVER_TIMING = os.getenv(
+    "REQUEST_INSTRUMENTATION_SERVER_TIMING", ""
+).lower() in ("1", "true", "yes")
+REQUEST_INSTRUMENTATION_SLOW_MS = int(
+    os.getenv("REQUEST_INSTRUMENTATION_SLOW_MS", "500")
+)
+REQUEST_INSTRUMENTATION_MAX_QUERIES = 50
+REQUEST_INSTRUMENTATION_N_PLUS_ONE_THRESHOLD = 5
+
+# Responses smaller than this many bytes are sent uncompressed.
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# Scrapers read /api/metrics/ without logging in by sending
+# ``Authorization: Bearer <METRICS_SCRAPE_TOKEN>``; without a token only staff
+# users can. METRICS_ALLOWED_IPS optionally restricts scrapes to a comma
+# separated list of addresses (as seen by Django, so behind a proxy this is
+# the proxy's). Set PROMETHEUS_MULTIPROC_DIR to aggregate metrics across
+# gunicorn workers.
+METRICS_SCRAPE_TOKEN = os.getenv("METRICS_SCRAPE_TOKEN", "")
+METRICS_ALLOWED_IPS = [
+    address.strip()
+    for address in os.getenv("METRICS_ALLOWED_IPS", "").split(",")
+    if address.strip()
+]
+
+# Paid transactions older than this many months are moved to the archive table
+# by the ``archive_transactions`` management command.
+TRANSACTIONS_ARCHIVE_AFTER_MONTHS = int(
+    os.getenv("TRANSACTIONS_ARCHIVE_AFTER_MONTHS", "13")
+)
+TRANSACTIONS_ARCHIVE_BATCH_SIZE = int(
+    os.getenv("TRANSACTIONS_ARCHIVE_BATCH_SIZE", "1000")
+)
+
+# Upper bound for each statement of a category merge, in milliseconds (0
+# disables it). A merge that would take longer is rolled back.
+CATEGORY_MERGE_STATEMENT_TIMEOUT_MS = int(
+    os.getenv("CATEGORY_MERGE_STATEMENT_TIMEOUT_MS", "30000")
+)
+
+# Background jobs, run by ``manage.py run_jobs`` workers. A running job whose
+# task has not reported progress for JOBS_LEASE_SECONDS is considered lost and
+# retried; failed attempts are retried after JOBS_RETRY_DELAY_SECONDS, doubled
+# on every further attempt.
+JOBS_POLL_INTERVAL_SECONDS = float(os.getenv("JOBS_POLL_INTERVAL_SECONDS", "1"))
+JOBS_LEASE_SECONDS = int(os.getenv("JOBS_LEASE_SECONDS", "600"))
+JOBS_RETRY_DELAY_SECONDS = int(os.getenv("JOBS_RETRY_DELAY_SECONDS", "30"))
+
+# Change feed (``core.changes``). Entries younger than the settle delay are
+# held back so a slower transaction cannot commit an id below a consumer's
+# cursor; it must exceed the longest write transaction. A category merge can
+# spend CATEGORY_MERGE_STATEMENT_TIMEOUT_MS on a statement after its entries
+# are written, so the default is that timeout plus a margin. The feed always
+# reads the primary, so replica lag does not count against it. Entries older
+# than CHANGE_LOG_COMPACT_AFTER_DAYS are compacted by ``compact_changes``.
+CHANGE_FEED_SETTLE_SECONDS = int(
+    os.getenv(
+        "CHANGE_FEED_SETTLE_SECONDS",
+        str(-(-CATEGORY_MERGE_STATEMENT_TIMEOUT_MS // 1000) + 5),
+    )
+)
+CHANGE_LOG_COMPACT_AFTER_DAYS = int(os.getenv("CHANGE_LOG_COMPACT_AFTER_DAYS", "30"))
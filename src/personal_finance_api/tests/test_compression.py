@@ -0,0 +1,239 @@
+import gzip
+import json
+import zlib
+from datetime import date
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from core import compression
+from core.compression import negotiate_encoding, parse_accept_encoding
+from core.schema import clear_schema_cache
+from personal_finance_api.instrumentation import RequestStats
+from personal_finance_api.middleware import (
+    CompressionMiddleware,
+    ReplicaRoutingMiddleware,
+)
+from transactions.models import Account, Category, Transaction
+from transactions.tests.helpers import authenticate_user, create_user
+
+BODY = json.dumps([{"description": f"Row {index}"} for index in range(200)]).encode()
+
+
+def decompress(encoding, data):
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    if encoding == "br":
+        return compression.brotli.decompress(data)
+    return compression.zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+class NegotiationTests(SimpleTestCase):
+    def test_parse_accept_encoding(self):
+        self.assertEqual(
+            parse_accept_encoding("gzip;q=0.5, BR , identity;q=bad,"),
+            {"gzip": 0.5, "br": 1.0, "identity": 0.0},
+        )
+
+    def test_highest_quality_then_server_preference(self):
+        available = ["zstd", "br", "gzip"]
+        self.assertEqual(negotiate_encoding("gzip, br", available), "br")
+        self.assertEqual(negotiate_encoding("gzip, br;q=0.8", available), "gzip")
+        self.assertEqual(negotiate_encoding("*", available), "zstd")
+        self.assertEqual(negotiate_encoding("*, zstd;q=0", available), "br")
+        self.assertIsNone(negotiate_encoding("gzip;q=0, deflate", available))
+        self.assertIsNone(negotiate_encoding("", available))
+
+    def test_only_installed_encoders_are_offered(self):
+        self.assertEqual(negotiate_encoding("zstd, br, gzip", ["gzip"]), "gzip")
+
+
+@override_settings(COMPRESSION_MIN_SIZE=1024)
+class CompressionMiddlewareTests(SimpleTestCase):
+    def _request(self, accept_encoding="gzip"):
+        request = APIRequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+        request.instrumentation = RequestStats()
+        return request
+
+    def _json(self, body=BODY, **headers):
+        response = HttpResponse(body, content_type="application/json")
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    def test_every_available_encoding_round_trips(self):
+        for encoding in compression.ENCODERS:
+            with self.subTest(encoding):
+                request = self._request(encoding)
+                response = CompressionMiddleware(lambda request: self._json())(request)
+
+                self.assertEqual(response["Content-Encoding"], encoding)
+                self.assertEqual(response["Vary"], "Accept-Encoding")
+                self.assertEqual(int(response["Content-Length"]), len(response.content))
+                self.assertEqual(decompress(encoding, response.content), BODY)
+
+                stats = request.instrumentation
+                self.assertEqual(stats.compression["original_bytes"], len(BODY))
+                self.assertGreater(stats.compression["ratio"], 1)
+                self.assertIn("compress;dur=", stats.server_timing())
+
+    def test_small_responses_are_not_compressed(self):
+        response = CompressionMiddleware(lambda request: self._json(b"[]"))(
+            self._request()
+        )
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(response.content, b"[]")
+
+    def test_skips_unaccepted_binary_and_encoded_responses(self):
+        cases = [
+            (self._request("identity"), self._json()),
+            (self._request(), HttpResponse(BODY, content_type="image/png")),
+            (self._request(), self._json(**{"Content-Encoding": "br"})),
+        ]
+        for request, original in cases:
+            with self.subTest(original.get("Content-Type")):
+                response = CompressionMiddleware(
+                    lambda request, original=original: original
+                )(request)
+                self.assertEqual(response.content, BODY)
+                self.assertIsNone(request.instrumentation.compression)
+
+    def test_responses_setting_cookies_are_not_compressed(self):
+        def login(request):
+            response = self._json()
+            response.set_cookie("access_token", "secret")
+            return response
+
+        request = self._request()
+        response = CompressionMiddleware(login)(request)
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, BODY)
+        self.assertIsNone(request.instrumentation.compression)
+
+    def test_primary_pin_cookie_does_not_prevent_compression(self):
+        def write(request):
+            response = self._json()
+            response.set_cookie(ReplicaRoutingMiddleware.cookie_name, "1")
+            return response
+
+        response = CompressionMiddleware(write)(self._request())
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_strong_etag_is_weakened(self):
+        response = CompressionMiddleware(lambda request: self._json(ETag='"abc"'))(
+            self._request()
+        )
+        self.assertEqual(response["ETag"], 'W/"abc"')
+
+    def test_streaming_response_is_compressed_incrementally(self):
+        rows = [b"date,description,value\n"] + [
+            f"2024-01-{index % 28 + 1:02d},Row {index},{index}.00\n".encode()
+            for index in range(5000)
+        ]
+        consumed = []
+
+        def stream():
+            for row in rows:
+                consumed.append(row)
+                yield row
+
+        request = self._request()
+        response = CompressionMiddleware(
+            lambda request: StreamingHttpResponse(stream(), content_type="text/csv")
+        )(request)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertFalse(response.has_header("Content-Length"))
+
+        chunks = iter(response.streaming_content)
+        first = next(chunks)
+        # Output starts before the whole body has been produced.
+        self.assertLess(len(consumed), len(rows))
+        self.assertEqual(
+            zlib.decompressobj(wbits=31).decompress(first + b"".join(chunks)),
+            b"".join(rows),
+        )
+        self.assertEqual(
+            request.instrumentation.compression["original_bytes"],
+            len(b"".join(rows)),
+        )
+
+
+@override_settings(
+    REQUEST_INSTRUMENTATION_SAMPLE_RATE=1.0,
+    REQUEST_INSTRUMENTATION_SERVER_TIMING=True,
+    COMPRESSION_MIN_SIZE=512,
+)
+class CompressedEndpointTests(APITestCase):
+    def setUp(self):
+        self.user = create_user(username="compresseduser")
+        self.client = authenticate_user(self.client, self.user)
+        account = Account.objects.create(
+            user=self.user, name="Checking", closing_day=1, due_day=10
+        )
+        category = Category.objects.create(user=self.user, name="Food", type="EXPENSE")
+        Transaction.objects.bulk_create(
+            Transaction(
+                user=self.user,
+                account=account,
+                category=category,
+                description=f"Groceries {index}",
+                value=10 + index,
+                date=date.today(),
+                type="EXPENSE",
+            )
+            for index in range(50)
+        )
+
+    def test_list_is_compressed_and_logged(self):
+        with self.assertLogs("personal_finance_api.requests", "INFO") as logs:
+            response = self.client.get(
+                reverse("transactions:transactions-list"),
+                HTTP_ACCEPT_ENCODING="gzip",
+            )
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        payload = json.loads(gzip.decompress(response.content))
+        self.assertEqual(payload["count"], 50)
+        self.assertIn("compress;dur=", response["Server-Timing"])
+
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record["compression"]["encoding"], "gzip")
+        self.assertGreater(record["compression"]["ratio"], 1)
+
+    @override_settings(OPENAPI_SCHEMA_FILE=None)
+    def test_conditional_get_of_compressed_response(self):
+        clear_schema_cache()
+        self.addCleanup(clear_schema_cache)
+        url = reverse("core:openapi_schema")
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertTrue(response["ETag"].startswith('W/"'))
+
+        cached = self.client.get(
+            url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b"")
+        self.assertFalse(cached.has_header("Content-Encoding"))
+        self.assertEqual(cached["ETag"], response["ETag"])
+        self.assertIn("Accept-Encoding", cached["Vary"])
+
+    def test_export_stream_is_logged_once_sent(self):
+        with self.assertLogs("personal_finance_api.requests", "INFO") as logs:
+            response = self.client.get(
+                reverse("transactions:transactions-export"),
+                HTTP_ACCEPT_ENCODING="gzip",
+            )
+            body = b"".join(response.streaming_content)
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(len(gzip.decompress(body).splitlines()), 51)
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record["compression"]["compressed_bytes"], len(body))
@@ -0,0 +1,146 @@
+from typing import ClassVar
+
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient, APITransactionTestCase
+
+from personal_finance_api.db_router import PrimaryReplicaRouter, read_from_primary
+from personal_finance_api.middleware import ReplicaRoutingMiddleware
+from transactions.models import Account, Transaction
+from transactions.tests.helpers import authenticate_user, create_user
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1", "replica_2"], REPLICA_PIN_SECONDS=5)
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = PrimaryReplicaRouter()
+        self.read_alias = None
+
+    def _view(self, request):
+        self.read_alias = self.router.db_for_read(Transaction)
+        return HttpResponse()
+
+    def _call(self, request):
+        return ReplicaRoutingMiddleware(self._view)(request)
+
+    def test_reads_default_outside_requests(self):
+        self.assertEqual(self.router.db_for_read(Transaction), "default")
+
+    def test_safe_request_reads_from_replica(self):
+        self._call(self.factory.get("/api/transactions/transactions/"))
+
+        self.assertIn(self.read_alias, ["replica_1", "replica_2"])
+        self.assertTrue(read_from_primary.get())
+
+    def test_writes_always_go_to_primary(self):
+        response = self._call(self.factory.post("/api/transactions/transactions/"))
+
+        self.assertEqual(self.read_alias, "default")
+        self.assertEqual(self.router.db_for_write(Transaction), "default")
+        cookie = response.cookies[ReplicaRoutingMiddleware.cookie_name]
+        self.assertEqual(cookie["max-age"], 5)
+
+    def test_reads_stick_to_primary_after_write(self):
+        request = self.factory.get("/api/transactions/transactions/")
+        request.COOKIES[ReplicaRoutingMiddleware.cookie_name] = "1"
+
+        self._call(request)
+
+        self.assertEqual(self.read_alias, "default")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_reads_default(self):
+        self._call(self.factory.get("/api/transactions/transactions/"))
+
+        self.assertEqual(self.read_alias, "default")
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate("replica_1", "transactions"))
+        self.assertIsNone(self.router.allow_migrate("default", "transactions"))
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], REPLICA_PIN_SECONDS=5)
+class ReplicaDatabaseTests(APITransactionTestCase):
+    """
+    Routing against a real ``replica`` alias. In tests it mirrors ``default``,
+    so rows must be committed for it to see them.
+    """
+
+    databases: ClassVar[set[str]] = {"default", "replica"}
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user(username="replicauser")
+        self.client = authenticate_user(self.client, self.user)
+        self.url = reverse("transactions:accounts-list")
+        Account.objects.create(
+            user=self.user, name="Checking", closing_day=1, due_day=10
+        )
+
+    def _request(self, client, method, *args, **kwargs):
+        with (
+            CaptureQueriesContext(connections["default"]) as primary,
+            CaptureQueriesContext(connections["replica"]) as replica,
+        ):
+            response = getattr(client, method)(self.url, *args, **kwargs)
+        return response, self._account_queries(primary), self._account_queries(replica)
+
+    def _account_queries(self, queries):
+        return [
+            query["sql"]
+            for query in queries.captured_queries
+            if "transactions_account" in query["sql"]
+        ]
+
+    def _other_client(self, user):
+        return authenticate_user(APIClient(), user)
+
+    def test_reads_go_to_the_replica(self):
+        response, primary, replica = self._request(self.client, "get")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(primary, [])
+        self.assertTrue(replica)
+
+    def test_writes_go_to_default(self):
+        response, primary, replica = self._request(
+            self.client,
+            "post",
+            {"name": "Savings", "closing_day": 1, "due_day": 10},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(any(sql.startswith("INSERT") for sql in primary))
+        self.assertEqual(replica, [])
+
+    def test_the_pin_returns_the_users_reads_to_the_primary(self):
+        self._request(
+            self.client,
+            "post",
+            {"name": "Savings", "closing_day": 1, "due_day": 10},
+            format="json",
+        )
+
+        # The client that wrote, through its cookie.
+        response, primary, replica = self._request(self.client, "get")
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertTrue(primary)
+        self.assertEqual(replica, [])
+
+        # Another client of the same user, through the cached pin.
+        _, primary, replica = self._request(self._other_client(self.user), "get")
+        self.assertTrue(primary)
+        self.assertEqual(replica, [])
+
+        # Other users keep reading the replica.
+        other = create_user(username="otherreplicauser")
+        _, primary, replica = self._request(self._other_client(other), "get")
+        self.assertEqual(primary, [])
+        self.assertTrue(replica)
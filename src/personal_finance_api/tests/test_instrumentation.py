@@ -0,0 +1,113 @@
+import json
+
+from django.db import connection
+from django.http import HttpResponse
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from personal_finance_api.instrumentation import (
+    RequestStats,
+    TimedSerializerMixin,
+    current_stats,
+)
+from personal_finance_api.middleware import RequestInstrumentationMiddleware
+from transactions.models import Account, Category
+from transactions.tests.helpers import authenticate_user, create_user
+
+
+@override_settings(
+    REQUEST_INSTRUMENTATION_SAMPLE_RATE=1.0,
+    REQUEST_INSTRUMENTATION_N_PLUS_ONE_THRESHOLD=3,
+    REQUEST_INSTRUMENTATION_SERVER_TIMING=True,
+)
+class RequestInstrumentationTests(APITestCase):
+    def setUp(self):
+        self.user = create_user(username="timeduser")
+        self.client = authenticate_user(self.client, self.user)
+        Account.objects.create(
+            user=self.user,
+            name="Checking",
+            initial_balance=0,
+            closing_day=1,
+            due_day=10,
+        )
+
+    def _timings(self, response):
+        return {
+            metric.split(";")[0]: metric
+            for metric in response["Server-Timing"].split(", ")
+        }
+
+    def test_server_timing_header(self):
+        with self.assertLogs("personal_finance_api.requests", "INFO") as logs:
+            response = self.client.get(reverse("transactions:accounts-list"))
+
+        self.assertEqual(set(self._timings(response)), {"db", "ser", "view", "total"})
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record["status"], 200)
+        self.assertEqual(record["view"], "transactions:accounts-list")
+        self.assertGreater(record["queries"], 0)
+        self.assertGreater(record["serializer_ms"], 0)
+        self.assertIn(f'"{record["queries"]} queries"', self._timings(response)["db"])
+
+    def test_repeated_queries_are_flagged(self):
+        for index in range(3):
+            Category.objects.create(
+                user=self.user, name=f"Category {index}", type="EXPENSE"
+            )
+
+        def lookups(request):
+            for category in Category.objects.filter(user=self.user):
+                Category.objects.filter(pk=category.pk).exists()
+            return HttpResponse()
+
+        request = APIRequestFactory().get("/")
+        with self.assertLogs("personal_finance_api.requests", "WARNING") as logs:
+            RequestInstrumentationMiddleware(lookups)(request)
+
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(list(record["repeated_queries"].values()), [3])
+
+    def test_serializer_queries_are_not_subtracted_twice(self):
+        class AccountCountSerializer(TimedSerializerMixin, serializers.Serializer):
+            accounts = serializers.SerializerMethodField()
+
+            def get_accounts(self, user):
+                return Account.objects.filter(user=user).count()
+
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        try:
+            with connection.execute_wrapper(stats):
+                data = AccountCountSerializer(self.user).data
+        finally:
+            current_stats.reset(token)
+        stats.finish()
+
+        self.assertEqual(data, {"accounts": 1})
+        self.assertEqual(stats.query_count, 1)
+        self.assertGreater(stats.serializer_db_time, 0)
+        self.assertEqual(stats.serializer_db_time, stats.db_time)
+        self.assertAlmostEqual(
+            stats.view_time, stats.total_time - stats.serializer_time
+        )
+
+    @override_settings(REQUEST_INSTRUMENTATION_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_untouched(self):
+        response = self.client.get(reverse("transactions:accounts-list"))
+
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(REQUEST_INSTRUMENTATION_SERVER_TIMING=False)
+    def test_server_timing_is_only_sent_to_staff(self):
+        with self.assertLogs("personal_finance_api.requests", "INFO"):
+            response = self.client.get(reverse("transactions:accounts-list"))
+        self.assertNotIn("Server-Timing", response)
+
+        self.user.is_staff = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        response = self.client.get(reverse("transactions:accounts-list"))
+        self.assertIn("Server-Timing", response)
@@ -0,0 +1,399 @@
+"""
+SQL query budget for every route of the transactions, users, jobs and
+authentication APIs.
+
+Each route and method is requested against a small dataset and again after the
+dataset has grown past a page; the number of queries must not change, and must
+stay within ``query_budget.json``. After an intentional change, regenerate the
+budget with ``UPDATE_QUERY_BUDGET=1 pytest <this file>`` and review the diff.
+"""
+
+import json
+import os
+import re
+import uuid
+from datetime import date
+from pathlib import Path
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authentication.blacklist import blacklist_filter
+from authentication.tests.helpers import login_payload, sample_user
+from authentication.user_cache import user_cache
+from jobs.queue import enqueue
+from transactions.models import Account, Category, Transaction
+
+BUDGET_FILE = Path(__file__).with_name("query_budget.json")
+NAMESPACES = ("transactions", "users", "jobs", "authentication")
+LOGOUT = "authentication:logout"
+
+_STATEMENT = re.compile(r"^\s*(\w+)")
+_PARENTHESES = re.compile(r"\([^()]*\)")
+_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+"?(\w+)', re.IGNORECASE)
+
+
+def iter_routes():
+    """Yield ``(name, callback)`` for the named routes of ``NAMESPACES``."""
+
+    def walk(patterns, namespace):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from walk(pattern.url_patterns, namespace)
+            elif pattern.name:
+                yield f"{namespace}:{pattern.name}", pattern.callback
+
+    seen = set()
+    for resolver in get_resolver().url_patterns:
+        if isinstance(resolver, URLResolver) and resolver.namespace in NAMESPACES:
+            for name, callback in walk(resolver.url_patterns, resolver.namespace):
+                if name not in seen:
+                    seen.add(name)
+                    yield name, callback
+
+
+def route_methods(callback) -> list[str]:
+    view_class = getattr(callback, "cls", None) or callback.view_class
+    # Viewsets add "head" to their actions on the first GET they serve.
+    methods = getattr(callback, "actions", None) or [
+        method for method in view_class.http_method_names if hasattr(view_class, method)
+    ]
+    return sorted(
+        method.upper() for method in methods if method not in ("head", "options")
+    )
+
+
+def query_shape(sql: str) -> str:
+    """Statement and main table of ``sql``, e.g. ``SELECT users_user``."""
+    statement = _STATEMENT.match(sql).group(1).upper()
+    # Drop parenthesised subqueries so the outer FROM is the one matched.
+    while (flattened := _PARENTHESES.sub(" ", sql)) != sql:
+        sql = flattened
+    table = _TABLE.search(sql)
+    return f"{statement} {table.group(1)}" if table else statement
+
+
+class QueryBudgetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        blacklist_filter.reset()
+
+        self.user = sample_user(username="budgetuser", password="password")
+        self.account = Account.objects.create(
+            user=self.user,
+            name="Checking",
+            initial_balance=0,
+            closing_day=1,
+            due_day=10,
+        )
+        self.category = Category.objects.create(
+            user=self.user, name="Food", type="EXPENSE", color="#FF0000"
+        )
+        self.transaction = self._transaction(
+            0, installment_group_id=uuid.uuid4(), installment_current=1
+        )
+        # Deleted by the DELETE scenarios; accounts and categories in use
+        # cannot be deleted.
+        self.spare_account = Account.objects.create(
+            user=self.user, name="Spare", closing_day=1, due_day=10
+        )
+        self.spare_category = Category.objects.create(
+            user=self.user, name="Spare", type="INCOME"
+        )
+        self.merged_category = Category.objects.create(
+            user=self.user, name="Merged", type="EXPENSE"
+        )
+        self._transaction(-1, category=self.merged_category)
+        series = uuid.uuid4()
+        self.installment = self._transaction(
+            -2, installment_group_id=series, installment_current=1
+        )
+        self._transaction(-3, installment_group_id=series, installment_current=2)
+        self.job = enqueue("transactions.build_balance_checkpoints", user=self.user)
+        # Logout blacklists one token; refresh needs another, still valid.
+        self.refresh = RefreshToken.for_user(self.user)
+        self.refresh_cookie = RefreshToken.for_user(self.user)
+
+    def _transaction(self, index, **extra):
+        extra.setdefault("account", self.account)
+        extra.setdefault("category", self.category)
+        return Transaction.objects.create(
+            user=self.user,
+            description=f"Transaction {index}",
+            value=10 + index,
+            date=date.today(),
+            type="EXPENSE",
+            **extra,
+        )
+
+    def _grow(self, rows=30):
+        """Add more than a page of rows to every list the user can see."""
+        for index in range(1, rows + 1):
+            account = Account.objects.create(
+                user=self.user, name=f"Account {index}", closing_day=1, due_day=10
+            )
+            category = Category.objects.create(
+                user=self.user, name=f"Category {index}", type="EXPENSE"
+            )
+            self._transaction(index, account=account, category=category)
+            sample_user(username=f"budgetuser{index}")
+            enqueue("transactions.build_balance_checkpoints", user=self.user)
+
+    def _transaction_data(self):
+        return {
+            "account_id": str(self.account.pk),
+            "category_id": str(self.category.pk),
+            "description": "Groceries",
+            "value": "50.00",
+            "date": date.today().isoformat(),
+            "type": "EXPENSE",
+        }
+
+    def scenarios(self) -> dict:
+        """
+        ``"route METHOD"`` -> ``(path, data)`` or ``(path, data, cookies)`` for
+        every budgeted request.
+        """
+        transaction_url = reverse(
+            "transactions:transactions-detail", args=[self.transaction.pk]
+        )
+        account_url = reverse("transactions:accounts-detail", args=[self.account.pk])
+        category_url = reverse(
+            "transactions:categories-detail", args=[self.category.pk]
+        )
+        month = f"?start_date={date.today().replace(day=1)}&end_date={date.today()}"
+        account_data = {
+            "name": "Savings",
+            "account_type": "SAVINGS",
+            "initial_balance": "10.00",
+            "closing_day": 1,
+            "due_day": 10,
+        }
+        category_data = {
+            "name": "Leisure",
+            "icon": "mdi-tag",
+            "color": "#00FF00",
+            "type": "EXPENSE",
+        }
+        return {
+            "transactions:api-root GET": (reverse("transactions:api-root"), None),
+            "transactions:transactions-list GET": (
+                reverse("transactions:transactions-list") + month,
+                None,
+            ),
+            "transactions:transactions-list POST": (
+                reverse("transactions:transactions-list"),
+                self._transaction_data(),
+            ),
+            "transactions:transactions-summary GET": (
+                reverse("transactions:transactions-summary") + month,
+                None,
+            ),
+            "transactions:transactions-export GET": (
+                reverse("transactions:transactions-export") + month,
+                None,
+            ),
+            "transactions:transactions-detail GET": (transaction_url, None),
+            "transactions:transactions-detail PUT": (
+                transaction_url,
+                self._transaction_data(),
+            ),
+            "transactions:transactions-detail PATCH": (
+                transaction_url,
+                {"description": "Renamed"},
+            ),
+            "transactions:transactions-detail DELETE": (transaction_url, None),
+            "transactions:transactions-delete-series DELETE": (
+                reverse(
+                    "transactions:transactions-delete-series",
+                    args=[self.installment.pk],
+                ),
+                None,
+            ),
+            "transactions:dashboard GET": (reverse("transactions:dashboard"), None),
+            "transactions:accounts-list GET": (
+                reverse("transactions:accounts-list"),
+                None,
+            ),
+            "transactions:accounts-list POST": (
+                reverse("transactions:accounts-list"),
+                account_data,
+            ),
+            "transactions:accounts-detail GET": (account_url, None),
+            "transactions:accounts-balance GET": (
+                reverse("transactions:accounts-balance", args=[self.account.pk])
+                + f"?date={date.today()}",
+                None,
+            ),
+            "transactions:accounts-detail PUT": (account_url, account_data),
+            "transactions:accounts-detail PATCH": (account_url, {"name": "Main"}),
+            "transactions:accounts-detail DELETE": (
+                reverse("transactions:accounts-detail", args=[self.spare_account.pk]),
+                None,
+            ),
+            "transactions:categories-list GET": (
+                reverse("transactions:categories-list"),
+                None,
+            ),
+            "transactions:categories-list POST": (
+                reverse("transactions:categories-list"),
+                category_data,
+            ),
+            "transactions:categories-detail GET": (category_url, None),
+            "transactions:categories-detail PUT": (
+                category_url,
+                {**category_data, "name": "Groceries"},
+            ),
+            "transactions:categories-detail PATCH": (category_url, {"icon": "mdi"}),
+            "transactions:categories-merge POST": (
+                reverse("transactions:categories-merge", args=[self.category.pk]),
+                {"sources": [str(self.merged_category.pk)]},
+            ),
+            "transactions:categories-detail DELETE": (
+                reverse(
+                    "transactions:categories-detail", args=[self.spare_category.pk]
+                ),
+                None,
+            ),
+            "jobs:jobs-list GET": (reverse("jobs:jobs-list"), None),
+            "jobs:jobs-list POST": (
+                reverse("jobs:jobs-list"),
+                {"name": "transactions.build_balance_checkpoints"},
+            ),
+            "jobs:jobs-detail GET": (
+                reverse("jobs:jobs-detail", args=[self.job.pk]),
+                None,
+            ),
+            "jobs:jobs-cancel POST": (
+                reverse("jobs:jobs-cancel", args=[self.job.pk]),
+                None,
+            ),
+            "users:user_list GET": (reverse("users:user_list"), None),
+            "users:user_profile GET": (reverse("users:user_profile"), None),
+            "users:user_profile PATCH": (
+                reverse("users:user_profile"),
+                {"first_name": "Budget"},
+            ),
+            "authentication:register POST": (
+                reverse("authentication:register"),
+                {
+                    "username": "newbudgetuser",
+                    "email": "newbudgetuser@example.com",
+                    "first_name": "New",
+                    "last_name": "User",
+                    "password": "S3cure-pass!",
+                    "password2": "S3cure-pass!",
+                },
+            ),
+            "authentication:login POST": (
+                reverse("authentication:login"),
+                login_payload("budgetuser", "password"),
+            ),
+            "authentication:logout POST": (
+                reverse("authentication:logout"),
+                {"refresh_token": str(self.refresh)},
+            ),
+            "authentication:token_refresh POST": (
+                reverse("authentication:token_refresh"),
+                None,
+                {"refresh_token": str(self.refresh_cookie)},
+            ),
+        }
+
+    def checks(self) -> dict:
+        """
+        ``"route METHOD"`` -> assertion that the request did its work, for the
+        routes that answer with a success status whether or not they did.
+        """
+        installments = Transaction.objects.filter(
+            installment_group_id=self.installment.installment_group_id
+        )
+        return {
+            "authentication:token_refresh POST": lambda response: (
+                self.assertEqual(response.data, {"refreshed": True})
+            ),
+            "authentication:logout POST": lambda response: self.assertTrue(
+                BlacklistedToken.objects.filter(token__jti=self.refresh["jti"]).exists()
+            ),
+            "transactions:transactions-delete-series DELETE": lambda response: (
+                self.assertFalse(installments.exists())
+            ),
+        }
+
+    def _measure(self, key, path, data, cookies=None) -> list[str]:
+        # Start cold, so counts do not depend on which request ran first.
+        cache.clear()
+        user_cache.clear_local()
+        route, method = key.rsplit(" ", 1)
+        anonymous = route.startswith("authentication:") and route != LOGOUT
+        self.client.force_authenticate(None if anonymous else self.user)
+        for name, value in (cookies or {}).items():
+            self.client.cookies[name] = value
+
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method.lower())(path, data, format="json")
+            if response.streaming:
+                b"".join(response.streaming_content)
+
+        self.assertLess(
+            response.status_code, 400, f"{key}: {getattr(response, 'data', None)}"
+        )
+        if check := self.checks().get(key):
+            check(response)
+        return [query_shape(query["sql"]) for query in queries]
+
+    def test_every_route_has_a_budget_and_stays_within_it(self):
+        scenarios = self.scenarios()
+        routes = {
+            f"{name} {method}"
+            for name, callback in iter_routes()
+            for method in route_methods(callback)
+        }
+        self.assertEqual(
+            sorted(routes - scenarios.keys()), [], "Routes without a scenario"
+        )
+
+        reads = [key for key in sorted(scenarios) if key.endswith(" GET")]
+        small = {key: self._measure(key, *scenarios[key]) for key in reads}
+        self._grow()
+        measured = {key: self._measure(key, *scenarios[key]) for key in reads}
+        for key in reads:
+            with self.subTest(key):
+                self.assertEqual(
+                    len(measured[key]),
+                    len(small[key]),
+                    f"{key}: query count grows with the number of rows\n"
+                    f"{small[key]}\n{measured[key]}",
+                )
+
+        # Deletes last, so the other writes still find their objects.
+        writes = sorted(
+            scenarios.keys() - set(reads),
+            key=lambda key: (key.endswith(" DELETE"), key),
+        )
+        for key in writes:
+            measured[key] = self._measure(key, *scenarios[key])
+
+        budget = {
+            key: {"queries": len(shapes), "shapes": shapes}
+            for key, shapes in sorted(measured.items())
+        }
+        if os.environ.get("UPDATE_QUERY_BUDGET"):
+            BUDGET_FILE.write_text(json.dumps(budget, indent=2) + "\n")
+
+        expected = json.loads(BUDGET_FILE.read_text())
+        self.assertEqual(sorted(expected), sorted(budget), "Stale query budget")
+        for key, actual in budget.items():
+            with self.subTest(key):
+                self.assertLessEqual(
+                    actual["queries"],
+                    expected[key]["queries"],
+                    f"{key} exceeds its query budget\n"
+                    f"budget: {expected[key]['shapes']}\n"
+                    f"actual: {actual['shapes']}",
+                )
@@ -2,32 +2,17 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view as swagger_get_schema_view
-from rest_framework.permissions import AllowAny
 
-schema_view = swagger_get_schema_view(
-    openapi.Info(
-        title="Personal Finance API",
-        default_version="v1",
-        description="API documentation for the Personal Finance application",
-        terms_of_service="https://www.example.com/terms/",
-        contact=openapi.Contact(email="contact@example.com"),
-    ),
-    public=True,
-    permission_classes=(AllowAny,),
-)
+from core.views import SwaggerUIView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/auth/", include("authentication.urls", namespace="authentication")),
     path("api/users/", include("users.urls", namespace="users")),
     path("api/transactions/", include("transactions.urls", namespace="transactions")),
-    path(
-        "api/docs/",
-        schema_view.with_ui("swagger", cache_timeout=0),
-        name="swagger-schema",
-    ),
+    path("api/jobs/", include("jobs.urls", namespace="jobs")),
+    path("api/", include("core.urls", namespace="core")),
+    path("api/docs/", SwaggerUIView.as_view(), name="swagger-schema"),
 ]
 
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from transactions.services import TransactionArchiveService
+
+
+class Command(BaseCommand):
+    help = "Move paid transactions older than the archive cutoff to the archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            help="Archive transactions dated before this date (YYYY-MM-DD). "
+            "Defaults to TRANSACTIONS_ARCHIVE_AFTER_MONTHS months ago.",
+        )
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        cutoff = (
+            parse_date(options["before"])
+            if options["before"]
+            else TransactionArchiveService.cutoff()
+        )
+
+        archived = TransactionArchiveService.archive(
+            cutoff=cutoff, batch_size=options["batch_size"]
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Archived {archived} transactions before {cutoff}.")
+        )
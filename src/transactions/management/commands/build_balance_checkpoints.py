@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from transactions.models import Account
+from transactions.services import AccountBalanceService
+
+
+class Command(BaseCommand):
+    help = "Add the missing month-end balance checkpoints of every account."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--until",
+            help="Build checkpoints up to the last month end on or before this "
+            "date (YYYY-MM-DD). Defaults to the end of last month.",
+        )
+        parser.add_argument(
+            "--account", action="append", help="Only this account (repeatable)."
+        )
+
+    def handle(self, *args, **options):
+        until = parse_date(options["until"]) if options["until"] else None
+        accounts = Account.objects.order_by("pk")
+        if options["account"]:
+            accounts = accounts.filter(pk__in=options["account"])
+
+        created = 0
+        for account in accounts.iterator():
+            created += AccountBalanceService.build_checkpoints(account, until=until)
+
+        self.stdout.write(self.style.SUCCESS(f"Created {created} balance checkpoints."))
@@ -0,0 +1,94 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from transactions.reconciliation import KINDS, reconcile_shards
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute monthly rollups and balance checkpoints from the raw "
+        "transactions, report the drift and optionally repair it. Users are "
+        "split into shards spread over worker processes. Progress and drift "
+        "are exported as reconciliation_* metrics; run it with "
+        "PROMETHEUS_MULTIPROC_DIR set to the app's directory to scrape them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repair", action="store_true", help="Overwrite drifted aggregates."
+        )
+        parser.add_argument(
+            "--user", action="append", help="Only this user id (repeatable)."
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Worker processes, each reconciling one shard at a time.",
+        )
+        parser.add_argument(
+            "--shard-size",
+            type=int,
+            default=500,
+            help="Users per shard; each shard is one database transaction.",
+        )
+        parser.add_argument(
+            "--samples",
+            type=int,
+            default=50,
+            help="How many drifted aggregates to print.",
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by("pk")
+        if options["user"]:
+            users = users.filter(pk__in=options["user"])
+        user_ids = list(users.values_list("pk", flat=True))
+
+        size = max(1, options["shard_size"])
+        shard_count = -(-len(user_ids) // size)
+        workers = max(1, min(options["workers"], shard_count))
+        arguments = {
+            "repair": options["repair"],
+            "shard_size": size,
+            "sample_limit": options["samples"],
+        }
+        started = time.perf_counter()
+
+        if workers == 1:
+            total = reconcile_shards(user_ids, **arguments)
+        else:
+            # Children must open their own connections.
+            connections.close_all()
+            with ProcessPoolExecutor(workers, initializer=django.setup) as pool:
+
+                def run(reconcile, shards):
+                    futures = [pool.submit(reconcile, shard) for shard in shards]
+                    for future in as_completed(futures):
+                        yield future.result()
+
+                total = reconcile_shards(user_ids, run=run, **arguments)
+
+        for sample in total["samples"]:
+            self.stdout.write(sample)
+        elapsed = time.perf_counter() - started
+        summary = ", ".join(
+            f"{kind}: {total['checked'][kind]} checked, {total['drift'][kind]} "
+            f"drifted, {total['repaired'][kind]} repaired"
+            for kind in KINDS
+        )
+        style = (
+            self.style.WARNING if any(total["drift"].values()) else self.style.SUCCESS
+        )
+        self.stdout.write(
+            style(
+                f"Reconciled {total['users']} users in {elapsed:.1f}s with "
+                f"{workers} worker(s). {summary}."
+            )
+        )
@@ -0,0 +1,199 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedTransaction",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(editable=False, primary_key=True, serialize=False),
+                ),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                (
+                    "description",
+                    models.CharField(max_length=255, verbose_name="Description"),
+                ),
+                (
+                    "value",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=12, verbose_name="Value"
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Competence Date")),
+                ("paid", models.BooleanField(default=True, verbose_name="Paid")),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[
+                            ("INCOME", "Income"),
+                            ("EXPENSE", "Expense"),
+                            ("TRANSFER", "Transfer"),
+                        ],
+                        max_length=10,
+                        verbose_name="Type",
+                    ),
+                ),
+                (
+                    "installment_group_id",
+                    models.UUIDField(
+                        blank=True, null=True, verbose_name="Installment Group ID"
+                    ),
+                ),
+                (
+                    "installment_current",
+                    models.PositiveIntegerField(
+                        blank=True, null=True, verbose_name="Installment Current"
+                    ),
+                ),
+                (
+                    "installment_total",
+                    models.PositiveIntegerField(
+                        blank=True, null=True, verbose_name="Installment Total"
+                    ),
+                ),
+                (
+                    "notes",
+                    models.TextField(blank=True, null=True, verbose_name="Notes"),
+                ),
+                (
+                    "archived_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Archived At"),
+                ),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="archived_transactions",
+                        to="transactions.account",
+                        verbose_name="Account",
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="archived_transactions",
+                        to="transactions.category",
+                        verbose_name="Category",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_transactions",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="User",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Archived Transaction",
+                "verbose_name_plural": "Archived Transactions",
+                "ordering": ("-date", "-created_at"),
+                "indexes": [
+                    models.Index(
+                        fields=["user", "date"], name="transaction_user_id_173b87_idx"
+                    ),
+                    models.Index(
+                        fields=["account", "date"],
+                        name="transaction_account_fc11eb_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="MonthlyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[
+                            ("INCOME", "Income"),
+                            ("EXPENSE", "Expense"),
+                            ("TRANSFER", "Transfer"),
+                        ],
+                        max_length=10,
+                        verbose_name="Type",
+                    ),
+                ),
+                (
+                    "month",
+                    models.DateField(
+                        help_text="First day of the month", verbose_name="Month"
+                    ),
+                ),
+                (
+                    "total",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=14, verbose_name="Total"
+                    ),
+                ),
+                ("count", models.PositiveIntegerField(default=0, verbose_name="Count")),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="monthly_rollups",
+                        to="transactions.account",
+                        verbose_name="Account",
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="monthly_rollups",
+                        to="transactions.category",
+                        verbose_name="Category",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_rollups",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="User",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Monthly Rollup",
+                "verbose_name_plural": "Monthly Rollups",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "month"], name="transaction_user_id_deed3f_idx"
+                    ),
+                    models.Index(
+                        fields=["account", "month"],
+                        name="transaction_account_3c7c29_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
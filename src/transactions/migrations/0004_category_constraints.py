@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def reset_invalid_colors(apps, schema_editor):
+    # Rows written before the color was validated would fail the CHECK.
+    Category = apps.get_model("transactions", "Category")
+    Category.objects.exclude(color__regex=r"^#[0-9A-Fa-f]{6}$").update(
+        color="#000000"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0003_archive"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name="category",
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name="category",
+            constraint=models.UniqueConstraint(
+                fields=("user", "name", "type"),
+                name="transactions_category_user_name_type_unique",
+            ),
+        ),
+        migrations.RunPython(reset_invalid_colors, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="category",
+            constraint=models.CheckConstraint(
+                condition=models.Q(("color__regex", "^#[0-9A-Fa-f]{6}$")),
+                name="transactions_category_color_hex",
+            ),
+        ),
+    ]
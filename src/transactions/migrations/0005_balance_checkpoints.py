@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0004_category_constraints"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AccountBalanceCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Date")),
+                (
+                    "net",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=14, verbose_name="Net"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Account Balance Checkpoint",
+                "verbose_name_plural": "Account Balance Checkpoints",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["account", "date"], name="transaction_account_4f6194_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="accountbalancecheckpoint",
+            name="account",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="balance_checkpoints",
+                to="transactions.account",
+                verbose_name="Account",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="accountbalancecheckpoint",
+            constraint=models.UniqueConstraint(
+                fields=("account", "date"),
+                name="transactions_checkpoint_account_date_unique",
+            ),
+        ),
+    ]
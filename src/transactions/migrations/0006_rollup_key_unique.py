@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:13
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_rollups(apps, schema_editor):
+    # Concurrent archive runs could create several rows for one key; fold
+    # them into the oldest row before the key becomes unique.
+    MonthlyRollup = apps.get_model("transactions", "MonthlyRollup")
+    duplicates = (
+        MonthlyRollup.objects.values("user", "account", "category", "type", "month")
+        .annotate(
+            rows=Count("id"),
+            keep=Min("id"),
+            total_sum=Sum("total"),
+            count_sum=Sum("count"),
+        )
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for key in duplicates:
+        rows = MonthlyRollup.objects.filter(
+            user=key["user"],
+            account=key["account"],
+            category=key["category"],
+            type=key["type"],
+            month=key["month"],
+        )
+        rows.filter(id=key["keep"]).update(
+            total=key["total_sum"], count=key["count_sum"]
+        )
+        rows.exclude(id=key["keep"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0005_balance_checkpoints"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_rollups, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="monthlyrollup",
+            constraint=models.UniqueConstraint(
+                fields=("user", "account", "category", "type", "month"),
+                name="transactions_rollup_key_unique",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="monthlyrollup",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("category__isnull", True)),
+                fields=("user", "account", "type", "month"),
+                name="transactions_rollup_uncategorized_key_unique",
+            ),
+        ),
+    ]
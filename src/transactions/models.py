@@ -3,6 +3,8 @@ from django.conf import settings
 from core.models import BaseModel
 from django.utils.translation import gettext_lazy as _
 
+HEX_COLOR_PATTERN = r"^#[0-9A-Fa-f]{6}$"
+
 
 class Category(BaseModel):
     class TypeChoices(models.TextChoices):
@@ -35,7 +37,16 @@ class Category(BaseModel):
     class Meta:
         verbose_name = _("Category")
         verbose_name_plural = _("Categories")
-        unique_together = ("user", "name", "type")
+        constraints = (
+            models.UniqueConstraint(
+                fields=["user", "name", "type"],
+                name="transactions_category_user_name_type_unique",
+            ),
+            models.CheckConstraint(
+                condition=models.Q(color__regex=HEX_COLOR_PATTERN),
+                name="transactions_category_color_hex",
+            ),
+        )
 
     def __str__(self) -> str:
         return f"{self.name} ({self.get_type_display()})"
@@ -137,8 +148,174 @@ class Transaction(BaseModel):
         ordering = ["-date", "-created_at"]
         indexes = [
             models.Index(fields=["user", "date"]),
+            models.Index(fields=["account", "date"]),
             models.Index(fields=["installment_group_id"]),
         ]
 
     def __str__(self):
         return f"{self.description} - {self.value}"
+
+
+class ArchivedTransaction(models.Model):
+    """
+    Cold copy of a paid ``Transaction`` moved out of the hot table.
+
+    The column layout mirrors ``Transaction`` one-to-one (ids and timestamps
+    are preserved) so both tables can be combined with ``QuerySet.union``.
+    """
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_transactions",
+        verbose_name=_("User"),
+    )
+    account = models.ForeignKey(
+        "transactions.Account",
+        on_delete=models.PROTECT,
+        related_name="archived_transactions",
+        verbose_name=_("Account"),
+    )
+    category = models.ForeignKey(
+        "transactions.Category",
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="archived_transactions",
+        verbose_name=_("Category"),
+    )
+
+    description = models.CharField(max_length=255, verbose_name=_("Description"))
+    value = models.DecimalField(
+        max_digits=12, decimal_places=2, verbose_name=_("Value")
+    )
+    date = models.DateField(verbose_name=_("Competence Date"))
+    paid = models.BooleanField(default=True, verbose_name=_("Paid"))
+    type = models.CharField(
+        max_length=10,
+        choices=Transaction.TransactionType.choices,
+        verbose_name=_("Type"),
+    )
+
+    installment_group_id = models.UUIDField(
+        null=True, blank=True, verbose_name=_("Installment Group ID")
+    )
+    installment_current = models.PositiveIntegerField(
+        null=True, blank=True, verbose_name=_("Installment Current")
+    )
+    installment_total = models.PositiveIntegerField(
+        null=True, blank=True, verbose_name=_("Installment Total")
+    )
+
+    notes = models.TextField(blank=True, null=True, verbose_name=_("Notes"))
+
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Archived At"))
+
+    class Meta:
+        verbose_name = _("Archived Transaction")
+        verbose_name_plural = _("Archived Transactions")
+        ordering = ("-date", "-created_at")
+        indexes = (
+            models.Index(fields=["user", "date"]),
+            models.Index(fields=["account", "date"]),
+        )
+
+    def __str__(self):
+        return f"{self.description} - {self.value}"
+
+
+class MonthlyRollup(models.Model):
+    """
+    Per-month totals of archived transactions, kept for dashboards and
+    balances so they never have to scan the archive table.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="monthly_rollups",
+        verbose_name=_("User"),
+    )
+    account = models.ForeignKey(
+        "transactions.Account",
+        on_delete=models.PROTECT,
+        related_name="monthly_rollups",
+        verbose_name=_("Account"),
+    )
+    category = models.ForeignKey(
+        "transactions.Category",
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="monthly_rollups",
+        verbose_name=_("Category"),
+    )
+    type = models.CharField(
+        max_length=10,
+        choices=Transaction.TransactionType.choices,
+        verbose_name=_("Type"),
+    )
+    month = models.DateField(
+        help_text=_("First day of the month"), verbose_name=_("Month")
+    )
+    total = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, verbose_name=_("Total")
+    )
+    count = models.PositiveIntegerField(default=0, verbose_name=_("Count"))
+
+    class Meta:
+        verbose_name = _("Monthly Rollup")
+        verbose_name_plural = _("Monthly Rollups")
+        indexes = (
+            models.Index(fields=["user", "month"]),
+            models.Index(fields=["account", "month"]),
+        )
+        # NULLs are distinct in a unique index, so uncategorized rollups need
+        # their own partial one.
+        constraints = (
+            models.UniqueConstraint(
+                fields=["user", "account", "category", "type", "month"],
+                name="transactions_rollup_key_unique",
+            ),
+            models.UniqueConstraint(
+                fields=["user", "account", "type", "month"],
+                condition=models.Q(category__isnull=True),
+                name="transactions_rollup_uncategorized_key_unique",
+            ),
+        )
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.type} - {self.total}"
+
+
+class AccountBalanceCheckpoint(models.Model):
+    """
+    Net of an account's paid transactions, archived ones included, up to and
+    including ``date`` (the last day of a month). The initial balance is left
+    out so editing it does not invalidate checkpoints. Balances as of any
+    date start from the nearest checkpoint instead of the first transaction.
+    """
+
+    account = models.ForeignKey(
+        Account,
+        on_delete=models.CASCADE,
+        related_name="balance_checkpoints",
+        verbose_name=_("Account"),
+    )
+    date = models.DateField(verbose_name=_("Date"))
+    net = models.DecimalField(max_digits=14, decimal_places=2, verbose_name=_("Net"))
+
+    class Meta:
+        verbose_name = _("Account Balance Checkpoint")
+        verbose_name_plural = _("Account Balance Checkpoints")
+        constraints = (
+            models.UniqueConstraint(
+                fields=["account", "date"],
+                name="transactions_checkpoint_account_date_unique",
+            ),
+        )
+
+    def __str__(self):
+        return f"{self.account_id} {self.date} - {self.net}"
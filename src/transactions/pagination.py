@@ -0,0 +1,95 @@
+import uuid
+from datetime import date, datetime
+
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import remove_query_param
+
+
+class StatementPagination(pagination.CursorPagination):
+    """
+    Keyset pagination for account statements, newest first: page 50 costs
+    the same as page 1, and rows added meanwhile do not shift the pages.
+
+    DRF's cursor keeps only the first ordering field plus an offset, which
+    turns into an OFFSET scan on days with many rows. Here the cursor holds
+    the whole (date, created_at, id) key of the row at the page boundary and
+    the next page starts strictly past it.
+    """
+
+    ordering = ("-date", "-created_at", "-id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # The running balances follow this order; ``?ordering=`` is ignored.
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.request = request
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+        key = self._decode_position(self.cursor.position) if self.cursor else None
+
+        if reverse:
+            queryset = queryset.order_by(*(field[1:] for field in self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if key is not None:
+            queryset = queryset.filter(_past(key, "gt" if reverse else "lt"))
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, key is not None
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Nothing is newer than the cursor any more: start over.
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._link(self.page[0], reverse=True)
+
+    def _link(self, row, reverse):
+        position = f"{row.date.isoformat()}|{row.created_at.isoformat()}|{row.pk}"
+        return self.encode_cursor(
+            pagination.Cursor(offset=0, reverse=reverse, position=position)
+        )
+
+    def _decode_position(self, position):
+        if position is None:
+            return None
+        try:
+            day, created_at, pk = position.split("|")
+            return (
+                date.fromisoformat(day),
+                datetime.fromisoformat(created_at),
+                uuid.UUID(pk),
+            )
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+
+def _past(key, lookup: str) -> Q:
+    """Rows strictly past ``key`` in (date, created_at, id) order."""
+    day, created_at, pk = key
+    return (
+        Q(**{f"date__{lookup}": day})
+        | Q(date=day, **{f"created_at__{lookup}": created_at})
+        | Q(date=day, created_at=created_at, **{f"pk__{lookup}": pk})
+    )
@@ -0,0 +1,239 @@
+"""
+Recompute the precomputed aggregates of a set of users from their source rows,
+compare them with what is stored and optionally repair the difference.
+
+Two kinds of aggregates are checked:
+
+- ``rollup``: ``MonthlyRollup`` totals and counts, against the archived
+  transactions of each ``(account, category, type, month)``.
+- ``checkpoint``: ``AccountBalanceCheckpoint`` nets, against the paid live
+  and archived transactions up to each checkpoint date.
+
+Each ``reconcile_users`` call handles one shard of users with a fixed number
+of grouped queries, however many users and rows the shard holds.
+``reconcile_shards`` runs a whole reconciliation shard by shard and exports
+its progress and drift as ``reconciliation_*`` metrics, for both the
+``reconcile_balances`` command (which spreads shards over worker processes)
+and the ``transactions.reconcile_balances`` job. Metrics recorded outside the
+web processes, e.g. by the command, can only be scraped when
+``PROMETHEUS_MULTIPROC_DIR`` is set for both.
+"""
+
+from collections import defaultdict
+from collections.abc import Callable
+from decimal import Decimal
+from functools import partial
+
+from django.db import transaction as db_transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+from core.metrics import RECONCILIATION_LAST_SUCCESS, record_reconciliation
+from transactions.models import (
+    AccountBalanceCheckpoint,
+    ArchivedTransaction,
+    MonthlyRollup,
+    Transaction,
+)
+from transactions.services import signed_value
+
+KINDS = ("rollup", "checkpoint")
+
+
+def empty_report() -> dict:
+    return {
+        "users": 0,
+        "checked": dict.fromkeys(KINDS, 0),
+        "drift": dict.fromkeys(KINDS, 0),
+        "repaired": dict.fromkeys(KINDS, 0),
+        "samples": [],
+    }
+
+
+def merge_reports(total: dict, report: dict, sample_limit: int | None = None) -> dict:
+    total["users"] += report["users"]
+    for key in ("checked", "drift", "repaired"):
+        for kind, count in report[key].items():
+            total[key][kind] += count
+    total["samples"] += report["samples"]
+    if sample_limit is not None:
+        del total["samples"][sample_limit:]
+    return total
+
+
+def reconcile_shards(
+    user_ids,
+    repair: bool = False,
+    shard_size: int = 500,
+    sample_limit: int = 50,
+    run: Callable = map,
+    on_progress: Callable | None = None,
+) -> dict:
+    """
+    Reconcile ``user_ids`` in shards of ``shard_size`` users and return the
+    merged report, recording metrics as each shard completes. ``run`` maps
+    ``reconcile_users`` over the shards (``map``, or a process pool yielding
+    reports as they finish); ``on_progress(done, total)`` follows each shard.
+    """
+    user_ids = list(user_ids)
+    size = max(1, shard_size)
+    shards = [user_ids[start : start + size] for start in range(0, len(user_ids), size)]
+
+    total, done = empty_report(), 0
+    record_reconciliation(total, done, len(user_ids))
+    reconcile = partial(reconcile_users, repair=repair, sample_limit=sample_limit)
+    for report in run(reconcile, shards):
+        done += report["users"]
+        record_reconciliation(report, done, len(user_ids))
+        merge_reports(total, report, sample_limit)
+        if on_progress is not None:
+            on_progress(done, len(user_ids))
+
+    RECONCILIATION_LAST_SUCCESS.set_to_current_time()
+    return total
+
+
+def reconcile_users(user_ids, repair: bool = False, sample_limit: int = 20) -> dict:
+    """
+    Reconcile the aggregates of ``user_ids`` and return a report: users and
+    aggregates checked, drifted and repaired per kind, plus up to
+    ``sample_limit`` drift descriptions.
+
+    With ``repair`` the stored rows of the shard are locked before the source
+    rows are read, so a write that shifts a checkpoint meanwhile waits and is
+    applied on top of the repaired value instead of being overwritten.
+    """
+    user_ids = list(user_ids)
+    report = empty_report()
+    report["users"] = len(user_ids)
+    if not user_ids:
+        return report
+
+    with db_transaction.atomic():
+        rollups = MonthlyRollup.objects.filter(user_id__in=user_ids)
+        checkpoints = AccountBalanceCheckpoint.objects.filter(
+            account__user_id__in=user_ids
+        )
+        if repair:
+            rollups = rollups.select_for_update()
+            checkpoints = checkpoints.select_for_update(of=("self",))
+
+        _reconcile_rollups(user_ids, list(rollups), report, repair, sample_limit)
+        _reconcile_checkpoints(
+            user_ids, list(checkpoints), report, repair, sample_limit
+        )
+
+    return report
+
+
+def _drift(report, kind, key, stored, expected, sample_limit) -> None:
+    report["drift"][kind] += 1
+    if len(report["samples"]) < sample_limit:
+        report["samples"].append(
+            f"{kind} {' '.join(map(str, key))}: stored {stored}, expected {expected}"
+        )
+
+
+def _reconcile_rollups(user_ids, stored_rows, report, repair, sample_limit) -> None:
+    expected = {
+        (
+            row["user_id"],
+            row["account_id"],
+            row["category_id"],
+            row["type"],
+            row["month"],
+        ): (row["total"], row["count"])
+        for row in ArchivedTransaction.objects.filter(user_id__in=user_ids)
+        .annotate(month=TruncMonth("date"))
+        .values("user_id", "account_id", "category_id", "type", "month")
+        .annotate(total=Sum("value"), count=Count("id"))
+        .order_by()
+    }
+
+    stored = {
+        (
+            rollup.user_id,
+            rollup.account_id,
+            rollup.category_id,
+            rollup.type,
+            rollup.month,
+        ): rollup
+        for rollup in stored_rows
+    }
+
+    stale, missing, drifted = [], [], 0
+    for key in expected.keys() | stored.keys():
+        report["checked"]["rollup"] += 1
+        rollup = stored.get(key)
+        current = (rollup.total, rollup.count) if rollup else None
+        if current == expected.get(key):
+            continue
+
+        _drift(report, "rollup", key, current, expected.get(key), sample_limit)
+        drifted += 1
+        if rollup:
+            stale.append(rollup)
+        if key in expected:
+            missing.append((key, expected[key]))
+
+    if repair and drifted:
+        MonthlyRollup.objects.filter(pk__in=[row.pk for row in stale]).delete()
+        MonthlyRollup.objects.bulk_create(
+            MonthlyRollup(
+                user_id=user_id,
+                account_id=account_id,
+                category_id=category_id,
+                type=type_,
+                month=month,
+                total=total,
+                count=count,
+            )
+            for (user_id, account_id, category_id, type_, month), (
+                total,
+                count,
+            ) in missing
+        )
+        report["repaired"]["rollup"] += drifted
+
+
+def _reconcile_checkpoints(user_ids, checkpoints, report, repair, sample_limit) -> None:
+    if not checkpoints:
+        return
+
+    monthly = defaultdict(Decimal)
+    for queryset in (
+        Transaction.objects.filter(user_id__in=user_ids, paid=True),
+        ArchivedTransaction.objects.filter(user_id__in=user_ids),
+    ):
+        for row in (
+            queryset.annotate(month=TruncMonth("date"))
+            .values("account_id", "month")
+            .annotate(net=Sum(signed_value()))
+            .order_by()
+        ):
+            monthly[row["account_id"], row["month"]] += row["net"]
+
+    months = defaultdict(list)
+    for account_id, month in monthly:
+        months[account_id].append(month)
+
+    drifted = []
+    checkpoints.sort(key=lambda checkpoint: (checkpoint.account_id, checkpoint.date))
+    account_id = net = pending = None
+    for checkpoint in checkpoints:
+        if checkpoint.account_id != account_id:
+            account_id, net = checkpoint.account_id, Decimal("0.00")
+            pending = sorted(months[account_id])
+        while pending and pending[0] <= checkpoint.date:
+            net += monthly[account_id, pending.pop(0)]
+
+        report["checked"]["checkpoint"] += 1
+        if checkpoint.net != net:
+            key = (checkpoint.account_id, checkpoint.date)
+            _drift(report, "checkpoint", key, checkpoint.net, net, sample_limit)
+            checkpoint.net = net
+            drifted.append(checkpoint)
+
+    if repair and drifted:
+        AccountBalanceCheckpoint.objects.bulk_update(drifted, ["net"])
+        report["repaired"]["checkpoint"] += len(drifted)
@@ -0,0 +1,97 @@
+"""
+Accounts and categories referenced by transaction writes, resolved once per
+request.
+
+Ownership is part of the lookup: only the requesting user's rows are loaded,
+so a primary key of someone else's account resolves to nothing, exactly like
+a missing one. Accounts and categories are fetched together with a single
+``UNION ALL`` query, and every later lookup in the same request (the items of
+a bulk create, the installments of a series) is served from memory.
+"""
+
+from django.core.exceptions import ValidationError
+from django.db.models import CharField, Value
+
+from transactions.models import Account, Category
+
+# Columns loaded per model, aligned position by position in the UNION. The
+# instances are built with only these fields; the rest stay deferred.
+COLUMNS = {
+    Account: ("id", "user_id", "name", "account_type", None, None),
+    Category: ("id", "user_id", "name", "type", "icon", "color"),
+}
+
+
+class ReferenceCache:
+    def __init__(self, user):
+        self.user = user
+        self._objects = {Account: {}, Category: {}}
+
+    @classmethod
+    def for_request(cls, request) -> "ReferenceCache":
+        cache = getattr(request, "_transaction_references", None)
+        if cache is None or cache.user != request.user:
+            cache = request._transaction_references = cls(request.user)
+        return cache
+
+    def load(self, accounts=(), categories=()) -> None:
+        """Fetch the given primary keys that are not cached yet, in one query."""
+        wanted = {}
+        for model, pks in ((Account, accounts), (Category, categories)):
+            pks = {pk for pk in map(self._to_pk(model), pks) if pk is not None}
+            if pks := pks - self._objects[model].keys():
+                wanted[model] = pks
+        if not wanted:
+            return
+
+        querysets = [self._queryset(model, pks) for model, pks in wanted.items()]
+        queryset = querysets[0].union(*querysets[1:], all=True)
+        for label, *values in queryset:
+            model = Account if label == "account" else Category
+            row = dict(zip(COLUMNS[model], values))
+            # ``from_db`` expects the values in model field order.
+            fields = [
+                field.attname
+                for field in model._meta.concrete_fields
+                if field.attname in row
+            ]
+            instance = model.from_db(
+                queryset.db, fields, [row[field] for field in fields]
+            )
+            self._objects[model][instance.pk] = instance
+
+        # Remember misses too, so a bad key is not looked up again.
+        for model, pks in wanted.items():
+            for pk in pks:
+                self._objects[model].setdefault(pk, None)
+
+    def get(self, model, pk):
+        """The user's ``model`` instance with ``pk``, or ``None``."""
+        pk = self._to_pk(model)(pk)
+        if pk is None:
+            return None
+        if pk not in self._objects[model]:
+            self.load(**{"accounts" if model is Account else "categories": [pk]})
+        return self._objects[model][pk]
+
+    def _queryset(self, model, pks):
+        label = "account" if model is Account else "category"
+        columns = [
+            field if field else Value("", output_field=CharField())
+            for field in COLUMNS[model]
+        ]
+        return model.objects.filter(user=self.user, pk__in=pks).values_list(
+            Value(label, output_field=CharField()), *columns
+        )
+
+    @staticmethod
+    def _to_pk(model):
+        def to_pk(value):
+            if value is None or value == "":
+                return None
+            try:
+                return model._meta.pk.to_python(value)
+            except ValidationError:
+                return None
+
+        return to_pk
@@ -1,59 +1,143 @@
+import re
+from collections.abc import Mapping
+from contextlib import nullcontext
+
+from django.db import IntegrityError
+from django.db import transaction as db_transaction
 from rest_framework import serializers
-from transactions.models import Transaction, Category, Account
+from transactions.models import HEX_COLOR_PATTERN, Transaction, Category, Account
+from transactions.references import ReferenceCache
+from personal_finance_api.instrumentation import TimedSerializerMixin
 from django.utils.translation import gettext_lazy as _
 
+_HEX_COLOR = re.compile(HEX_COLOR_PATTERN)
+
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ["id", "name", "icon", "color", "type"]
 
 
-class CategoryWriteSerializer(serializers.ModelSerializer):
+class CategoryWriteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ["id", "name", "icon", "color", "type"]
         read_only_fields = ["id"]
+        # (user, name, type) uniqueness is enforced by the database on write
+        # (see ``save``), so no exists() query runs beforehand.
+        validators = ()
 
     def validate_color(self, value):
-        import re
-
-        if not re.match(r"^#[0-9A-Fa-f]{6}$", value):
+        if not _HEX_COLOR.match(value):
             raise serializers.ValidationError(
                 _("Color should be in the format HEX (#RRGGBB). Example: #FF5733")
             )
         return value
 
-    def validate(self, data):
-        user = self.context["request"].user
-        name = data.get("name")
-        category_type = data.get("type")
+    def save(self, **kwargs):
+        # In autocommit a rejected statement rolls itself back, so the write
+        # stays a single round trip; inside a transaction a savepoint keeps
+        # the outer transaction usable.
+        in_transaction = db_transaction.get_connection().in_atomic_block
+        try:
+            with db_transaction.atomic() if in_transaction else nullcontext():
+                return super().save(**kwargs)
+        except IntegrityError as e:
+            raise serializers.ValidationError(self._constraint_violation(e)) from e
+
+    def _constraint_violation(self, error):
+        diag = getattr(error.__cause__, "diag", None)
+        constraint = getattr(diag, "constraint_name", None) or str(error)
+
+        if "color" in constraint:
+            return {
+                "color": [
+                    _("Color should be in the format HEX (#RRGGBB). Example: #FF5733")
+                ]
+            }
+        return {"name": [_("You already have a category with this name and type.")]}
+
+
+class AccountSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Account
+        fields = ["id", "name", "account_type"]
+
+
+class UserReferenceField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key of one of the requesting user's objects. Lookups go through
+    the request's ``ReferenceCache``, so other users' objects are rejected
+    by the same query that loads the user's own.
+    """
+
+    def __init__(self, invalid_message, **kwargs):
+        super().__init__(**kwargs)
+        self.error_messages["invalid"] = invalid_message
 
-        queryset = Category.objects.filter(user=user, name=name, type=category_type)
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.context["request"].user)
 
-        if self.instance:
-            queryset = queryset.exclude(pk=self.instance.pk)
+    def to_internal_value(self, data):
+        references = ReferenceCache.for_request(self.context["request"])
+        instance = references.get(self.queryset.model, data)
+        if instance is None:
+            self.fail("invalid")
+        return instance
 
-        if queryset.exists():
+
+class CategoryMergeSerializer(TimedSerializerMixin, serializers.Serializer):
+    sources = UserReferenceField(
+        queryset=Category.objects.all(),
+        many=True,
+        allow_empty=False,
+        invalid_message="Invalid category.",
+    )
+
+    def to_internal_value(self, data):
+        sources = data.get("sources") if isinstance(data, Mapping) else None
+        if isinstance(sources, list):
+            ReferenceCache.for_request(self.context["request"]).load(categories=sources)
+        return super().to_internal_value(data)
+
+    def validate_sources(self, sources):
+        target = self.context["target"]
+        if any(source.pk == target.pk for source in sources):
             raise serializers.ValidationError(
-                {"name": _("You already have a category with this name and type.")}
+                _("A category cannot be merged into itself.")
             )
-
-        return data
+        if any(source.type != target.type for source in sources):
+            raise serializers.ValidationError(
+                _("Only categories of the same type can be merged.")
+            )
+        return list({source.pk: source for source in sources}.values())
 
 
-class AccountSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Account
-        fields = ["id", "name", "account_type"]
+class TransactionCreateListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.child.load_references(
+                [item for item in data if isinstance(item, Mapping)]
+            )
+        return super().to_internal_value(data)
 
 
-class TransactionCreateSerializer(serializers.ModelSerializer):
-    category_id = serializers.PrimaryKeyRelatedField(
-        queryset=Category.objects.all(), source="category", write_only=True
+class TransactionCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    # ``account`` and ``category`` are accepted as aliases of these.
+    category_id = UserReferenceField(
+        queryset=Category.objects.all(),
+        source="category",
+        write_only=True,
+        required=False,
+        allow_null=True,
+        invalid_message="Invalid category.",
     )
-    account_id = serializers.PrimaryKeyRelatedField(
-        queryset=Account.objects.all(), source="account", write_only=True
+    account_id = UserReferenceField(
+        queryset=Account.objects.all(),
+        source="account",
+        write_only=True,
+        invalid_message="Invalid account.",
     )
     installment_total = serializers.IntegerField(
         required=False, min_value=2, write_only=True
@@ -71,9 +155,7 @@ class TransactionCreateSerializer(serializers.ModelSerializer):
             "description",
             "value",
             "date",
-            "account",
             "account_id",
-            "category",
             "category_id",
             "type",
             "paid",
@@ -81,14 +163,37 @@ class TransactionCreateSerializer(serializers.ModelSerializer):
             "installment_value",
             "notes",
         ]
+        list_serializer_class = TransactionCreateListSerializer
+
+    def to_internal_value(self, data):
+        if isinstance(data, Mapping):
+            data = self._with_aliases(data)
+            self.load_references([data])
+        return super().to_internal_value(data)
+
+    def load_references(self, items) -> None:
+        """Load the accounts and categories of ``items`` in one query."""
+        items = [self._with_aliases(item) for item in items]
+        ReferenceCache.for_request(self.context["request"]).load(
+            accounts=[item.get("account_id") for item in items],
+            categories=[item.get("category_id") for item in items],
+        )
+
+    @staticmethod
+    def _with_aliases(data):
+        missing = [
+            name
+            for name in ("account", "category")
+            if name in data and f"{name}_id" not in data
+        ]
+        if not missing:
+            return data
+        data = data.copy()
+        for name in missing:
+            data[f"{name}_id"] = data[name]
+        return data
 
     def validate(self, data):
-        user = self.context["request"].user
-        if data.get("category") and data["category"].user != user:
-            raise serializers.ValidationError({"category_id": "Invalid category."})
-        if data["account"].user != user:
-            raise serializers.ValidationError({"account_id": "Invalid account."})
-
         installments = data.get("installment_total")
         inst_value = data.get("installment_value")
         total_value = data.get("value")
@@ -110,7 +215,7 @@ class TransactionCreateSerializer(serializers.ModelSerializer):
         return data
 
 
-class TransactionSerializer(serializers.ModelSerializer):
+class TransactionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     account = AccountSerializer(read_only=True)
 
@@ -138,13 +243,24 @@ class TransactionSerializer(serializers.ModelSerializer):
         return obj.date.strftime("%d/%m/%Y")
 
 
-class CategoryChartDataSerializer(serializers.Serializer):
+class TransactionStatementSerializer(TransactionSerializer):
+    """A transaction with the account balance right after it."""
+
+    running_balance = serializers.DecimalField(
+        max_digits=14, decimal_places=2, read_only=True
+    )
+
+    class Meta(TransactionSerializer.Meta):
+        fields = TransactionSerializer.Meta.fields + ["running_balance"]
+
+
+class CategoryChartDataSerializer(TimedSerializerMixin, serializers.Serializer):
     category_name = serializers.CharField()
     color = serializers.CharField()
     total = serializers.DecimalField(max_digits=12, decimal_places=2)
 
 
-class DashboardSerializer(serializers.Serializer):
+class DashboardSerializer(TimedSerializerMixin, serializers.Serializer):
     total_income = serializers.DecimalField(max_digits=12, decimal_places=2)
     total_expense = serializers.DecimalField(max_digits=12, decimal_places=2)
     balance = serializers.DecimalField(max_digits=12, decimal_places=2)
@@ -152,7 +268,7 @@ class DashboardSerializer(serializers.Serializer):
     expense_by_category = CategoryChartDataSerializer(many=True, required=False)
 
 
-class AccountListSerializer(serializers.ModelSerializer):
+class AccountListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     current_balance = serializers.DecimalField(
         max_digits=12, decimal_places=2, read_only=True
     )
@@ -170,7 +286,14 @@ class AccountListSerializer(serializers.ModelSerializer):
         ]
 
 
-class AccountWriteSerializer(serializers.ModelSerializer):
+class AccountBalanceSerializer(TimedSerializerMixin, serializers.Serializer):
+    account = serializers.UUIDField()
+    date = serializers.DateField()
+    balance = serializers.DecimalField(max_digits=14, decimal_places=2)
+    checkpoint_date = serializers.DateField(allow_null=True)
+
+
+class AccountWriteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Account
         fields = [
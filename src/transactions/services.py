@@ -1,8 +1,57 @@
+from collections import defaultdict
+from datetime import date, timedelta
 from decimal import Decimal
 import uuid
-from transactions.models import Transaction
+from django.conf import settings
+from django.db import connection
+from django.db import transaction as db_transaction
+from django.db.models import Case, DecimalField, F, Max, Q, Sum, Value, When, Window
+from django.db.models.functions import Now, TruncMonth
+from transactions.models import (
+    Account,
+    AccountBalanceCheckpoint,
+    ArchivedTransaction,
+    Category,
+    MonthlyRollup,
+    Transaction,
+)
 from dateutil.relativedelta import relativedelta
 
+from core import changes
+
+
+def signed_value(field: str = "value"):
+    """``field`` as it counts towards a balance: income adds, the rest subtracts."""
+    return Case(
+        When(type=Transaction.TransactionType.INCOME, then=F(field)),
+        default=-F(field),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+def balance_effect():
+    """``signed_value`` of paid transactions; unpaid ones leave balances alone."""
+    return Case(
+        When(paid=False, then=Value(Decimal("0.00"))),
+        default=signed_value(),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+def statement_key(transaction) -> tuple:
+    """Position of ``transaction`` in an account statement, oldest first."""
+    return transaction.date, transaction.created_at, transaction.pk
+
+
+def _statement_before(transaction) -> Q:
+    """Rows that come before ``transaction`` in statement order."""
+    day, created_at, pk = statement_key(transaction)
+    return (
+        Q(date__lt=day)
+        | Q(date=day, created_at__lt=created_at)
+        | Q(date=day, created_at=created_at, pk__lt=pk)
+    )
+
 
 class TransactionService:
     @staticmethod
@@ -14,17 +63,22 @@ class TransactionService:
                 user=user, data=data, total_count=installment_total
             )
 
-        transaction = Transaction.objects.create(
-            user=user,
-            account=data.get("account"),
-            category=data.get("category"),
-            type=data.get("type"),
-            paid=data.get("paid", True),
-            description=data.get("description"),
-            value=data.get("value"),
-            date=data.get("date"),
-            notes=data.get("notes", ""),
-        )
+        with db_transaction.atomic():
+            transaction = Transaction.objects.create(
+                user=user,
+                account=data.get("account"),
+                category=data.get("category"),
+                type=data.get("type"),
+                paid=data.get("paid", True),
+                description=data.get("description"),
+                value=data.get("value"),
+                date=data.get("date"),
+                notes=data.get("notes", ""),
+            )
+            AccountBalanceService.record_change(
+                None, AccountBalanceService.effect(transaction)
+            )
+            changes.record(transaction, changes.Action.CREATED)
         return [transaction]
 
     @staticmethod
@@ -74,16 +128,486 @@ class TransactionService:
             )
             transactions_to_create.append(transaction)
 
-        return Transaction.objects.bulk_create(transactions_to_create)
+        with db_transaction.atomic():
+            transactions = Transaction.objects.bulk_create(transactions_to_create)
+            changes.record_many(transactions, changes.Action.CREATED)
+        return transactions
 
     @staticmethod
     def delete_installment_series(transaction_instance) -> int:
         group_id = transaction_instance.installment_group_id
 
-        if not group_id:
-            transaction_instance.delete()
-            return 1
+        with db_transaction.atomic():
+            if not group_id:
+                AccountBalanceService.record_change(
+                    AccountBalanceService.effect(transaction_instance), None
+                )
+                changes.record(transaction_instance, changes.Action.DELETED)
+                transaction_instance.delete()
+                return 1
 
-        count, _ = Transaction.objects.filter(installment_group_id=group_id).delete()
+            series = Transaction.objects.filter(
+                user_id=transaction_instance.user_id, installment_group_id=group_id
+            )
+            rows = list(series)
+            for row in rows:
+                AccountBalanceService.record_change(
+                    AccountBalanceService.effect(row), None
+                )
+            changes.record_many(rows, changes.Action.DELETED)
+            count, _ = series.delete()
 
         return count
+
+
+class CategoryService:
+    @staticmethod
+    def merge(user, sources: list[Category], target: Category) -> dict:
+        """
+        Move every transaction, archived transaction and rollup of ``sources``
+        to ``target`` and delete ``sources``, atomically. Each table is
+        rewritten with a single set-based statement, so the number of
+        queries does not depend on how many rows are affected.
+        """
+        source_ids = [category.pk for category in sources]
+        timeout = getattr(settings, "CATEGORY_MERGE_STATEMENT_TIMEOUT_MS", 30000)
+
+        with db_transaction.atomic():
+            if timeout and connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT set_config('statement_timeout', %s, true)",
+                        [str(timeout)],
+                    )
+
+            # Lock the categories so no transaction is assigned to a source
+            # after it has been emptied.
+            list(
+                Category.objects.select_for_update()
+                .filter(user=user, pk__in=[*source_ids, target.pk])
+                .values_list("pk", flat=True)
+            )
+
+            transactions = Transaction.objects.filter(
+                user=user, category_id__in=source_ids
+            ).update(category=target, updated_at=Now())
+            archived = ArchivedTransaction.objects.filter(
+                user=user, category_id__in=source_ids
+            ).update(category=target, updated_at=Now())
+            CategoryService._merge_rollups(user, source_ids, target)
+            Category.objects.filter(user=user, pk__in=source_ids).delete()
+
+            # The reassigned rows are logged as one event, not one entry each.
+            changes.record_many(sources, changes.Action.DELETED)
+            changes.record_event(
+                user,
+                "category",
+                changes.Action.MERGED,
+                {
+                    "target": target.pk,
+                    "sources": source_ids,
+                    "transactions": transactions,
+                    "archived_transactions": archived,
+                },
+            )
+
+        return {
+            "merged_categories": len(source_ids),
+            "transactions": transactions,
+            "archived_transactions": archived,
+        }
+
+    @staticmethod
+    def _merge_rollups(user, source_ids: list, target: Category) -> None:
+        """Replace the rollups of ``source_ids`` and ``target`` by their sums."""
+        rollups = MonthlyRollup.objects.filter(
+            user=user, category_id__in=[*source_ids, target.pk]
+        )
+        merged = list(
+            rollups.values("account_id", "type", "month")
+            .annotate(total=Sum("total"), count=Sum("count"))
+            .order_by()
+        )
+        if not merged:
+            return
+
+        rollups.delete()
+        MonthlyRollup.objects.bulk_create(
+            MonthlyRollup(user=user, category=target, **row) for row in merged
+        )
+
+
+class TransactionArchiveService:
+    """
+    Moves old paid transactions into ``ArchivedTransaction`` and keeps the
+    ``MonthlyRollup`` totals in sync, so reads over recent history only touch
+    the hot table.
+    """
+
+    ARCHIVED_FIELDS = (
+        "id",
+        "created_at",
+        "updated_at",
+        "user_id",
+        "account_id",
+        "category_id",
+        "description",
+        "value",
+        "date",
+        "paid",
+        "type",
+        "installment_group_id",
+        "installment_current",
+        "installment_total",
+        "notes",
+    )
+
+    @staticmethod
+    def cutoff(today: date | None = None) -> date:
+        months = getattr(settings, "TRANSACTIONS_ARCHIVE_AFTER_MONTHS", 13)
+        today = today or date.today()
+        return today.replace(day=1) - relativedelta(months=months)
+
+    @staticmethod
+    def archive(
+        cutoff: date | None = None,
+        batch_size: int | None = None,
+        user=None,
+    ) -> int:
+        """
+        Archive paid transactions dated before ``cutoff`` in batches of
+        ``batch_size`` rows, one database transaction per batch.
+        """
+        cutoff = cutoff or TransactionArchiveService.cutoff()
+        batch_size = batch_size or getattr(
+            settings, "TRANSACTIONS_ARCHIVE_BATCH_SIZE", 1000
+        )
+
+        queryset = Transaction.objects.filter(paid=True, date__lt=cutoff)
+        if user is not None:
+            queryset = queryset.filter(user=user)
+
+        archived = 0
+        while True:
+            with db_transaction.atomic():
+                rows = list(
+                    queryset.order_by("date", "id")
+                    .select_for_update(skip_locked=True)
+                    .values(*TransactionArchiveService.ARCHIVED_FIELDS)[:batch_size]
+                )
+                if not rows:
+                    break
+
+                ArchivedTransaction.objects.bulk_create(
+                    [ArchivedTransaction(**row) for row in rows]
+                )
+                TransactionArchiveService._add_to_rollups(rows)
+                Transaction.objects.filter(pk__in=[row["id"] for row in rows]).delete()
+
+            archived += len(rows)
+
+        return archived
+
+    @staticmethod
+    def _add_to_rollups(rows: list[dict]) -> None:
+        groups: dict[tuple, list] = {}
+        for row in rows:
+            key = (
+                row["user_id"],
+                row["account_id"],
+                row["category_id"],
+                row["type"],
+                row["date"].replace(day=1),
+            )
+            total = groups.setdefault(key, [Decimal("0.00"), 0])
+            total[0] += row["value"]
+            total[1] += 1
+
+        # The unique constraints on the rollup key make a concurrent archive
+        # run's insert fail here, and ``update_or_create`` then adds to it.
+        for (user_id, account_id, category_id, type_, month), (
+            total,
+            count,
+        ) in groups.items():
+            MonthlyRollup.objects.update_or_create(
+                user_id=user_id,
+                account_id=account_id,
+                category_id=category_id,
+                type=type_,
+                month=month,
+                defaults={"total": F("total") + total, "count": F("count") + count},
+                create_defaults={"total": total, "count": count},
+            )
+
+    @staticmethod
+    def archived_until(user) -> date | None:
+        """Date of the newest archived transaction of ``user``, if any."""
+        return ArchivedTransaction.objects.filter(user=user).aggregate(
+            last=Max("date")
+        )["last"]
+
+    @staticmethod
+    def reaches_archive(user, start_date: date | None) -> bool:
+        archived_until = TransactionArchiveService.archived_until(user)
+        if archived_until is None:
+            return False
+        return start_date is None or start_date <= archived_until
+
+    @staticmethod
+    def totals(
+        user, start_date: date | None, end_date: date | None, type_=None
+    ) -> dict:
+        """
+        Archived totals grouped by ``(type, category_id)`` for a date range.
+
+        Whole months inside the range are read from ``MonthlyRollup``; only the
+        partially covered edge months fall back to the archive table.
+        """
+        rollups = MonthlyRollup.objects.filter(user=user)
+        archived = ArchivedTransaction.objects.filter(user=user)
+        if type_:
+            rollups = rollups.filter(type=type_)
+            archived = archived.filter(type=type_)
+
+        edges = Q()
+        if start_date:
+            first_full_month = start_date.replace(day=1)
+            if start_date.day != 1:
+                first_full_month += relativedelta(months=1)
+                edges |= Q(date__gte=start_date, date__lt=first_full_month)
+            rollups = rollups.filter(month__gte=first_full_month)
+        if end_date:
+            last_month = end_date.replace(day=1)
+            if end_date + relativedelta(days=1) != last_month + relativedelta(months=1):
+                edges |= Q(date__gte=last_month, date__lte=end_date)
+                rollups = rollups.filter(month__lt=last_month)
+            else:
+                rollups = rollups.filter(month__lte=last_month)
+
+        result: dict[tuple, Decimal] = {}
+        for row in rollups.values("type", "category_id").annotate(total=Sum("total")):
+            key = (row["type"], row["category_id"])
+            result[key] = result.get(key, Decimal("0.00")) + row["total"]
+
+        if edges:
+            if start_date:
+                archived = archived.filter(date__gte=start_date)
+            if end_date:
+                archived = archived.filter(date__lte=end_date)
+            for row in (
+                archived.filter(edges)
+                .values("type", "category_id")
+                .annotate(total=Sum("value"))
+                .order_by()
+            ):
+                key = (row["type"], row["category_id"])
+                result[key] = result.get(key, Decimal("0.00")) + row["total"]
+
+        return result
+
+
+class AccountBalanceService:
+    """
+    Month-end ``AccountBalanceCheckpoint``s and balances as of any date.
+
+    Checkpoints are added by the ``build_balance_checkpoints`` command and
+    kept exact afterwards: creating, editing or deleting a paid transaction
+    dated on or before a checkpoint shifts that checkpoint and every later
+    one by the change (see ``record_change``). Archiving moves rows without
+    changing any balance, so it leaves checkpoints alone.
+    """
+
+    @staticmethod
+    def month_end(day: date) -> date:
+        return day.replace(day=1) + relativedelta(months=1) - timedelta(days=1)
+
+    @staticmethod
+    def last_checkpoint_date(today: date | None = None) -> date:
+        """Checkpoints are never built past the end of the previous month."""
+        return (today or date.today()).replace(day=1) - timedelta(days=1)
+
+    @staticmethod
+    def effect(transaction) -> tuple:
+        """``(account_id, date, amount)`` ``transaction`` adds to a balance."""
+        amount = Decimal("0.00")
+        if transaction.paid:
+            amount = transaction.value
+            if transaction.type != Transaction.TransactionType.INCOME:
+                amount = -amount
+        return transaction.account_id, transaction.date, amount
+
+    @staticmethod
+    def record_change(before: tuple | None, after: tuple | None) -> None:
+        """
+        Shift checkpoints for a transaction whose ``effect`` went from
+        ``before`` to ``after``; ``None`` stands for no transaction.
+        """
+        if before and after and before[:2] == after[:2]:
+            AccountBalanceService.shift(after[0], after[1], after[2] - before[2])
+            return
+        if before:
+            AccountBalanceService.shift(before[0], before[1], -before[2])
+        if after:
+            AccountBalanceService.shift(*after)
+
+    @staticmethod
+    def shift(account_id, since: date, delta) -> int:
+        """Add ``delta`` to the checkpoints of ``account_id`` from ``since`` on."""
+        if not delta or since > AccountBalanceService.last_checkpoint_date():
+            return 0
+        return AccountBalanceCheckpoint.objects.filter(
+            account_id=account_id, date__gte=since
+        ).update(net=F("net") + delta)
+
+    @staticmethod
+    def build_checkpoints(account, until: date | None = None) -> int:
+        """
+        Add the missing month-end checkpoints of ``account`` up to the last
+        month end on or before ``until``, and never past the end of last
+        month, continuing from the newest checkpoint. Returns how many were
+        added.
+        """
+        last = AccountBalanceService.last_checkpoint_date()
+        until = min(until or last, last)
+        if until != AccountBalanceService.month_end(until):
+            until = until.replace(day=1) - timedelta(days=1)
+
+        with db_transaction.atomic():
+            # Serialises builds of the same account.
+            list(
+                Account.objects.select_for_update()
+                .filter(pk=account.pk)
+                .values_list("pk", flat=True)
+            )
+
+            latest = account.balance_checkpoints.order_by("-date").first()
+            transactions = Transaction.objects.filter(
+                account=account, paid=True, date__lte=until
+            )
+            rollups = MonthlyRollup.objects.filter(account=account, month__lte=until)
+            if latest:
+                transactions = transactions.filter(date__gt=latest.date)
+                rollups = rollups.filter(month__gt=latest.date)
+
+            monthly = defaultdict(Decimal)
+            for row in (
+                transactions.annotate(month=TruncMonth("date"))
+                .values("month")
+                .annotate(net=Sum(signed_value()))
+                .order_by()
+            ):
+                monthly[row["month"]] += row["net"]
+            for row in (
+                rollups.values("month")
+                .annotate(net=Sum(signed_value("total")))
+                .order_by()
+            ):
+                monthly[row["month"]] += row["net"]
+
+            if latest:
+                month, net = latest.date + timedelta(days=1), latest.net
+            elif monthly:
+                month, net = min(monthly), Decimal("0.00")
+            else:
+                return 0
+
+            checkpoints = []
+            while month <= until:
+                net += monthly.get(month, 0)
+                checkpoints.append(
+                    AccountBalanceCheckpoint(
+                        account=account,
+                        date=AccountBalanceService.month_end(month),
+                        net=net,
+                    )
+                )
+                month += relativedelta(months=1)
+            AccountBalanceCheckpoint.objects.bulk_create(checkpoints)
+
+        return len(checkpoints)
+
+    @staticmethod
+    def balance_as_of(account, day: date):
+        """
+        Balance of ``account`` at the end of ``day`` and the checkpoint it
+        was computed from, if any. Only the transactions after that
+        checkpoint are summed.
+        """
+        checkpoint = (
+            account.balance_checkpoints.filter(date__lte=day).order_by("-date").first()
+        )
+        net = checkpoint.net if checkpoint else Decimal("0.00")
+
+        for queryset in (
+            Transaction.objects.filter(account=account, paid=True),
+            ArchivedTransaction.objects.filter(account=account),
+        ):
+            queryset = queryset.filter(date__lte=day)
+            if checkpoint:
+                queryset = queryset.filter(date__gt=checkpoint.date)
+            net += queryset.aggregate(net=Sum(signed_value()))["net"] or 0
+
+        return account.initial_balance + net, checkpoint
+
+    @staticmethod
+    def running_balances(account, transactions) -> dict:
+        """
+        Balance of ``account`` right after each of ``transactions`` (rows of
+        that account, e.g. one page of a statement), keyed by primary key.
+
+        The balance before the oldest row is the nearest earlier checkpoint
+        plus the rows since it; from there a window function sums the rows
+        up to the newest one. The cost depends on the page and one month of
+        history, never on how deep into the history the page is.
+        """
+        if not transactions:
+            return {}
+        first = min(transactions, key=statement_key)
+        last = max(transactions, key=statement_key)
+
+        checkpoint = (
+            account.balance_checkpoints.filter(date__lt=first.date)
+            .order_by("-date")
+            .first()
+        )
+        anchor = account.initial_balance
+        if checkpoint:
+            anchor += checkpoint.net
+
+        hot = Transaction.objects.filter(account=account)
+        archived = ArchivedTransaction.objects.filter(account=account)
+        for queryset in (hot.filter(paid=True), archived):
+            queryset = queryset.filter(_statement_before(first))
+            if checkpoint:
+                queryset = queryset.filter(date__gt=checkpoint.date)
+            anchor += queryset.aggregate(net=Sum(signed_value()))["net"] or 0
+
+        # Every row of the account between the oldest and the newest one,
+        # whatever filters selected ``transactions``.
+        page = (
+            hot.exclude(_statement_before(first))
+            .filter(Q(_statement_before(last)) | Q(pk=last.pk))
+            .annotate(
+                running=Window(
+                    Sum(balance_effect()),
+                    order_by=[F("date").asc(), F("created_at").asc(), F("pk").asc()],
+                )
+            )
+            .values_list("date", "created_at", "pk", "running")
+            .order_by("date", "created_at", "pk")
+        )
+        # Archived rows are older than any paid live row, so there are
+        # rarely any in range; they are folded in by position.
+        interleaved = sorted(
+            archived.exclude(_statement_before(first))
+            .filter(_statement_before(last))
+            .annotate(effect=signed_value())
+            .values_list("date", "created_at", "pk", "effect")
+        )
+
+        balances, carried = {}, Decimal("0.00")
+        for day, created_at, pk, running in page:
+            while interleaved and interleaved[0][:3] < (day, created_at, pk):
+                carried += interleaved.pop(0)[3]
+            balances[pk] = anchor + carried + running
+        return balances
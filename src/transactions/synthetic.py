@@ -0,0 +1,298 @@
+"""
+Synthetic users, accounts, categories and transactions for reproducing
+production-scale data locally (see the ``generate_synthetic_data`` command).
+
+Every user is generated from its own ``Random`` seeded with ``(seed, index)``,
+so the output only depends on the seed, the user indexes and the date range,
+never on how the users are split across worker processes or when the
+generator runs. Timestamps are the end of the range, not the current time.
+"""
+
+import random
+import uuid
+from datetime import UTC, date, datetime, time, timedelta
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.db import transaction as db_transaction
+
+from transactions.models import Account, Category, Transaction
+
+User = get_user_model()
+
+USERNAME_PREFIX = "synthetic"
+PASSWORD = "synthetic-pass"
+
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Fábio", "Gabi", "Hugo"]
+LAST_NAMES = ["Silva", "Souza", "Costa", "Santos", "Oliveira", "Pereira", "Lima"]
+
+# name, color, value range
+EXPENSE_CATEGORIES = [
+    ("Food", "#E53935", (8, 250)),
+    ("Transport", "#1E88E5", (5, 120)),
+    ("Health", "#43A047", (20, 600)),
+    ("Leisure", "#8E24AA", (15, 400)),
+    ("Education", "#FB8C00", (50, 900)),
+    ("Shopping", "#6D4C41", (20, 1500)),
+]
+INCOME_CATEGORIES = [
+    ("Freelance", "#00897B", (200, 4000)),
+    ("Investments", "#3949AB", (10, 800)),
+]
+SALARY = ("Salary", "#2E7D32")
+
+INSTALLMENT_SHARE = 0.02
+INCOME_SHARE = 0.08
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _money(rng: random.Random, low: int, high: int) -> Decimal:
+    return Decimal(rng.randint(low * 100, high * 100)) / 100
+
+
+class SyntheticUser:
+    """Rows for one user, as dicts of column attnames per model."""
+
+    def __init__(
+        self,
+        index: int,
+        seed: int,
+        transactions: int,
+        start: date,
+        end: date,
+        password: str,
+    ):
+        self.rng = random.Random(f"{seed}:{index}")
+        self.index = index
+        self.start = start
+        self.end = end
+        # Rows are stamped as created right after the last day of the range.
+        self.now = datetime.combine(end + timedelta(days=1), time.min, UTC)
+        self.days = (end - start).days
+
+        self.user = self._user(password)
+        self.accounts = self._accounts()
+        self.categories = self._categories()
+        self.transactions = self._transactions(transactions)
+
+    def _base(self) -> dict:
+        return {"id": _uuid(self.rng), "created_at": self.now, "updated_at": self.now}
+
+    def _user(self, password: str) -> dict:
+        username = f"{USERNAME_PREFIX}{self.index:07d}"
+        return {
+            **self._base(),
+            "password": password,
+            "last_login": None,
+            "is_superuser": False,
+            "username": username,
+            "first_name": self.rng.choice(FIRST_NAMES),
+            "last_name": self.rng.choice(LAST_NAMES),
+            "email": f"{username}@example.com",
+            "is_staff": False,
+            "is_active": True,
+            "date_joined": self.now,
+            "default_currency": self.rng.choice(["BRL", "BRL", "USD", "EUR"]),
+        }
+
+    def _accounts(self) -> list[dict]:
+        account_types = self.rng.sample(
+            Account.AccountType.values, self.rng.randint(1, 4)
+        )
+        return [
+            {
+                **self._base(),
+                "user_id": self.user["id"],
+                "name": Account.AccountType(account_type).label,
+                "account_type": account_type,
+                "initial_balance": _money(self.rng, 0, 10000),
+                "closing_day": self.rng.randint(1, 28),
+                "due_day": self.rng.randint(1, 28),
+            }
+            for account_type in account_types
+        ]
+
+    def _categories(self) -> list[dict]:
+        categories = []
+        for category_type, definitions in (
+            (Category.TypeChoices.EXPENSE, EXPENSE_CATEGORIES),
+            (Category.TypeChoices.INCOME, [(*SALARY, None), *INCOME_CATEGORIES]),
+        ):
+            for name, color, value_range in definitions:
+                categories.append(
+                    {
+                        **self._base(),
+                        "user_id": self.user["id"],
+                        "name": name,
+                        "icon": f"mdi-{name.lower()}",
+                        "color": color,
+                        "type": category_type,
+                        "value_range": value_range,
+                    }
+                )
+        return categories
+
+    def _transaction(self, category: dict, when: date, value, **extra) -> dict:
+        return {
+            **self._base(),
+            "user_id": self.user["id"],
+            "account_id": self.rng.choice(self.accounts)["id"],
+            "category_id": category["id"],
+            "description": category["name"],
+            "value": value,
+            "date": when,
+            "paid": when <= self.end and self.rng.random() > 0.03,
+            "type": category["type"],
+            "installment_group_id": None,
+            "installment_current": None,
+            "installment_total": None,
+            "notes": "",
+            **extra,
+        }
+
+    def _transactions(self, count: int) -> list[dict]:
+        salary = next(c for c in self.categories if c["name"] == SALARY[0])
+        expenses = [c for c in self.categories if c["type"] == "EXPENSE"]
+        incomes = [
+            c for c in self.categories if c["value_range"] and c["type"] == "INCOME"
+        ]
+        transactions = []
+
+        # A monthly salary, then random expenses, extra income and installment
+        # purchases until ``count`` rows exist.
+        pay = _money(self.rng, 1500, 15000)
+        month = self.start.replace(day=5)
+        while month <= self.end and len(transactions) < count:
+            if month >= self.start:
+                transactions.append(self._transaction(salary, month, pay))
+            month += relativedelta(months=1)
+
+        while len(transactions) < count:
+            when = self.start + timedelta(days=self.rng.randint(0, self.days))
+            roll = self.rng.random()
+            if roll < INCOME_SHARE:
+                category = self.rng.choice(incomes)
+                transactions.append(
+                    self._transaction(
+                        category, when, _money(self.rng, *category["value_range"])
+                    )
+                )
+            elif roll < INCOME_SHARE + INSTALLMENT_SHARE:
+                transactions += self._installments(
+                    self.rng.choice(expenses), when, count - len(transactions)
+                )
+            else:
+                category = self.rng.choice(expenses)
+                transactions.append(
+                    self._transaction(
+                        category, when, _money(self.rng, *category["value_range"])
+                    )
+                )
+        return transactions
+
+    def _installments(self, category: dict, start: date, limit: int) -> list[dict]:
+        total = min(self.rng.randint(2, 12), limit)
+        if total < 2:
+            return []
+
+        low, high = category["value_range"]
+        value = _money(self.rng, low, high * 4) / total
+        value = value.quantize(Decimal("0.01"))
+        group_id = _uuid(self.rng)
+        return [
+            self._transaction(
+                category,
+                start + relativedelta(months=number - 1),
+                value,
+                description=f"{category['name']} ({number}/{total})",
+                installment_group_id=group_id,
+                installment_current=number,
+                installment_total=total,
+            )
+            for number in range(1, total + 1)
+        ]
+
+
+def _columns(model, rows: list[dict]) -> list:
+    return [model._meta.get_field(name) for name in rows[0] if name != "value_range"]
+
+
+def copy_rows(model, rows: list[dict]) -> None:
+    """Stream ``rows`` into ``model``'s table with ``COPY FROM STDIN``."""
+    if not rows:
+        return
+
+    fields = _columns(model, rows)
+    quote = connection.ops.quote_name
+    sql = "COPY {} ({}) FROM STDIN".format(
+        quote(model._meta.db_table),
+        ", ".join(quote(field.column) for field in fields),
+    )
+    with connection.cursor() as cursor, cursor.copy(sql) as copy:
+        for row in rows:
+            copy.write_row([row[field.attname] for field in fields])
+
+
+def bulk_rows(model, rows: list[dict], batch_size: int) -> None:
+    if not rows:
+        return
+
+    fields = _columns(model, rows)
+    model.objects.bulk_create(
+        (
+            model(**{field.attname: row[field.attname] for field in fields})
+            for row in rows
+        ),
+        batch_size=batch_size,
+    )
+
+
+def supports_copy() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def generate_users(
+    indexes,
+    seed: int,
+    transactions: int,
+    start: date,
+    end: date,
+    batch_size: int = 5000,
+) -> dict:
+    """
+    Generate and insert the users at ``indexes``. Users are written in chunks,
+    one database transaction per chunk. Returns the number of rows per table.
+    """
+    # A fixed salt, so the hash is as reproducible as the rest of the rows.
+    password = make_password(PASSWORD, salt=f"{USERNAME_PREFIX}{seed}")
+    counts = {"users": 0, "accounts": 0, "categories": 0, "transactions": 0}
+    indexes = list(indexes)
+    chunk_size = max(1, batch_size // max(transactions, 1))
+
+    for offset in range(0, len(indexes), chunk_size):
+        users = [
+            SyntheticUser(index, seed, transactions, start, end, password)
+            for index in indexes[offset : offset + chunk_size]
+        ]
+        tables = [
+            (User, [user.user for user in users]),
+            (Account, [row for user in users for row in user.accounts]),
+            (Category, [row for user in users for row in user.categories]),
+            (Transaction, [row for user in users for row in user.transactions]),
+        ]
+        with db_transaction.atomic():
+            for model, rows in tables:
+                if supports_copy():
+                    copy_rows(model, rows)
+                else:
+                    bulk_rows(model, rows, batch_size)
+
+        for (model, rows), key in zip(tables, counts):
+            counts[key] += len(rows)
+    return counts
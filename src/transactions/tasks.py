@@ -0,0 +1,56 @@
+"""Background tasks of the transactions app, queued with ``jobs.queue.enqueue``."""
+
+from django.contrib.auth import get_user_model
+from django.utils.dateparse import parse_date
+
+from jobs.registry import task
+from transactions.models import Account
+from transactions.reconciliation import reconcile_shards
+from transactions.services import AccountBalanceService, TransactionArchiveService
+
+
+@task("transactions.archive")
+def archive(job, before=None, batch_size=None):
+    cutoff = parse_date(before) if before else TransactionArchiveService.cutoff()
+    archived = TransactionArchiveService.archive(cutoff=cutoff, batch_size=batch_size)
+    return {"archived": archived, "before": cutoff}
+
+
+@task("transactions.build_balance_checkpoints", user_runnable=True)
+def build_balance_checkpoints(job, until=None, accounts=None):
+    """Checkpoints of the job's user's accounts, or of every account."""
+    until = parse_date(until) if until else None
+    queryset = Account.objects.order_by("pk")
+    if job.user_id:
+        queryset = queryset.filter(user_id=job.user_id)
+    if accounts:
+        queryset = queryset.filter(pk__in=accounts)
+
+    account_list = list(queryset)
+    created = 0
+    for done, account in enumerate(account_list):
+        job.report_progress(done, len(account_list))
+        created += AccountBalanceService.build_checkpoints(account, until=until)
+    job.report_progress(len(account_list))
+    return {"created": created}
+
+
+@task("transactions.reconcile_balances", max_attempts=1, user_runnable=True)
+def reconcile_balances(job, repair=False, shard_size=500, samples=50):
+    """
+    Reconcile the job's user, or every user one shard at a time; the
+    ``reconcile_balances`` command spreads the shards over processes instead.
+    """
+    users = get_user_model().objects.order_by("pk")
+    if job.user_id:
+        users = users.filter(pk=job.user_id)
+    user_ids = list(users.values_list("pk", flat=True))
+
+    job.report_progress(0, len(user_ids))
+    return reconcile_shards(
+        user_ids,
+        repair=repair,
+        shard_size=shard_size,
+        sample_limit=samples,
+        on_progress=job.report_progress,
+    )
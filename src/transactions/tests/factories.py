@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+from functools import cache
+
+import factory
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from factory import fuzzy
+
+from transactions.models import Account, Category, Transaction
+
+User = get_user_model()
+
+PASSWORD = "testpass123"
+
+
+@cache
+def hashed_password() -> str:
+    return make_password(PASSWORD)
+
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = User
+
+    username = factory.Sequence(lambda n: f"user{n}")
+    email = factory.LazyAttribute(lambda user: f"{user.username}@example.com")
+    first_name = factory.Faker("first_name")
+    last_name = factory.Faker("last_name")
+    # Hashed once: hashing per instance dominates bulk seeding otherwise.
+    password = factory.LazyFunction(lambda: hashed_password())
+
+
+class AccountFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Account
+
+    user = factory.SubFactory(UserFactory)
+    name = factory.Sequence(lambda n: f"Account {n}")
+    account_type = fuzzy.FuzzyChoice(Account.AccountType.values)
+    initial_balance = fuzzy.FuzzyDecimal(0, 5000)
+    closing_day = fuzzy.FuzzyInteger(1, 28)
+    due_day = fuzzy.FuzzyInteger(1, 28)
+
+
+class CategoryFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Category
+
+    user = factory.SubFactory(UserFactory)
+    name = factory.Sequence(lambda n: f"Category {n}")
+    icon = "mdi-tag"
+    color = factory.Faker("hex_color")
+    type = fuzzy.FuzzyChoice(Category.TypeChoices.values)
+
+
+class TransactionFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Transaction
+
+    user = factory.SubFactory(UserFactory)
+    account = factory.SubFactory(AccountFactory, user=factory.SelfAttribute("..user"))
+    category = factory.SubFactory(
+        CategoryFactory,
+        user=factory.SelfAttribute("..user"),
+        type=factory.SelfAttribute("..type"),
+    )
+    type = fuzzy.FuzzyChoice(
+        [Transaction.TransactionType.INCOME, Transaction.TransactionType.EXPENSE]
+    )
+    description = factory.Faker("sentence", nb_words=3)
+    value = fuzzy.FuzzyDecimal(1, 2000)
+    date = fuzzy.FuzzyDate(date.today() - timedelta(days=365), date.today())
+    paid = factory.Faker("pybool", truth_probability=80)
+    notes = ""
@@ -0,0 +1,162 @@
+from datetime import date
+from decimal import Decimal
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from transactions.models import (
+    Account,
+    ArchivedTransaction,
+    Category,
+    MonthlyRollup,
+    Transaction,
+)
+from transactions.services import TransactionArchiveService
+from transactions.tests.helpers import authenticate_user, create_user
+
+
+class TransactionArchiveTests(APITestCase):
+    def setUp(self):
+        self.user = create_user(username="archiveuser")
+        self.client = authenticate_user(self.client, self.user)
+
+        self.account = Account.objects.create(
+            user=self.user,
+            name="Checking",
+            initial_balance=1000,
+            closing_day=1,
+            due_day=10,
+        )
+        self.food = Category.objects.create(
+            user=self.user, name="Food", type="EXPENSE", color="#FF0000"
+        )
+        self.salary = Category.objects.create(
+            user=self.user, name="Salary", type="INCOME", color="#00FF00"
+        )
+
+        self.old_expense = self._transaction("Old groceries", 100, date(2020, 1, 10))
+        self._transaction("Old groceries 2", 50, date(2020, 1, 20))
+        self._transaction(
+            "Old salary", 500, date(2020, 2, 5), category=self.salary, type="INCOME"
+        )
+        self.old_unpaid = self._transaction(
+            "Old unpaid", 30, date(2020, 1, 15), paid=False
+        )
+        self.recent = self._transaction("Recent", 10, date.today())
+
+    def _transaction(self, description, value, when, **extra):
+        extra.setdefault("category", self.food)
+        extra.setdefault("type", "EXPENSE")
+        return Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            description=description,
+            value=value,
+            date=when,
+            **extra,
+        )
+
+    def _archive(self):
+        return TransactionArchiveService.archive(cutoff=date(2021, 1, 1), batch_size=2)
+
+    def test_archive_moves_only_old_paid_transactions(self):
+        self.assertEqual(self._archive(), 3)
+
+        self.assertEqual(ArchivedTransaction.objects.count(), 3)
+        self.assertTrue(Transaction.objects.filter(pk=self.old_unpaid.pk).exists())
+        self.assertTrue(Transaction.objects.filter(pk=self.recent.pk).exists())
+
+        archived = ArchivedTransaction.objects.get(pk=self.old_expense.pk)
+        self.assertEqual(archived.created_at, self.old_expense.created_at)
+        self.assertEqual(archived.value, Decimal("100.00"))
+
+    def test_archive_leaves_monthly_rollups(self):
+        self._archive()
+
+        rollup = MonthlyRollup.objects.get(
+            account=self.account, category=self.food, month=date(2020, 1, 1)
+        )
+        self.assertEqual(rollup.total, Decimal("150.00"))
+        self.assertEqual(rollup.count, 2)
+        self.assertEqual(
+            MonthlyRollup.objects.get(category=self.salary).total, Decimal("500.00")
+        )
+
+    def test_later_runs_add_to_the_same_rollup(self):
+        TransactionArchiveService.archive(cutoff=date(2020, 1, 15))
+        self._archive()
+
+        rollup = MonthlyRollup.objects.get(
+            account=self.account, category=self.food, month=date(2020, 1, 1)
+        )
+        self.assertEqual(rollup.total, Decimal("150.00"))
+        self.assertEqual(rollup.count, 2)
+
+    def test_list_unions_archive_only_for_old_ranges(self):
+        self._archive()
+        url = reverse("transactions:transactions-list")
+
+        response = self.client.get(
+            url, {"start_date": "2020-01-01", "end_date": "2020-12-31"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 4)
+        self.assertEqual(response.data["results"][0]["description"], "Old salary")
+        self.assertEqual(response.data["results"][0]["category"]["name"], "Salary")
+
+        today = date.today().isoformat()
+        response = self.client.get(url, {"start_date": today, "end_date": today})
+        self.assertEqual(response.data["count"], 1)
+
+    def test_summary_and_dashboard_include_archived_totals(self):
+        self._archive()
+
+        response = self.client.get(
+            reverse("transactions:transactions-summary"),
+            {"start_date": "2020-01-01", "end_date": "2020-12-31"},
+        )
+        self.assertEqual(response.data["total_income"], Decimal("500.00"))
+        self.assertEqual(response.data["total_expense"], Decimal("180.00"))
+
+        response = self.client.get(
+            reverse("transactions:dashboard"),
+            {"start_date": "2020-01-15", "end_date": "2020-02-29"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_expense"], "80.00")
+        self.assertEqual(response.data["total_income"], "500.00")
+        self.assertEqual(
+            response.data["expense_by_category"][0]["category_name"], "Food"
+        )
+
+    def test_dashboard_defaults_each_missing_date(self):
+        self._archive()
+        url = reverse("transactions:dashboard")
+
+        response = self.client.get(url, {"start_date": "2020-01-01"})
+        self.assertEqual(response.data["total_expense"], "190.00")
+        self.assertEqual(response.data["total_income"], "500.00")
+
+        response = self.client.get(url, {"end_date": date.today().isoformat()})
+        self.assertEqual(response.data["total_expense"], "10.00")
+
+    def test_account_balance_counts_archived_transactions(self):
+        url = reverse("transactions:accounts-detail", args=[self.account.pk])
+        before = self.client.get(url).data["current_balance"]
+
+        self._archive()
+
+        self.assertEqual(self.client.get(url).data["current_balance"], before)
+
+    def test_export_includes_archived_rows(self):
+        self._archive()
+
+        response = self.client.get(
+            reverse("transactions:transactions-export"),
+            {"start_date": "2020-01-01", "end_date": "2020-12-31"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertTrue(lines[0].startswith("date,description"))
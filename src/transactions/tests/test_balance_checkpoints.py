@@ -0,0 +1,163 @@
+from datetime import date
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from transactions.models import (
+    Account,
+    AccountBalanceCheckpoint,
+    Category,
+    Transaction,
+)
+from transactions.services import AccountBalanceService, TransactionArchiveService
+from transactions.tests.helpers import authenticate_user, create_user
+
+
+class AccountBalanceTests(APITestCase):
+    def setUp(self):
+        self.user = create_user(username="balanceuser")
+        self.client = authenticate_user(self.client, self.user)
+
+        self.account = Account.objects.create(
+            user=self.user,
+            name="Checking",
+            initial_balance=1000,
+            closing_day=1,
+            due_day=10,
+        )
+        self.food = Category.objects.create(user=self.user, name="Food", type="EXPENSE")
+        self.salary = Category.objects.create(
+            user=self.user, name="Salary", type="INCOME"
+        )
+
+        self._transaction(500, date(2023, 1, 5), type="INCOME", category=self.salary)
+        self._transaction(100, date(2023, 1, 20))
+        self._transaction(40, date(2023, 3, 2))
+        self._transaction(999, date(2023, 3, 3), paid=False)
+        self.url = reverse("transactions:accounts-balance", args=[self.account.pk])
+
+    def _transaction(self, value, when, **extra):
+        extra.setdefault("category", self.food)
+        extra.setdefault("type", "EXPENSE")
+        return Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            description="Transaction",
+            value=value,
+            date=when,
+            **extra,
+        )
+
+    def _balance(self, day):
+        response = self.client.get(self.url, {"date": day})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def _build(self):
+        return AccountBalanceService.build_checkpoints(
+            self.account, until=date(2023, 4, 15)
+        )
+
+    def test_build_adds_one_checkpoint_per_month_end(self):
+        self.assertEqual(self._build(), 3)
+
+        checkpoints = {
+            checkpoint.date: checkpoint.net
+            for checkpoint in AccountBalanceCheckpoint.objects.all()
+        }
+        self.assertEqual(
+            checkpoints,
+            {
+                date(2023, 1, 31): Decimal("400.00"),
+                date(2023, 2, 28): Decimal("400.00"),
+                date(2023, 3, 31): Decimal("360.00"),
+            },
+        )
+        # Incremental: nothing left to add for the same range.
+        self.assertEqual(self._build(), 0)
+
+    def test_balance_as_of_matches_with_and_without_checkpoints(self):
+        expected = {
+            "2022-12-31": "1000.00",
+            "2023-01-10": "1500.00",
+            "2023-02-15": "1400.00",
+            "2023-03-02": "1360.00",
+            "2023-12-31": "1360.00",
+        }
+        without = {day: self._balance(day)["balance"] for day in expected}
+        self._build()
+        with_checkpoints = {day: self._balance(day)["balance"] for day in expected}
+
+        self.assertEqual(without, expected)
+        self.assertEqual(with_checkpoints, expected)
+        self.assertEqual(self._balance("2023-03-02")["checkpoint_date"], "2023-02-28")
+
+    def test_balance_survives_archiving(self):
+        self._build()
+        TransactionArchiveService.archive(cutoff=date(2023, 2, 1))
+
+        self.assertEqual(self._balance("2023-01-25")["balance"], "1400.00")
+        self.assertEqual(self._balance("2023-12-31")["balance"], "1360.00")
+
+    def test_backdated_writes_shift_later_checkpoints(self):
+        self._build()
+
+        response = self.client.post(
+            reverse("transactions:transactions-list"),
+            {
+                "account_id": str(self.account.pk),
+                "category_id": str(self.food.pk),
+                "description": "Backdated",
+                "value": "60.00",
+                "date": "2023-02-10",
+                "type": "EXPENSE",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        backdated = Transaction.objects.get(description="Backdated")
+        self.assertEqual(self._balance("2023-02-28")["balance"], "1340.00")
+        self.assertEqual(self._balance("2023-03-31")["balance"], "1300.00")
+
+        # Moving it into March leaves February as it was before.
+        transaction_url = reverse(
+            "transactions:transactions-detail", args=[backdated.pk]
+        )
+        self.client.patch(transaction_url, {"date": "2023-03-10"}, format="json")
+        self.assertEqual(self._balance("2023-02-28")["balance"], "1400.00")
+        self.assertEqual(self._balance("2023-03-31")["balance"], "1300.00")
+
+        self.client.patch(transaction_url, {"paid": False}, format="json")
+        self.assertEqual(self._balance("2023-03-31")["balance"], "1360.00")
+
+        self.client.patch(transaction_url, {"paid": True}, format="json")
+        self.client.delete(transaction_url)
+        self.assertEqual(self._balance("2023-03-31")["balance"], "1360.00")
+        self.assertEqual(
+            AccountBalanceCheckpoint.objects.get(date=date(2023, 3, 31)).net,
+            Decimal("360.00"),
+        )
+
+    def test_invalid_date_and_other_users_account(self):
+        response = self.client.get(self.url, {"date": "2023-02-30"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        other = Account.objects.create(
+            user=create_user(username="otherbalance"),
+            name="Other",
+            closing_day=1,
+            due_day=10,
+        )
+        response = self.client.get(
+            reverse("transactions:accounts-balance", args=[other.pk])
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_command_builds_checkpoints(self):
+        call_command("build_balance_checkpoints", until="2023-04-15", verbosity=0)
+        self.assertEqual(
+            AccountBalanceCheckpoint.objects.filter(account=self.account).count(), 3
+        )
@@ -1,3 +1,6 @@
+from django.db import IntegrityError, connection
+from django.db import transaction as db_transaction
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -54,9 +57,23 @@ class CategoryCreationTests(APITestCase):
         response1 = self.client.post(self.url, data, format="json")
         self.assertEqual(response1.status_code, status.HTTP_201_CREATED)
 
-        response2 = self.client.post(self.url, data, format="json")
+        with CaptureQueriesContext(connection) as queries:
+            response2 = self.client.post(self.url, data, format="json")
         self.assertEqual(response2.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("name", response2.data)
+        # The unique constraint rejects the insert; nothing is checked first.
+        self.assertFalse(
+            [
+                query
+                for query in queries
+                if query["sql"].startswith("SELECT")
+                and "transactions_category" in query["sql"]
+            ]
+        )
+
+    def test_database_rejects_invalid_color(self):
+        with self.assertRaises(IntegrityError), db_transaction.atomic():
+            Category.objects.create(user=self.user, name="Food", color="red")
 
     def test_create_duplicate_name_different_type(self):
         data_expense = category_data(name="Misc", category_type="EXPENSE")
@@ -289,6 +306,19 @@ class CategoryUpdateTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("name", response.data)
 
+    def test_partial_update_to_duplicate_name_fails(self):
+        Category.objects.create(
+            user=self.user1, name="Existing", type="EXPENSE", color="#FFFFFF"
+        )
+
+        url = reverse("transactions:categories-detail", args=[self.category1.id])
+        response = self.client.patch(url, {"name": "Existing"}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("name", response.data)
+        self.category1.refresh_from_db()
+        self.assertEqual(self.category1.name, "Old Name")
+
     def test_partial_update_patch(self):
         url = reverse("transactions:categories-detail", args=[self.category1.id])
         data = {"color": "#AABBCC"}
@@ -0,0 +1,137 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from transactions.models import (
+    Account,
+    ArchivedTransaction,
+    Category,
+    MonthlyRollup,
+    Transaction,
+)
+from transactions.services import TransactionArchiveService
+from transactions.tests.helpers import authenticate_user, create_user
+
+
+class CategoryMergeTests(APITestCase):
+    def setUp(self):
+        self.user = create_user(username="mergeuser")
+        self.client = authenticate_user(self.client, self.user)
+
+        self.account = Account.objects.create(
+            user=self.user, name="Checking", closing_day=1, due_day=10
+        )
+        self.target = Category.objects.create(
+            user=self.user, name="Food", type="EXPENSE"
+        )
+        self.groceries = Category.objects.create(
+            user=self.user, name="Groceries", type="EXPENSE"
+        )
+        self.restaurants = Category.objects.create(
+            user=self.user, name="Restaurants", type="EXPENSE"
+        )
+        self.url = reverse("transactions:categories-merge", args=[self.target.pk])
+
+    def _transactions(self, category, count, when=None):
+        Transaction.objects.bulk_create(
+            Transaction(
+                user=self.user,
+                account=self.account,
+                category=category,
+                description=f"{category.name} {index}",
+                value=10,
+                date=when or date.today(),
+                type="EXPENSE",
+            )
+            for index in range(count)
+        )
+
+    def _merge(self, *sources):
+        return self.client.post(
+            self.url, {"sources": [str(source.pk) for source in sources]}, format="json"
+        )
+
+    def test_merge_reassigns_transactions_and_deletes_sources(self):
+        self._transactions(self.target, 2)
+        self._transactions(self.groceries, 3)
+        self._transactions(self.restaurants, 4)
+
+        response = self._merge(self.groceries, self.restaurants)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["merged_categories"], 2)
+        self.assertEqual(response.data["transactions"], 7)
+        self.assertEqual(response.data["category"]["name"], "Food")
+        self.assertEqual(Transaction.objects.filter(category=self.target).count(), 9)
+        self.assertEqual(list(Category.objects.filter(user=self.user)), [self.target])
+
+    def test_merge_moves_archived_rows_and_combines_rollups(self):
+        self._transactions(self.target, 1, date(2020, 1, 10))
+        self._transactions(self.groceries, 2, date(2020, 1, 20))
+        self._transactions(self.groceries, 1, date(2020, 2, 5))
+        TransactionArchiveService.archive(cutoff=date(2021, 1, 1))
+
+        response = self._merge(self.groceries)
+
+        self.assertEqual(response.data["archived_transactions"], 3)
+        self.assertEqual(
+            ArchivedTransaction.objects.filter(category=self.target).count(), 4
+        )
+        rollups = {
+            rollup.month: (rollup.total, rollup.count)
+            for rollup in MonthlyRollup.objects.filter(user=self.user)
+        }
+        self.assertEqual(
+            rollups,
+            {
+                date(2020, 1, 1): (Decimal("30.00"), 3),
+                date(2020, 2, 1): (Decimal("10.00"), 1),
+            },
+        )
+        self.assertFalse(MonthlyRollup.objects.exclude(category=self.target).exists())
+
+    def test_query_count_does_not_depend_on_affected_rows(self):
+        # Warm the authenticated user cache first.
+        self.client.get(reverse("transactions:categories-list"))
+        self._transactions(self.groceries, 2)
+        with CaptureQueriesContext(connection) as few:
+            self._merge(self.groceries)
+
+        self._transactions(self.restaurants, 60)
+        with CaptureQueriesContext(connection) as many:
+            self._merge(self.restaurants)
+
+        self.assertEqual(len(many), len(few))
+        self.assertEqual(Transaction.objects.filter(category=self.target).count(), 62)
+
+    def test_invalid_sources_are_rejected(self):
+        other = Category.objects.create(
+            user=create_user(username="othermerge"), name="Food", type="EXPENSE"
+        )
+        salary = Category.objects.create(user=self.user, name="Salary", type="INCOME")
+        self._transactions(self.groceries, 1)
+
+        for sources in ([other], [salary], [self.target], []):
+            with self.subTest(sources=sources):
+                response = self._merge(*sources)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn("sources", response.data)
+
+        self.assertTrue(Category.objects.filter(pk=salary.pk).exists())
+        self.assertEqual(Transaction.objects.filter(category=self.groceries).count(), 1)
+
+    def test_cannot_merge_into_other_users_category(self):
+        other = Category.objects.create(
+            user=create_user(username="othertarget"), name="Food", type="EXPENSE"
+        )
+        response = self.client.post(
+            reverse("transactions:categories-merge", args=[other.pk]),
+            {"sources": [str(self.groceries.pk)]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,173 @@
+from datetime import date
+from unittest import mock
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import ChangeLogEntry
+from transactions.models import Account, Category, Transaction
+from transactions.tests.helpers import authenticate_user, create_user
+
+
+class ChangeLogTests(APITestCase):
+    def setUp(self):
+        self.user = create_user(username="changeuser")
+        self.client = authenticate_user(self.client, self.user)
+        self.account = Account.objects.create(
+            user=self.user, name="Checking", closing_day=1, due_day=10
+        )
+        self.category = Category.objects.create(
+            user=self.user, name="Food", type="EXPENSE"
+        )
+
+    def _log(self):
+        return list(
+            ChangeLogEntry.objects.order_by("pk").values_list("entity", "action")
+        )
+
+    def _create_transaction(self, **extra):
+        return self.client.post(
+            reverse("transactions:transactions-list"),
+            {
+                "account_id": str(self.account.pk),
+                "category_id": str(self.category.pk),
+                "description": "Groceries",
+                "value": "90.00",
+                "date": date.today().isoformat(),
+                "type": "EXPENSE",
+                **extra,
+            },
+            format="json",
+        )
+
+    def test_transaction_writes_are_logged_with_a_snapshot(self):
+        response = self._create_transaction()
+        url = reverse("transactions:transactions-detail", args=[response.data["id"]])
+        self.client.patch(url, {"description": "Market"}, format="json")
+        self.client.delete(url)
+
+        self.assertEqual(
+            self._log(),
+            [
+                ("transaction", "created"),
+                ("transaction", "updated"),
+                ("transaction", "deleted"),
+            ],
+        )
+        update = ChangeLogEntry.objects.get(action="updated")
+        self.assertEqual(str(update.entity_id), response.data["id"])
+        self.assertEqual(update.user, self.user)
+        self.assertEqual(update.data["description"], "Market")
+        self.assertEqual(update.data["value"], "90.00")
+
+    def test_installment_series_is_logged_per_row(self):
+        self._create_transaction(installment_total=3)
+        series = Transaction.objects.order_by("installment_current")
+
+        self.assertEqual(self._log(), [("transaction", "created")] * 3)
+        self.assertEqual(
+            sorted(ChangeLogEntry.objects.values_list("entity_id", flat=True)),
+            sorted(series.values_list("pk", flat=True)),
+        )
+
+    def test_deleting_a_series_deletes_and_logs_every_installment(self):
+        self._create_transaction(installment_total=3)
+        series = list(Transaction.objects.all())
+        self._create_transaction(installment_total=2)
+
+        response = self.client.delete(
+            reverse("transactions:transactions-delete-series", args=[series[0].pk])
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(Transaction.objects.count(), 2)
+        deleted = ChangeLogEntry.objects.filter(action="deleted")
+        self.assertEqual(
+            sorted(deleted.values_list("entity_id", flat=True)),
+            sorted(row.pk for row in series),
+        )
+
+    def test_account_and_category_writes_are_logged(self):
+        response = self.client.post(
+            reverse("transactions:accounts-list"),
+            {
+                "name": "Savings",
+                "account_type": "SAVINGS",
+                "closing_day": 1,
+                "due_day": 10,
+            },
+            format="json",
+        )
+        self.client.patch(
+            reverse("transactions:accounts-detail", args=[response.data["id"]]),
+            {"name": "Reserve"},
+            format="json",
+        )
+        self.client.delete(
+            reverse("transactions:accounts-detail", args=[response.data["id"]])
+        )
+        response = self.client.post(
+            reverse("transactions:categories-list"),
+            {"name": "Leisure", "icon": "mdi", "color": "#00FF00", "type": "EXPENSE"},
+            format="json",
+        )
+        self.client.delete(
+            reverse("transactions:categories-detail", args=[response.data["id"]])
+        )
+
+        self.assertEqual(
+            self._log(),
+            [
+                ("account", "created"),
+                ("account", "updated"),
+                ("account", "deleted"),
+                ("category", "created"),
+                ("category", "deleted"),
+            ],
+        )
+
+    def test_merge_is_logged_as_one_event(self):
+        groceries = Category.objects.create(
+            user=self.user, name="Groceries", type="EXPENSE"
+        )
+        for _ in range(3):
+            self._create_transaction(category_id=str(groceries.pk))
+        ChangeLogEntry.objects.all().delete()
+
+        self.client.post(
+            reverse("transactions:categories-merge", args=[self.category.pk]),
+            {"sources": [str(groceries.pk)]},
+            format="json",
+        )
+
+        self.assertEqual(self._log(), [("category", "deleted"), ("category", "merged")])
+        event = ChangeLogEntry.objects.get(action="merged")
+        self.assertEqual(event.data["target"], str(self.category.pk))
+        self.assertEqual(event.data["sources"], [str(groceries.pk)])
+        self.assertEqual(event.data["transactions"], 3)
+
+    def test_failed_log_write_rolls_the_change_back(self):
+        save = mock.patch(
+            "core.changes.ChangeLogEntry.save", side_effect=RuntimeError("down")
+        )
+        with save, self.assertRaises(RuntimeError):
+            self.client.patch(
+                reverse("transactions:accounts-detail", args=[self.account.pk]),
+                {"name": "Renamed"},
+                format="json",
+            )
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.name, "Checking")
+        self.assertFalse(ChangeLogEntry.objects.exists())
+
+    def test_rejected_writes_are_not_logged(self):
+        response = self.client.post(
+            reverse("transactions:categories-list"),
+            {"name": "Food", "icon": "mdi", "color": "#00FF00", "type": "EXPENSE"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ChangeLogEntry.objects.exists())
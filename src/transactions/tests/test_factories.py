@@ -0,0 +1,13 @@
+from django.test import TestCase
+
+from transactions.tests.factories import TransactionFactory
+
+
+class FactoryTests(TestCase):
+    def test_transaction_related_objects_share_owner(self):
+        transaction = TransactionFactory()
+
+        self.assertEqual(transaction.account.user, transaction.user)
+        self.assertEqual(transaction.category.user, transaction.user)
+        self.assertEqual(transaction.category.type, transaction.type)
+        self.assertTrue(transaction.user.check_password("testpass123"))
@@ -0,0 +1,143 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from prometheus_client import REGISTRY
+
+from jobs.queue import enqueue
+from transactions.models import (
+    Account,
+    AccountBalanceCheckpoint,
+    Category,
+    MonthlyRollup,
+    Transaction,
+)
+from transactions.reconciliation import reconcile_users
+from transactions.services import AccountBalanceService, TransactionArchiveService
+from transactions.tests.helpers import create_user
+
+
+class ReconciliationTests(TestCase):
+    def setUp(self):
+        self.user = create_user(username="reconcileuser")
+        self.account = Account.objects.create(
+            user=self.user, name="Checking", closing_day=1, due_day=10
+        )
+        food = Category.objects.create(user=self.user, name="Food", type="EXPENSE")
+        salary = Category.objects.create(user=self.user, name="Salary", type="INCOME")
+
+        for month in range(1, 7):
+            self._transaction(salary, 1000, date(2022, month, 5), type="INCOME")
+            self._transaction(food, 100 + month, date(2022, month, 20))
+        self._transaction(food, 999, date(2022, 6, 21), paid=False)
+        TransactionArchiveService.archive(cutoff=date(2022, 4, 1))
+        AccountBalanceService.build_checkpoints(self.account, until=date(2022, 6, 30))
+
+    def _transaction(self, category, value, when, **extra):
+        extra.setdefault("type", "EXPENSE")
+        Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            category=category,
+            description="Transaction",
+            value=value,
+            date=when,
+            **extra,
+        )
+
+    def _corrupt(self):
+        AccountBalanceCheckpoint.objects.filter(date=date(2022, 2, 28)).update(
+            net=Decimal("1.00")
+        )
+        # One wrong total, one missing rollup and one without archived rows.
+        wrong, missing, stray = MonthlyRollup.objects.order_by("month", "type")[:3]
+        MonthlyRollup.objects.filter(pk=wrong.pk).update(total=Decimal("5.00"))
+        missing.delete()
+        stray.pk = None
+        stray.month = date(2019, 1, 1)
+        stray.save()
+
+    def _state(self):
+        return (
+            sorted(AccountBalanceCheckpoint.objects.values_list("date", "net")),
+            sorted(
+                MonthlyRollup.objects.values_list(
+                    "category_id", "type", "month", "total", "count"
+                )
+            ),
+        )
+
+    def test_consistent_aggregates_have_no_drift(self):
+        report = reconcile_users([self.user.pk])
+
+        self.assertEqual(report["users"], 1)
+        self.assertEqual(report["checked"], {"rollup": 6, "checkpoint": 6})
+        self.assertEqual(report["drift"], {"rollup": 0, "checkpoint": 0})
+
+    def test_drift_is_reported_and_left_alone_without_repair(self):
+        self._corrupt()
+        state = self._state()
+
+        report = reconcile_users([self.user.pk])
+
+        self.assertEqual(report["drift"], {"rollup": 3, "checkpoint": 1})
+        self.assertEqual(report["repaired"], {"rollup": 0, "checkpoint": 0})
+        self.assertEqual(len(report["samples"]), 4)
+        self.assertEqual(self._state(), state)
+
+    def test_repair_restores_the_source_values(self):
+        expected = self._state()
+        self._corrupt()
+
+        report = reconcile_users([self.user.pk], repair=True)
+
+        self.assertEqual(report["repaired"], {"rollup": 3, "checkpoint": 1})
+        self.assertEqual(self._state(), expected)
+        self.assertEqual(
+            reconcile_users([self.user.pk])["drift"], {"rollup": 0, "checkpoint": 0}
+        )
+
+    def test_command_shards_users_and_exports_metrics(self):
+        create_user(username="emptyuser")
+        self._corrupt()
+        drift = (
+            REGISTRY.get_sample_value(
+                "reconciliation_aggregates_total",
+                {"kind": "checkpoint", "outcome": "drift"},
+            )
+            or 0
+        )
+        out = StringIO()
+
+        call_command(
+            "reconcile_balances", repair=True, workers=1, shard_size=1, stdout=out
+        )
+
+        self.assertIn("Reconciled 2 users", out.getvalue())
+        self.assertIn("checkpoint: 6 checked, 1 drifted, 1 repaired", out.getvalue())
+        self.assertEqual(
+            REGISTRY.get_sample_value(
+                "reconciliation_aggregates_total",
+                {"kind": "checkpoint", "outcome": "drift"},
+            ),
+            drift + 1,
+        )
+        self.assertEqual(REGISTRY.get_sample_value("reconciliation_progress_ratio"), 1)
+
+    def test_job_exports_metrics(self):
+        self._corrupt()
+        sample = (
+            "reconciliation_aggregates_total",
+            {"kind": "checkpoint", "outcome": "drift"},
+        )
+        drift = REGISTRY.get_sample_value(*sample) or 0
+        job = enqueue("transactions.reconcile_balances", user=self.user)
+
+        call_command("run_jobs", burst=True, stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual(job.result["drift"]["checkpoint"], 1)
+        self.assertEqual(REGISTRY.get_sample_value(*sample), drift + 1)
+        self.assertEqual(REGISTRY.get_sample_value("reconciliation_progress_ratio"), 1)
@@ -0,0 +1,174 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from transactions.models import Account, Category, Transaction
+from transactions.services import AccountBalanceService, TransactionArchiveService
+from transactions.tests.helpers import authenticate_user, create_user
+
+
+class RunningBalanceTests(APITestCase):
+    def setUp(self):
+        self.user = create_user(username="statementuser")
+        self.client = authenticate_user(self.client, self.user)
+        self.url = reverse("transactions:transactions-list")
+
+        self.account = Account.objects.create(
+            user=self.user,
+            name="Checking",
+            initial_balance=1000,
+            closing_day=1,
+            due_day=10,
+        )
+        self.other_account = Account.objects.create(
+            user=self.user, name="Savings", closing_day=1, due_day=10
+        )
+        self.food = Category.objects.create(user=self.user, name="Food", type="EXPENSE")
+
+        # Three rows a week for a year and a half, some of them on the same
+        # day and some unpaid.
+        start = date(2022, 1, 3)
+        for week in range(78):
+            day = start + timedelta(weeks=week)
+            self._transaction(day, 300, type="INCOME")
+            self._transaction(day, 10 + week)
+            self._transaction(day + timedelta(days=2), 25, paid=week % 4 != 0)
+        self._transaction(start, 5000, account=self.other_account, type="INCOME")
+
+    def _transaction(self, day, value, **extra):
+        extra.setdefault("account", self.account)
+        Transaction.objects.create(
+            user=self.user,
+            category=self.food,
+            description=f"Row {day}",
+            value=value,
+            date=day,
+            type=extra.pop("type", "EXPENSE"),
+            **extra,
+        )
+
+    def _expected(self):
+        balance, expected = self.account.initial_balance, {}
+        rows = Transaction.objects.filter(account=self.account).order_by(
+            "date", "created_at", "id"
+        )
+        for transaction in rows:
+            balance += AccountBalanceService.effect(transaction)[2]
+            expected[str(transaction.pk)] = balance
+        return expected
+
+    def _statement(self, **params):
+        params = {"account": str(self.account.pk), "running_balance": "true", **params}
+        return self.client.get(self.url, params)
+
+    def _walk(self, response):
+        rows = []
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            rows += response.data["results"]
+            if not response.data["next"]:
+                return rows
+            response = self.client.get(response.data["next"])
+
+    def test_every_page_has_the_running_balance(self):
+        expected = self._expected()
+        AccountBalanceService.build_checkpoints(self.account)
+
+        rows = self._walk(self._statement(page_size=17))
+
+        self.assertEqual(len(rows), len(expected))
+        self.assertEqual(
+            {row["id"]: Decimal(row["running_balance"]) for row in rows}, expected
+        )
+        self.assertEqual([row["id"] for row in rows], list(reversed(list(expected))))
+
+    def test_archived_rows_count_towards_the_balance(self):
+        expected = self._expected()
+        TransactionArchiveService.archive(cutoff=date(2022, 7, 1))
+        AccountBalanceService.build_checkpoints(self.account)
+
+        rows = self._walk(self._statement(page_size=50))
+
+        live = {str(pk) for pk in Transaction.objects.values_list("pk", flat=True)}
+        self.assertEqual({row["id"] for row in rows}, live & set(expected))
+        for row in rows:
+            self.assertEqual(Decimal(row["running_balance"]), expected[row["id"]])
+
+    def test_filtered_rows_keep_the_account_balance(self):
+        expected = self._expected()
+        rows = self._walk(self._statement(paid="false"))
+
+        self.assertTrue(rows)
+        for row in rows:
+            self.assertFalse(row["paid"])
+            self.assertEqual(Decimal(row["running_balance"]), expected[row["id"]])
+
+    def test_deep_pages_cost_the_same_as_the_first(self):
+        AccountBalanceService.build_checkpoints(self.account)
+        first = self._statement(page_size=10)
+
+        with CaptureQueriesContext(connection) as first_queries:
+            self._statement(page_size=10)
+
+        response = first
+        for _ in range(15):
+            response = self.client.get(response.data["next"])
+        with CaptureQueriesContext(connection) as deep_queries:
+            self.client.get(response.data["next"])
+
+        self.assertEqual(len(deep_queries), len(first_queries))
+
+    def test_pages_resume_past_the_full_key_both_ways(self):
+        forward = self._statement(page_size=10)
+        pages = [forward.data["results"]]
+        for _ in range(3):
+            with CaptureQueriesContext(connection) as queries:
+                forward = self.client.get(forward.data["next"])
+            pages.append(forward.data["results"])
+            self.assertFalse(
+                [query for query in queries if "OFFSET" in query["sql"].upper()]
+            )
+
+        # Same-day rows are split across pages without being lost or repeated.
+        ids = [row["id"] for page in pages for row in page]
+        self.assertEqual(len(set(ids)), 40)
+
+        backward = forward
+        for page in reversed(pages[:-1]):
+            backward = self.client.get(backward.data["previous"])
+            self.assertEqual(backward.data["results"], page)
+        self.assertIsNone(backward.data["previous"])
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self._statement(cursor="cD1ub3QtYS1rZXk=")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_running_balance_needs_one_of_the_users_accounts(self):
+        response = self.client.get(self.url, {"running_balance": "true"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("running_balance", response.data)
+
+        stranger = Account.objects.create(
+            user=create_user(username="stranger"),
+            name="Other",
+            closing_day=1,
+            due_day=10,
+        )
+        for account in (str(stranger.pk), "not-a-uuid"):
+            with self.subTest(account=account):
+                response = self._statement(account=account)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn("account", response.data)
+
+    def test_plain_list_is_unchanged(self):
+        response = self.client.get(self.url, {"account": str(self.account.pk)})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 234)
+        self.assertNotIn("running_balance", response.data["results"][0])
@@ -0,0 +1,51 @@
+from datetime import UTC, date, datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count
+from django.test import TestCase
+
+from transactions.models import Transaction
+from transactions.synthetic import SyntheticUser
+
+
+class SyntheticDataTests(TestCase):
+    def _user(self, index, seed=7):
+        return SyntheticUser(
+            index, seed, 200, date(2023, 1, 1), date(2025, 12, 31), "hash"
+        )
+
+    def test_users_are_deterministic_per_seed_and_index(self):
+        first, again = self._user(3), self._user(3)
+
+        self.assertEqual(first.user, again.user)
+        self.assertEqual(first.accounts, again.accounts)
+        self.assertEqual(first.transactions, again.transactions)
+        self.assertEqual(
+            first.user["created_at"], datetime(2026, 1, 1, tzinfo=UTC)
+        )
+        self.assertNotEqual(first.user["id"], self._user(3, seed=8).user["id"])
+        self.assertNotEqual(first.user["id"], self._user(4).user["id"])
+
+    def test_command_generates_consistent_series(self):
+        call_command(
+            "generate_synthetic_data",
+            users=3,
+            transactions_per_user=150,
+            end_date="2025-12-31",
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(Transaction.objects.count(), 450)
+        series = (
+            Transaction.objects.exclude(installment_group_id=None)
+            .values("installment_group_id", "installment_total")
+            .annotate(rows=Count("id"))
+        )
+        self.assertTrue(series)
+        for group in series:
+            self.assertEqual(group["rows"], group["installment_total"])
+
+        with self.assertRaises(CommandError):
+            call_command("generate_synthetic_data", users=1, stdout=StringIO())
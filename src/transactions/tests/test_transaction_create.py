@@ -0,0 +1,148 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from transactions.models import Account, Category, Transaction
+from transactions.serializers import TransactionCreateSerializer
+from transactions.tests.helpers import authenticate_user, create_user
+
+
+def reference_queries(queries):
+    return [
+        query["sql"]
+        for query in queries
+        if query["sql"].startswith("SELECT")
+        and (
+            "transactions_account" in query["sql"]
+            or "transactions_category" in query["sql"]
+        )
+    ]
+
+
+class TransactionCreateTests(APITestCase):
+    def setUp(self):
+        self.user = create_user(username="createuser")
+        self.client = authenticate_user(self.client, self.user)
+        self.url = reverse("transactions:transactions-list")
+
+        self.account = Account.objects.create(
+            user=self.user, name="Checking", closing_day=1, due_day=10
+        )
+        self.category = Category.objects.create(
+            user=self.user, name="Food", type="EXPENSE", color="#FF0000"
+        )
+        other = create_user(username="otheruser")
+        self.other_account = Account.objects.create(
+            user=other, name="Other", closing_day=1, due_day=10
+        )
+        self.other_category = Category.objects.create(
+            user=other, name="Other", type="EXPENSE"
+        )
+
+    def _data(self, **extra):
+        return {
+            "account_id": str(self.account.pk),
+            "category_id": str(self.category.pk),
+            "description": "Groceries",
+            "value": "90.00",
+            "date": date.today().isoformat(),
+            "type": "EXPENSE",
+            **extra,
+        }
+
+    def test_account_and_category_are_loaded_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, self._data(), format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["account"]["name"], "Checking")
+        self.assertEqual(response.data["category"]["color"], "#FF0000")
+        self.assertEqual(len(reference_queries(queries)), 1)
+
+    def test_account_and_category_aliases(self):
+        data = self._data(account=str(self.account.pk), category=str(self.category.pk))
+        del data["account_id"], data["category_id"]
+
+        response = self.client.post(self.url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        transaction = Transaction.objects.get()
+        self.assertEqual(transaction.account, self.account)
+        self.assertEqual(transaction.category, self.category)
+
+    def test_category_is_optional(self):
+        response = self.client.post(
+            self.url, self._data(category_id=None), format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(Transaction.objects.get().category)
+
+    def test_other_users_references_are_rejected(self):
+        cases = {
+            "account_id": self._data(account_id=str(self.other_account.pk)),
+            "category_id": self._data(category_id=str(self.other_category.pk)),
+        }
+        for field, data in cases.items():
+            with self.subTest(field):
+                response = self.client.post(self.url, data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn(field, response.data)
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_malformed_and_missing_references_are_rejected(self):
+        response = self.client.post(
+            self.url, self._data(account_id="not-a-uuid"), format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("account_id", response.data)
+
+        data = self._data()
+        del data["account_id"]
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("account_id", response.data)
+
+    def test_installment_series_reuses_the_references(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                self.url, self._data(installment_total=12), format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Transaction.objects.count(), 12)
+        self.assertEqual(
+            sum(transaction.value for transaction in Transaction.objects.all()),
+            Decimal("90.00"),
+        )
+        self.assertEqual(len(reference_queries(queries)), 1)
+
+    def test_bulk_validation_loads_every_reference_once(self):
+        second = Account.objects.create(
+            user=self.user, name="Savings", closing_day=1, due_day=10
+        )
+        request = Request(APIRequestFactory().post("/"))
+        request.user = self.user
+        items = [
+            self._data(),
+            self._data(account_id=str(second.pk)),
+            self._data(category_id=None),
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            serializer = TransactionCreateSerializer(
+                data=items, many=True, context={"request": request}
+            )
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        self.assertEqual(len(reference_queries(queries)), 1)
+        self.assertEqual(
+            [item["account"] for item in serializer.validated_data],
+            [self.account, second, self.account],
+        )
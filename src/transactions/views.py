@@ -1,27 +1,81 @@
+import csv
+from itertools import chain
+
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Sum
-from transactions.models import Transaction, Account, Category
-from django.db.models import F, Q, Value
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction as db_transaction
+from django.db.models import Sum, prefetch_related_objects
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from transactions.models import (
+    ArchivedTransaction,
+    Transaction,
+    Account,
+    Category,
+    MonthlyRollup,
+)
+from django.db.models import Case, F, OuterRef, Q, Subquery, Value, When
 from django.db.models.functions import Coalesce
 from django.db.models.fields import DecimalField
 from transactions.serializers import (
     TransactionSerializer,
     TransactionCreateSerializer,
+    TransactionStatementSerializer,
     DashboardSerializer,
     AccountListSerializer,
     AccountWriteSerializer,
+    AccountBalanceSerializer,
+    CategoryMergeSerializer,
     CategorySerializer,
     CategoryWriteSerializer,
 )
-from transactions.services import TransactionService
+from transactions.services import (
+    AccountBalanceService,
+    CategoryService,
+    TransactionArchiveService,
+    TransactionService,
+)
+from transactions.pagination import StatementPagination
 from django.utils.translation import gettext_lazy as _
 from datetime import date
 from rest_framework.views import APIView
+from core import changes
+
+
+class Echo:
+    """File-like object whose ``write`` just returns the value, for csv streaming."""
+
+    def write(self, value):
+        return value
+
+
+def _query_date(request, name):
+    """The ``name`` query parameter as a date, or ``None`` when it is absent."""
+    value = request.query_params.get(name)
+    if not value:
+        return None
+
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({"error": _("Invalid date range.")})
+
+    return parsed
+
+
+def _date_range(request):
+    params = request.query_params
+    if not (params.get("start_date") and params.get("end_date")):
+        return None, None
+
+    return _query_date(request, "start_date"), _query_date(request, "end_date")
 
 
 class CategoryViewSet(viewsets.ModelViewSet):
@@ -38,16 +92,27 @@ class CategoryViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action in ["create", "update", "partial_update"]:
             return CategoryWriteSerializer
+        if self.action == "merge":
+            return CategoryMergeSerializer
         return CategorySerializer
 
     def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return Category.objects.none()
         return Category.objects.filter(user=self.request.user)
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        with db_transaction.atomic():
+            category = serializer.save(user=self.request.user)
+            changes.record(category, changes.Action.CREATED)
+
+    def perform_update(self, serializer):
+        with db_transaction.atomic():
+            category = serializer.save()
+            changes.record(category, changes.Action.UPDATED)
 
     def perform_destroy(self, instance):
-        if instance.transactions.exists():
+        if instance.transactions.exists() or instance.archived_transactions.exists():
             raise ValidationError(
                 {
                     "error": _(
@@ -55,7 +120,30 @@ class CategoryViewSet(viewsets.ModelViewSet):
                     )
                 }
             )
-        instance.delete()
+        with db_transaction.atomic():
+            changes.record(instance, changes.Action.DELETED)
+            instance.delete()
+
+    @action(detail=True, methods=["post"])
+    def merge(self, request, pk=None):
+        """
+        Reassign everything filed under the ``sources`` categories to this
+        one and delete them.
+        """
+        target = self.get_object()
+        serializer = self.get_serializer(
+            data=request.data,
+            context={**self.get_serializer_context(), "target": target},
+        )
+        serializer.is_valid(raise_exception=True)
+
+        result = CategoryService.merge(
+            request.user, serializer.validated_data["sources"], target
+        )
+        return Response(
+            {**result, "category": CategorySerializer(target).data},
+            status=status.HTTP_200_OK,
+        )
 
 
 class TransactionViewSet(viewsets.ModelViewSet):
@@ -70,6 +158,19 @@ class TransactionViewSet(viewsets.ModelViewSet):
     search_fields = ["description"]
     ordering = ["-date"]
 
+    EXPORT_FIELDS = (
+        "date",
+        "description",
+        "value",
+        "type",
+        "paid",
+        "account__name",
+        "category__name",
+        "installment_current",
+        "installment_total",
+        "notes",
+    )
+
     def get_serializer_class(self):
         if self.action == "create":
             return TransactionCreateSerializer
@@ -78,8 +179,13 @@ class TransactionViewSet(viewsets.ModelViewSet):
         return TransactionSerializer
 
     def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return Transaction.objects.none()
+
         user = self.request.user
-        queryset = Transaction.objects.filter(user=user)
+        queryset = Transaction.objects.filter(user=user).select_related(
+            "category", "account"
+        )
 
         start_date = self.request.query_params.get("start_date")
         end_date = self.request.query_params.get("end_date")
@@ -89,6 +195,98 @@ class TransactionViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    def get_archived_queryset(self):
+        queryset = ArchivedTransaction.objects.filter(user=self.request.user)
+
+        start_date, end_date = _date_range(self.request)
+        if start_date and end_date:
+            queryset = queryset.filter(date__range=[start_date, end_date])
+
+        return queryset
+
+    def _reaches_archive(self):
+        start_date = _date_range(self.request)[0]
+        return TransactionArchiveService.reaches_archive(self.request.user, start_date)
+
+    def get_list_queryset(self):
+        """
+        Filtered transactions for list reads. Archived rows are unioned in
+        only when the requested range reaches back into archived history.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if not self._reaches_archive():
+            return queryset
+
+        ordering = queryset.query.order_by or Transaction._meta.ordering
+        archived = self.filter_queryset(self.get_archived_queryset())
+        return (
+            queryset.select_related(None)
+            .order_by()
+            .union(archived.order_by().defer("archived_at"), all=True)
+            .order_by(*ordering)
+        )
+
+    def _statement_account(self):
+        """
+        The account of a ``?running_balance=true`` list, or ``None`` when
+        running balances were not asked for.
+        """
+        flag = self.request.query_params.get("running_balance", "")
+        if flag.lower() not in ("1", "true"):
+            return None
+
+        account_id = self.request.query_params.get("account")
+        if not account_id:
+            raise ValidationError(
+                {"running_balance": _("Running balances need an account filter.")}
+            )
+        try:
+            account = Account.objects.filter(
+                user=self.request.user, pk=account_id
+            ).first()
+        except DjangoValidationError:
+            account = None
+        if account is None:
+            raise ValidationError({"account": _("Invalid account.")})
+        return account
+
+    def _statement(self, request, account):
+        """
+        One page of the account's live transactions, newest first, each with
+        the balance right after it. Archived rows are not listed but count
+        towards the balances.
+        """
+        paginator = StatementPagination()
+        page = paginator.paginate_queryset(
+            self.filter_queryset(self.get_queryset()), request, view=self
+        )
+        balances = AccountBalanceService.running_balances(account, page)
+        for transaction in page:
+            transaction.running_balance = balances[transaction.pk]
+
+        serializer = TransactionStatementSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+    def list(self, request, *args, **kwargs):
+        account = self._statement_account()
+        if account is not None:
+            return self._statement(request, account)
+
+        queryset = self.get_list_queryset()
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            prefetch_related_objects(page, "category", "account")
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        transactions = list(queryset)
+        prefetch_related_objects(transactions, "category", "account")
+        serializer = self.get_serializer(transactions, many=True)
+        return Response(serializer.data)
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -116,6 +314,17 @@ class TransactionViewSet(viewsets.ModelViewSet):
             queryset.filter(type="EXPENSE").aggregate(Sum("value"))["value__sum"] or 0
         )
 
+        if self._reaches_archive():
+            start_date, end_date = _date_range(request)
+            archived = TransactionArchiveService.totals(
+                request.user, start_date, end_date
+            )
+            for (transaction_type, category_id), total in archived.items():
+                if transaction_type == "INCOME":
+                    income += total
+                elif transaction_type == "EXPENSE":
+                    expense += total
+
         data = {
             "total_income": income,
             "total_expense": expense,
@@ -124,6 +333,56 @@ class TransactionViewSet(viewsets.ModelViewSet):
 
         return Response(data)
 
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        queryset = self.filter_queryset(self.get_queryset()).values_list(
+            *self.EXPORT_FIELDS
+        )
+        if self._reaches_archive():
+            archived = self.filter_queryset(self.get_archived_queryset())
+            queryset = queryset.order_by().union(
+                archived.order_by().values_list(*self.EXPORT_FIELDS), all=True
+            )
+        queryset = queryset.order_by("-date")
+
+        header = [
+            "date",
+            "description",
+            "value",
+            "type",
+            "paid",
+            "account",
+            "category",
+            "installment_current",
+            "installment_total",
+            "notes",
+        ]
+        writer = csv.writer(Echo())
+        rows = (writer.writerow(row) for row in queryset.iterator(chunk_size=2000))
+
+        response = StreamingHttpResponse(
+            chain([writer.writerow(header)], rows), content_type="text/csv"
+        )
+        response["Content-Disposition"] = 'attachment; filename="transactions.csv"'
+        return response
+
+    def perform_update(self, serializer):
+        before = AccountBalanceService.effect(serializer.instance)
+        with db_transaction.atomic():
+            transaction = serializer.save()
+            AccountBalanceService.record_change(
+                before, AccountBalanceService.effect(transaction)
+            )
+            changes.record(transaction, changes.Action.UPDATED)
+
+    def perform_destroy(self, instance):
+        with db_transaction.atomic():
+            AccountBalanceService.record_change(
+                AccountBalanceService.effect(instance), None
+            )
+            changes.record(instance, changes.Action.DELETED)
+            instance.delete()
+
     @action(detail=True, methods=["delete"], url_path="delete-series")
     def delete_series(self, request, pk=None):
         transaction = self.get_object()
@@ -134,6 +393,7 @@ class TransactionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        TransactionService.delete_installment_series(transaction)
         return Response(
             {"message": _("The installments were successfully removed.")},
             status=status.HTTP_204_NO_CONTENT,
@@ -145,8 +405,8 @@ class DashboardView(APIView):
 
     def get(self, request):
         today = date.today()
-        start_date = request.query_params.get("start_date", today.replace(day=1))
-        end_date = request.query_params.get("end_date", today)
+        start_date = _query_date(request, "start_date") or today.replace(day=1)
+        end_date = _query_date(request, "end_date") or today
 
         queryset = Transaction.objects.filter(
             user=request.user, date__range=[start_date, end_date]
@@ -156,14 +416,48 @@ class DashboardView(APIView):
             income=Coalesce(
                 Sum("value", filter=Q(type="INCOME")),
                 Value(0, output_field=DecimalField()),
-            )
+            ),
+            expense=Coalesce(
+                Sum("value", filter=Q(type="EXPENSE")),
+                Value(0, output_field=DecimalField()),
+            ),
         )
 
-        category_data = (
-            queryset.filter(type="EXPENSE")
+        expense_by_category = {
+            row["category"]: row["total"]
+            for row in queryset.filter(type="EXPENSE")
             .values("category")
             .annotate(total=Sum("value"))
-            .order_by("-total")
+            .order_by()
+        }
+
+        if TransactionArchiveService.reaches_archive(request.user, start_date):
+            archived = TransactionArchiveService.totals(
+                request.user, start_date, end_date
+            )
+            for (transaction_type, category_id), total in archived.items():
+                if transaction_type == "INCOME":
+                    summary["income"] += total
+                elif transaction_type == "EXPENSE":
+                    summary["expense"] += total
+                    expense_by_category[category_id] = (
+                        expense_by_category.get(category_id, 0) + total
+                    )
+
+        categories = Category.objects.filter(
+            user=request.user, pk__in=expense_by_category.keys()
+        ).in_bulk()
+        category_data = sorted(
+            (
+                {
+                    "category_name": getattr(categories.get(pk), "name", None),
+                    "color": getattr(categories.get(pk), "color", None),
+                    "total": total,
+                }
+                for pk, total in expense_by_category.items()
+            ),
+            key=lambda row: row["total"],
+            reverse=True,
         )
 
         data = {
@@ -183,12 +477,19 @@ class AccountViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action in ["list", "retrieve"]:
             return AccountListSerializer
+        if self.action == "balance":
+            return AccountBalanceSerializer
         return AccountWriteSerializer
 
     def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return Account.objects.none()
+
         user = self.request.user
 
         queryset = Account.objects.filter(user=user)
+        if self.action == "balance":
+            return queryset
 
         sum_income = Coalesce(
             Sum(
@@ -209,14 +510,35 @@ class AccountViewSet(viewsets.ModelViewSet):
             Value(0, output_field=DecimalField()),
         )
 
+        # Archived transactions are all paid, so their rollups count in full.
+        sum_archived = Coalesce(
+            Subquery(
+                MonthlyRollup.objects.filter(account=OuterRef("pk"))
+                .values("account")
+                .annotate(
+                    net=Sum(
+                        Case(
+                            When(type="INCOME", then=F("total")),
+                            default=-F("total"),
+                        )
+                    )
+                )
+                .values("net")
+            ),
+            Value(0, output_field=DecimalField()),
+        )
+
         queryset = queryset.annotate(
-            current_balance=F("initial_balance") + sum_income - sum_expense
+            current_balance=F("initial_balance")
+            + sum_income
+            - sum_expense
+            + sum_archived
         )
 
         return queryset.order_by("name")
 
     def perform_destroy(self, instance):
-        if instance.transactions.exists():
+        if instance.transactions.exists() or instance.archived_transactions.exists():
             raise ValidationError(
                 {
                     "error": _(
@@ -225,7 +547,39 @@ class AccountViewSet(viewsets.ModelViewSet):
                 }
             )
 
-        instance.delete()
+        with db_transaction.atomic():
+            changes.record(instance, changes.Action.DELETED)
+            instance.delete()
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        with db_transaction.atomic():
+            account = serializer.save(user=self.request.user)
+            changes.record(account, changes.Action.CREATED)
+
+    def perform_update(self, serializer):
+        with db_transaction.atomic():
+            account = serializer.save()
+            changes.record(account, changes.Action.UPDATED)
+
+    @action(detail=True, methods=["get"])
+    def balance(self, request, pk=None):
+        """Balance at the end of ``?date=YYYY-MM-DD`` (default: today)."""
+        account = self.get_object()
+        day = request.query_params.get("date")
+        try:
+            day = parse_date(day) if day else date.today()
+        except ValueError:
+            day = None
+        if day is None:
+            raise ValidationError({"date": _("Invalid date.")})
+
+        balance, checkpoint = AccountBalanceService.balance_as_of(account, day)
+        serializer = self.get_serializer(
+            {
+                "account": account.pk,
+                "date": day,
+                "balance": balance,
+                "checkpoint_date": checkpoint.date if checkpoint else None,
+            }
+        )
+        return Response(serializer.data)
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:21
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_case_duplicates(apps, schema_editor):
+    # Users differing only in case own separate data and passwords, so they
+    # cannot be merged automatically: list them and stop before the
+    # constraints fail halfway.
+    User = apps.get_model("users", "User")
+    duplicates = []
+    for field in ("username", "email"):
+        for row in (
+            User.objects.annotate(key=Lower(field))
+            .values("key")
+            .annotate(users=Count("pk"))
+            .filter(users__gt=1)
+            .order_by("key")
+        ):
+            values = User.objects.filter(**{f"{field}__iexact": row["key"]})
+            duplicates.append(
+                f"{field} {row['key']!r}: "
+                + ", ".join(values.order_by(field).values_list(field, flat=True))
+            )
+    if duplicates:
+        raise RuntimeError(
+            "Rename or remove users whose username or email only differs in "
+            "case, then migrate again:\n" + "\n".join(duplicates)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="user",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("username"),
+                name="users_user_username_ci_unique",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="user",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                name="users_user_email_ci_unique",
+            ),
+        ),
+    ]
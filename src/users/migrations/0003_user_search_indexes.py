@@ -0,0 +1,47 @@
+from django.db import migrations
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # Trigram and pattern_ops indexes only exist on Postgres; elsewhere the
+    # lower() unique indexes from 0002 serve the prefix searches.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    # Under a non-C collation the default btree opclass of the unique indexes
+    # cannot serve LIKE 'term%'; text_pattern_ops can.
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS users_user_username_prefix "
+        "ON users_user (lower(username) text_pattern_ops)"
+    )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS users_user_email_prefix "
+        "ON users_user (lower(email) text_pattern_ops)"
+    )
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS users_user_username_trgm "
+        "ON users_user USING gin (lower(username) gin_trgm_ops)"
+    )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS users_user_email_trgm "
+        "ON users_user USING gin (lower(email) gin_trgm_ops)"
+    )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS users_user_username_trgm")
+    schema_editor.execute("DROP INDEX IF EXISTS users_user_email_trgm")
+    schema_editor.execute("DROP INDEX IF EXISTS users_user_username_prefix")
+    schema_editor.execute("DROP INDEX IF EXISTS users_user_email_prefix")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_case_insensitive_unique"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
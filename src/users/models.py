@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser
 from core.models import BaseModel
 from django.utils.translation import gettext_lazy as _
@@ -22,5 +23,16 @@ class User(AbstractUser, BaseModel):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username"]
 
+    class Meta(AbstractUser.Meta):
+        # The directory search indexes (trigram and text_pattern_ops on the
+        # lowered username and email) are Postgres only, so they are created
+        # by users.0003 rather than declared here.
+        constraints = (
+            models.UniqueConstraint(
+                Lower("username"), name="users_user_username_ci_unique"
+            ),
+            models.UniqueConstraint(Lower("email"), name="users_user_email_ci_unique"),
+        )
+
     def __str__(self) -> str:  # pragma: no cover - trivial
         return self.email
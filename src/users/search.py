@@ -0,0 +1,36 @@
+from django.db.models import Q
+from django.db.models.functions import Lower
+from rest_framework import filters, pagination
+
+
+class UserDirectorySearchFilter(filters.BaseFilterBackend):
+    """
+    Case-insensitive search over username and email, both lowered so the
+    expression indexes of ``users.0003`` apply: terms of three or more
+    characters use a substring match (trigram indexes on Postgres), shorter
+    ones a prefix match (``text_pattern_ops`` indexes on Postgres).
+    """
+
+    search_param = "search"
+    min_substring_length = 3
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, "").strip().lower()
+        if not term:
+            return queryset
+
+        lookup = "contains" if len(term) >= self.min_substring_length else "startswith"
+        return queryset.alias(
+            username_ci=Lower("username"), email_ci=Lower("email")
+        ).filter(
+            Q(**{f"username_ci__{lookup}": term}) | Q(**{f"email_ci__{lookup}": term})
+        )
+
+
+class UserDirectoryPagination(pagination.CursorPagination):
+    """Keyset pagination on the unique username: no COUNT(*), no OFFSET."""
+
+    ordering = "username"
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 50
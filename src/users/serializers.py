@@ -1,13 +1,17 @@
+from typing import ClassVar
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
-
+from personal_finance_api.instrumentation import TimedSerializerMixin
 
 User = get_user_model()
 
 
-class UserRegistrationSerializer(serializers.ModelSerializer):
+class UserRegistrationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, style={"input_type": "password"})
     password2 = serializers.CharField(write_only=True, style={"input_type": "password"})
 
@@ -22,20 +26,12 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
             "password2",
             "default_currency",
         )
-
-    def validate_username(self, value):
-        if User.objects.filter(username__iexact=value).exists():
-            raise serializers.ValidationError(
-                _("A user with that username already exists."),
-            )
-        return value
-
-    def validate_email(self, value):
-        if value and User.objects.filter(email__iexact=value).exists():
-            raise serializers.ValidationError(
-                _("A user with that email already exists.")
-            )
-        return value
+        # Uniqueness is enforced by the case-insensitive unique indexes on
+        # insert (see ``create``), so skip DRF's per-field exists() queries.
+        extra_kwargs: ClassVar[dict] = {
+            "username": {"validators": [UnicodeUsernameValidator()]},
+            "email": {"validators": []},
+        }
 
     def validate_first_name(self, value):
         if not value:
@@ -67,27 +63,36 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         username_norm = username.lower()
         email_norm = email.lower() if email else email
 
+        extra_fields = {"first_name": first_name, "last_name": last_name}
         if default_currency:
-            user = User.objects.create_user(
-                username_norm,
-                email_norm,
-                password,
-                first_name=first_name,
-                last_name=last_name,
-                default_currency=default_currency,
-            )
-        else:
-            user = User.objects.create_user(
-                username_norm,
-                email_norm,
-                password,
-                first_name=first_name,
-                last_name=last_name,
-            )
+            extra_fields["default_currency"] = default_currency
+
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(
+                    username_norm, email_norm, password, **extra_fields
+                )
+        except IntegrityError as e:
+            raise serializers.ValidationError(unique_violation(e)) from e
         return user
 
 
-class UserSerializer(serializers.ModelSerializer):
+UNIQUE_MESSAGES = {
+    "username": _("A user with that username already exists."),
+    "email": _("A user with that email already exists."),
+}
+
+
+def unique_violation(error):
+    """The field error for an ``IntegrityError`` on the user's unique indexes."""
+    diag = getattr(error.__cause__, "diag", None)
+    constraint = getattr(diag, "constraint_name", None) or str(error)
+
+    field = "email" if "email" in constraint else "username"
+    return {field: [UNIQUE_MESSAGES[field]]}
+
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = (
@@ -99,3 +104,34 @@ class UserSerializer(serializers.ModelSerializer):
             "date_joined",
             "default_currency",
         )
+        # DRF's unique validators match exactly; the unique indexes ignore
+        # case, so ``validate_username`` / ``validate_email`` do instead.
+        extra_kwargs: ClassVar[dict] = {
+            "username": {"validators": [UnicodeUsernameValidator()]},
+            "email": {"validators": []},
+        }
+
+    def _check_unique(self, field, value):
+        others = User.objects.filter(**{f"{field}__iexact": value})
+        if self.instance is not None:
+            others = others.exclude(pk=self.instance.pk)
+        if others.exists():
+            raise serializers.ValidationError(UNIQUE_MESSAGES[field])
+        return value
+
+    def validate_username(self, value):
+        return self._check_unique("username", value)
+
+    def validate_email(self, value):
+        return self._check_unique("email", value)
+
+    def update(self, instance, validated_data):
+        if not validated_data.keys() & UNIQUE_MESSAGES.keys():
+            return super().update(instance, validated_data)
+
+        # A concurrent update can still take the value after validation.
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError as e:
+            raise serializers.ValidationError(unique_violation(e)) from e
@@ -1 +1,151 @@
-# Create your tests here.
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.tests.helpers import sample_user
+from users.serializers import UserSerializer
+
+
+def registration_data(username="newuser", email=None, password="S3cure-pass!"):
+    return {
+        "username": username,
+        "email": email or f"{username}@example.com",
+        "first_name": "New",
+        "last_name": "User",
+        "password": password,
+        "password2": password,
+    }
+
+
+class UserRegistrationTests(APITestCase):
+    def setUp(self):
+        self.url = reverse("authentication:register")
+
+    def test_register_runs_no_uniqueness_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, registration_data(), format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["username"], "newuser")
+        self.assertFalse(
+            [q for q in queries if q["sql"].lstrip().upper().startswith("SELECT")]
+        )
+
+    def test_duplicate_username_is_case_insensitive(self):
+        sample_user(username="existing", email="existing@example.com")
+
+        response = self.client.post(
+            self.url,
+            registration_data(username="EXISTING", email="other@example.com"),
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("username", response.data)
+
+    def test_duplicate_email_is_case_insensitive(self):
+        sample_user(username="existing", email="existing@example.com")
+
+        response = self.client.post(
+            self.url,
+            registration_data(username="another", email="Existing@Example.com"),
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("email", response.data)
+        self.assertNotIn("username", response.data)
+
+
+class UserProfileTests(APITestCase):
+    def setUp(self):
+        sample_user(username="existing", email="existing@example.com")
+        self.user = sample_user(username="profileuser", email="profile@example.com")
+        self.client.force_authenticate(self.user)
+        self.url = reverse("users:user_profile")
+
+    def test_username_taken_in_another_case_is_rejected(self):
+        response = self.client.patch(self.url, {"username": "EXISTING"}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("username", response.data)
+
+    def test_email_taken_in_another_case_is_rejected(self):
+        response = self.client.patch(
+            self.url, {"email": "Existing@Example.com"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("email", response.data)
+        self.assertNotIn("username", response.data)
+
+    def test_unique_index_violation_is_a_validation_error(self):
+        # Another request took the email between validation and the update.
+        with mock.patch.object(
+            UserSerializer, "validate_email", side_effect=lambda value: value
+        ):
+            response = self.client.patch(
+                self.url, {"email": "EXISTING@example.com"}, format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("email", response.data)
+
+    def test_changing_the_case_of_own_username_is_allowed(self):
+        response = self.client.patch(
+            self.url, {"username": "ProfileUser"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["username"], "ProfileUser")
+
+
+class UserDirectoryTests(APITestCase):
+    def setUp(self):
+        self.url = reverse("users:user_list")
+        self.user = sample_user(username="searcher")
+        for name in ["alice", "alicia", "bob", "carol"]:
+            sample_user(username=name, email=f"{name}@example.com")
+        self.client.force_authenticate(self.user)
+
+    def _usernames(self, response):
+        return [user["username"] for user in response.data["results"]]
+
+    def test_search_by_substring(self):
+        response = self.client.get(self.url, {"search": "LIC"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._usernames(response), ["alice", "alicia"])
+
+    def test_short_terms_match_prefix(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"search": "Ca"})
+
+        self.assertEqual(self._usernames(response), ["carol"])
+        # A plain LIKE on the lowered column, which the indexes can serve.
+        sql = queries[-1]["sql"]
+        self.assertIn("LIKE 'ca%'", sql)
+        self.assertIn('LOWER("users_user"."username")', sql)
+        self.assertNotIn("UPPER", sql)
+
+    def test_excludes_self_and_uses_keyset_pagination(self):
+        response = self.client.get(self.url, {"page_size": 2})
+
+        self.assertNotIn("count", response.data)
+        self.assertEqual(self._usernames(response), ["alice", "alicia"])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(self._usernames(response), ["bob", "carol"])
+        self.assertIsNone(response.data["next"])
+
+    def test_page_size_is_capped(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {"page_size": 1000})
+
+        sql = queries[-1]["sql"]
+        self.assertIn("LIMIT 51", sql)
+        self.assertNotIn("password", sql)
@@ -1,8 +1,8 @@
 from django.contrib.auth import get_user_model
-from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, mixins, viewsets
-from rest_framework.throttling import UserRateThrottle
+from rest_framework import mixins, viewsets
 
+from authentication.throttling import SlidingWindowUserRateThrottle
+from users.search import UserDirectoryPagination, UserDirectorySearchFilter
 from users.serializers import UserSerializer
 
 User = get_user_model()
@@ -10,12 +10,14 @@ User = get_user_model()
 
 class UserListView(mixins.ListModelMixin, viewsets.GenericViewSet):
     serializer_class = UserSerializer
-    throttle_classes = [UserRateThrottle]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
-    search_fields = ["username", "email"]
+    throttle_classes = (SlidingWindowUserRateThrottle,)
+    filter_backends = [UserDirectorySearchFilter]
+    pagination_class = UserDirectoryPagination
 
     def get_queryset(self):
-        queryset = User.objects.all().exclude(pk=self.request.user.id)
+        queryset = User.objects.only(*UserSerializer.Meta.fields).exclude(
+            pk=self.request.user.id
+        )
 
         return queryset
 
@@ -24,7 +26,7 @@ class UserProfileView(
     mixins.RetrieveModelMixin, mixins.UpdateModelMixin, viewsets.GenericViewSet
 ):
     serializer_class = UserSerializer
-    throttle_classes = [UserRateThrottle]
+    throttle_classes = (SlidingWindowUserRateThrottle,)
 
     def get_object(self):
         return self.request.user